@@ -0,0 +1,115 @@
+import numpy as np
+import pandas as pd
+
+import fra_amtrak.amtk_period as prd
+
+
+def get_anomalies(frame, threshold=3.5, min_periods=4, precision=4):
+    """Scans every train, station, and fiscal quarter cell (row) in < frame > for unusual minutes
+    late and late share values. Robust z-scores (see get_robust_z_scores()) of the average minutes
+    late for late detraining customers and of the late to total detraining customers ratio are
+    computed twice for every cell:
+
+        series: within the cell's train-station quarterly series (unusual for this train at this
+            station); series with fewer than < min_periods > quarters are not scored
+        cross-section: within the cell's fiscal quarter across the network (unusual for the
+            quarter)
+
+    The anomaly score of a cell is its largest absolute z-score. Cells scoring at or above
+    < threshold > are returned, ranked by score (descending).
+
+    Parameters:
+        frame (pd.DataFrame): DataFrame of interest
+        threshold (float): Minimum anomaly score to report
+        min_periods (int): Minimum number of quarters required to score a train-station series
+        precision (int): Number of decimal places in which to round the computed metrics
+
+    Returns:
+        pd.DataFrame: DataFrame of anomalous cells ranked by anomaly score
+    """
+
+    trn, code = "Train Number", "Arrival Station Code"
+    min_late = "Late Detraining Customers Avg Min Late"
+    ratio = "Late to Total Detraining Customers Ratio"
+
+    late = frame["Late Detraining Customers"].to_numpy(dtype=np.float64, na_value=np.nan)
+    total = frame["Total Detraining Customers"].to_numpy(dtype=np.float64, na_value=np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        late_share = np.where(total > 0, late / total, np.nan)
+
+    values = pd.DataFrame(
+        {
+            min_late: frame[min_late].to_numpy(dtype=np.float64, na_value=np.nan),
+            ratio: late_share,
+        },
+        index=frame.index,
+    )
+
+    # Integer group codes: train-station series and fiscal quarter cross-sections
+    series = frame.groupby([trn, code], sort=False, dropna=False).ngroup().to_numpy()
+    periods = prd.get_period_keys(frame, "Fiscal Year", "Fiscal Quarter")
+
+    scores = {}
+    for label, groups in (("series", series), ("cross-section", periods)):
+        z_scores = get_robust_z_scores(values, groups)
+
+        if label == "series":
+            counts = values.notna().groupby(groups).transform("sum")
+            z_scores = z_scores.where(counts.to_numpy() >= min_periods)
+        else:
+            # Rows missing a fiscal period are not scored against a cross-section
+            z_scores = z_scores.where(np.repeat(groups[:, None] >= 0, z_scores.shape[1], axis=1))
+
+        for col in values.columns:
+            scores[f"{col} {label} z"] = z_scores[col].to_numpy()
+
+    scores = pd.DataFrame(scores, index=frame.index)
+    score = np.abs(scores.to_numpy()).max(axis=1, initial=0, where=~np.isnan(scores.to_numpy()))
+
+    # Flag and rank
+    flagged = np.flatnonzero(score >= threshold)
+    flagged = flagged[np.argsort(-score[flagged], kind="stable")]
+
+    anomalies = pd.concat(
+        [
+            frame.iloc[flagged][[trn, code, "Fiscal Year", "Fiscal Quarter", min_late]],
+            values.iloc[flagged][[ratio]],
+            scores.iloc[flagged],
+        ],
+        axis=1,
+    )
+    anomalies.insert(0, "Rank", np.arange(1, flagged.size + 1))
+    anomalies["Anomaly Score"] = score[flagged]
+
+    return anomalies.reset_index(drop=True).round(precision)
+
+
+def get_robust_z_scores(values, groups):
+    """Computes robust z-scores of each column of < values > within the passed in < groups >:
+
+        z = 0.6745 * (x - median) / MAD
+
+    where MAD is the median absolute deviation from the group median. Groups with a MAD of 0 fall
+    back to the mean absolute deviation (scaled by 1.2533 so that both estimate the standard
+    deviation of normal data); if that is also 0 the z-scores are missing. Medians are computed
+    for all groups at once with cythonized groupby transforms.
+
+    Parameters:
+        values (pd.DataFrame): DataFrame of values to score
+        groups (np.ndarray): group codes (one per row)
+
+    Returns:
+        pd.DataFrame: DataFrame of robust z-scores
+    """
+
+    diff = values - values.groupby(groups).transform("median")
+
+    grouped = diff.abs().groupby(groups)
+    mad = grouped.transform("median").to_numpy() / 0.6745
+    mean_ad = grouped.transform("mean").to_numpy() * 1.2533
+    scale = np.where(mad > 0, mad, mean_ad)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z_scores = np.where(scale > 0, diff.to_numpy() / scale, np.nan)
+
+    return pd.DataFrame(z_scores, index=values.index, columns=values.columns)
@@ -0,0 +1,175 @@
+import itertools
+import numpy as np
+import pandas as pd
+import warnings
+
+from concurrent.futures import ProcessPoolExecutor
+
+
+def bootstrap_groups(values, sizes, n_boot, seed, max_cells=5_000_000):
+    """Draws < n_boot > bootstrap resamples for each of a contiguous run of groups and returns
+    the resampled metrics. The < values > array holds the late detraining customers, total
+    detraining customers, and average minutes late columns with the rows of each group stored
+    contiguously in the order given by < sizes >.
+
+    Resampling is vectorized: (replicates x rows) index matrices are drawn, each row of indices
+    staying within its own group, and the per-group sums of every replicate are computed with
+    np.add.reduceat() over the group boundaries. Mean minutes late ignores missing values. The
+    replicates are drawn in blocks of at most < max_cells > matrix cells, so memory stays bounded
+    for a single large group (e.g., the network); the generator draws the same stream whatever
+    the block size, so the results do not depend on < max_cells >.
+
+    Parameters:
+        values (np.ndarray): late, total, and average minutes late values (rows x 3)
+        sizes (np.ndarray): number of rows in each group
+        n_boot (int): Number of bootstrap resamples
+        seed (np.random.SeedSequence|int): seed for the random generator
+        max_cells (int): Maximum number of index matrix cells drawn at once
+
+    Returns:
+        np.ndarray: resampled metrics (3 x n_boot x groups); late to total ratio, mean minutes
+        late, and customer OTP
+    """
+
+    rng = np.random.default_rng(seed)
+
+    offsets = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+    starts = np.repeat(offsets, sizes)
+    lengths = np.repeat(sizes, sizes)
+
+    block = max(1, max_cells // max(starts.size, 1))
+    samples = []
+    for size in np.diff(np.r_[np.arange(0, n_boot, block), n_boot]):
+        # Index matrix: each column draws from its own group
+        idx = starts + (rng.random((size, starts.size)) * lengths).astype(np.int64)
+
+        late = np.add.reduceat(values[idx, 0], offsets, axis=1)
+        total = np.add.reduceat(values[idx, 1], offsets, axis=1)
+
+        min_late = values[idx, 2]
+        reported = ~np.isnan(min_late)
+        min_late_sum = np.add.reduceat(np.where(reported, min_late, 0), offsets, axis=1)
+        min_late_count = np.add.reduceat(reported.astype(np.int64), offsets, axis=1)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ratio = late / total
+            mean_min_late = min_late_sum / min_late_count
+
+        samples.append(np.stack((ratio, mean_min_late, 1 - ratio)))
+
+    return np.concatenate(samples, axis=1)
+
+
+def get_bootstrap_ci(
+    frame,
+    groups=None,
+    n_boot=1000,
+    ci=0.95,
+    seed=24,
+    max_workers=1,
+    chunk_rows=5_000,
+    precision=4,
+):
+    """Computes bootstrap percentile confidence intervals for the late to total detraining
+    customers ratio, the mean late arrival time (minutes) for late detraining passengers, and the
+    customer on-time performance (OTP; 1 - late to total ratio) of each group in < frame >. Train
+    arrivals (rows) are resampled with replacement within each group < n_boot > times.
+
+    Groups are split into chunks of roughly < chunk_rows > rows and each chunk is resampled with
+    bootstrap_groups() in blocks of at most < chunk_rows > x < n_boot > index matrix cells (a
+    group larger than < chunk_rows >, e.g., the network, is resampled a block of replicates at a
+    time). The chunks are resampled serially by default; if there is more than one chunk and
+    < max_workers > is not 1 (None uses every CPU), they are spread across a process pool, which
+    requires the calling script to guard its entry point with if __name__ == "__main__" on
+    platforms that spawn worker processes (macOS, Windows). Each chunk draws from its own child of
+    np.random.SeedSequence(< seed >) so the results are reproducible regardless of the number of
+    workers.
+
+    Parameters:
+        frame (pd.DataFrame): DataFrame of interest
+        groups (list|str): specifies how to group the stations; None computes network intervals
+        n_boot (int): Number of bootstrap resamples
+        ci (float): Confidence level
+        seed (int): Seed for the random generator
+        max_workers (int): Maximum number of worker processes; 1 resamples serially
+        chunk_rows (int): Approximate number of rows resampled per chunk
+        precision (int): Number of decimal places in which to round the computed metrics
+
+    Returns:
+        pd.DataFrame: DataFrame of point estimates and confidence intervals for each group
+    """
+
+    if groups is None:
+        codes = np.zeros(len(frame), dtype=np.int64)
+        index = pd.Index(["Network"], name="Group")
+    else:
+        grouped = frame.groupby(groups, observed=True, sort=True)
+        codes = grouped.ngroup().to_numpy()
+        index = grouped.size().index
+
+    # Rows of each group stored contiguously; rows with missing group keys are dropped
+    valid = np.flatnonzero(codes >= 0)
+    order = valid[np.argsort(codes[valid], kind="stable")]
+    sizes = np.bincount(codes[order], minlength=len(index))
+    values = np.column_stack([
+        frame[col].to_numpy(dtype=np.float64, na_value=np.nan)[order]
+        for col in (
+            "Late Detraining Customers",
+            "Total Detraining Customers",
+            "Late Detraining Customers Avg Min Late",
+        )
+    ])
+
+    # Chunk groups by row count
+    bounds = np.concatenate(([0], np.cumsum(sizes)))
+    breaks = np.searchsorted(bounds, np.arange(chunk_rows, bounds[-1], chunk_rows))
+    breaks = np.unique(np.concatenate(([0], breaks, [sizes.size])))
+    chunks = [
+        (values[bounds[lo]:bounds[hi]], sizes[lo:hi])
+        for lo, hi in itertools.pairwise(breaks)
+        if hi > lo
+    ]
+    seeds = np.random.SeedSequence(seed).spawn(len(chunks))
+
+    args = (
+        [chunk[0] for chunk in chunks],
+        [chunk[1] for chunk in chunks],
+        [n_boot] * len(chunks),
+        seeds,
+        [chunk_rows * n_boot] * len(chunks),
+    )
+    if len(chunks) > 1 and max_workers != 1:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            samples = list(executor.map(bootstrap_groups, *args))
+    else:
+        samples = list(map(bootstrap_groups, *args))
+
+    samples = np.concatenate(samples, axis=2)  # 3 x n_boot x groups
+
+    # Point estimates
+    late = np.add.reduceat(values[:, 0], bounds[:-1])
+    total = np.add.reduceat(values[:, 1], bounds[:-1])
+    reported = ~np.isnan(values[:, 2])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = late / total
+        mean_min_late = np.add.reduceat(
+            np.where(reported, values[:, 2], 0), bounds[:-1]
+        ) / np.add.reduceat(reported.astype(np.int64), bounds[:-1])
+
+    alpha = (1 - ci) / 2
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", category=RuntimeWarning)  # all-NaN groups
+        lower, upper = np.nanquantile(samples, [alpha, 1 - alpha], axis=1)
+
+    boot_ci = pd.DataFrame({"Train Arrivals": sizes}, index=index)
+    metrics = (
+        "Late to Total Detraining Customers Ratio",
+        "Late Detraining Customers Avg Min Late mean",
+        "Customer OTP",
+    )
+    for i, (metric, estimate) in enumerate(zip(metrics, (ratio, mean_min_late, 1 - ratio))):
+        boot_ci[metric] = estimate
+        boot_ci[f"{metric} CI Lower"] = lower[i]
+        boot_ci[f"{metric} CI Upper"] = upper[i]
+
+    return boot_ci.round(precision).reset_index()
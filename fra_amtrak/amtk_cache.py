@@ -0,0 +1,257 @@
+import collections
+import hashlib
+import numpy as np
+import pandas as pd
+import pathlib as pl
+import pickle
+
+import fra_amtrak.amtk_detrain as detrn
+import fra_amtrak.amtk_metrics as mtrc
+
+
+def create_cache(maxsize=32, dirpath=None):
+    """Creates a bounded least recently used (LRU) cache of summary statistics. At most
+    < maxsize > results are held in memory. If a < dirpath > is provided the cache is persistent:
+    every computed result is written through to < dirpath > (one pickle file per result), so
+    results evicted from memory, or computed by another script or an earlier run sharing the
+    directory, are reloaded rather than recomputed.
+
+    Parameters:
+        maxsize (int): Maximum number of results held in memory
+        dirpath (str|pl.Path): Directory of persisted results; None keeps results in memory only
+
+    Returns:
+        dict: cache entries, settings, and hit/miss counters
+    """
+
+    if dirpath is not None:
+        dirpath = pl.Path(dirpath)
+        dirpath.mkdir(parents=True, exist_ok=True)
+
+    return {
+        "entries": collections.OrderedDict(),
+        "maxsize": maxsize,
+        "dirpath": dirpath,
+        "hits": 0,
+        "misses": 0,
+        "writes": 0,
+    }
+
+
+def get_cached(cache, func, frame, key_columns, *args, **kwargs):
+    """Returns the result of func(< frame >, *< args >, **< kwargs >) from the < cache >. The
+    cache key combines the function name, the fingerprint of the < key_columns > of < frame > (see
+    get_frame_fingerprint()), and the remaining arguments. Results are looked up in memory, then
+    in the cache directory (if any); on a miss the result is computed and, if the cache has a
+    directory, written through to it. Memory hits move the entry to the most recently used
+    position; inserting beyond the cache maxsize drops the least recently used entry from memory.
+
+    A copy of the cached DataFrame is returned so that callers cannot mutate the cached result.
+
+    Parameters:
+        cache (dict): cache (see create_cache())
+        func (func): summary statistics function
+        frame (pd.DataFrame): DataFrame of interest
+        key_columns (list): Columns of < frame > read by < func >
+        args: remaining positional arguments passed to < func >
+        kwargs: keyword arguments passed to < func >
+
+    Returns:
+        pd.DataFrame: DataFrame of summary statistics
+    """
+
+    key = hashlib.sha256(
+        repr(
+            (
+                f"{func.__module__}.{func.__name__}",
+                get_frame_fingerprint(frame, key_columns),
+                args,
+                sorted(kwargs.items()),
+            )
+        ).encode("utf-8")
+    ).hexdigest()
+
+    entries = cache["entries"]
+    if key in entries:
+        entries.move_to_end(key)
+        cache["hits"] += 1
+        return entries[key].copy()
+
+    filepath = cache["dirpath"].joinpath(f"{key}.pkl") if cache["dirpath"] else None
+    if filepath and filepath.exists():
+        with open(filepath, "rb") as file_obj:
+            result = pickle.load(file_obj)
+        cache["hits"] += 1
+    else:
+        result = func(frame, *args, **kwargs)
+        cache["misses"] += 1
+        if filepath:
+            with open(filepath, "wb") as file_obj:
+                pickle.dump(result, file_obj, protocol=pickle.HIGHEST_PROTOCOL)
+            cache["writes"] += 1
+
+    entries[key] = result
+    while len(entries) > cache["maxsize"]:
+        entries.popitem(last=False)
+
+    return result.copy()
+
+
+def get_frame_fingerprint(frame, columns=None):
+    """Computes a fingerprint of the passed in < frame >: a SHA-256 digest of its shape, the names
+    and dtypes of its < columns > (all columns if None), and the row hashes of the < columns >
+    computed with pd.util.hash_pandas_object() (object columns are factorized first, so each
+    distinct label is hashed once). Every row of every key column is hashed, so a change to any
+    value read by the cached function, e.g., a corrected group label, changes the fingerprint.
+    The index is ignored.
+
+    Parameters:
+        frame (pd.DataFrame): DataFrame of interest
+        columns (list): Key columns to hash
+
+    Returns:
+        str: hexadecimal digest
+    """
+
+    columns = frame.columns if columns is None else columns
+    columns = [col for col in dict.fromkeys(columns) if col in frame.columns]
+
+    digest = hashlib.sha256()
+    digest.update(repr((frame.shape, [(col, str(frame[col].dtype)) for col in columns])).encode())
+
+    if columns:
+        hashes = pd.util.hash_pandas_object(frame[columns], index=False).to_numpy()
+        digest.update(hashes.view(np.uint8))
+
+    return digest.hexdigest()
+
+
+def get_route_sum_stats(cache, frame, groups, agg_columns, agg_funcs, columns):
+    """Cached amtk_detrain.get_route_sum_stats() (see get_cached()).
+
+    Parameters:
+        cache (dict): cache (see create_cache())
+        frame (pd.DataFrame): DataFrame of interest
+        groups (list|str): specifies how to group the stations
+        agg_columns (list): List of columns to aggregate
+        agg_funcs (list): List of aggregation functions to compute
+        columns (list): List of <route> columns to retain along with the three new columns
+
+    Returns:
+        pd.DataFrame: DataFrame of station averages along the route
+    """
+
+    key_columns = get_key_columns(groups, agg_columns) + list(columns)
+
+    return get_cached(
+        cache,
+        detrn.get_route_sum_stats,
+        frame,
+        key_columns,
+        groups,
+        list(agg_columns),
+        list(agg_funcs),
+        list(columns),
+    )
+
+
+def get_key_columns(groups, agg_columns):
+    """Returns the columns read by the amtk_detrain summary statistics functions for the passed in
+    < groups > and < agg_columns >.
+
+    Parameters:
+        groups (list|str): group columns
+        agg_columns (list): List of columns to aggregate
+
+    Returns:
+        list: key columns
+    """
+
+    groups = [groups] if isinstance(groups, str) else list(groups or [])
+
+    return groups + list(agg_columns) + ["Late Detraining Customers Avg Min Late"]
+
+
+def get_metrics_by_group(cache, frame, groups, plan, precision=4, **variables):
+    """Cached amtk_metrics.get_metrics_by_group() (see get_cached()). Only column (list|str)
+    < groups > are supported, since functions and dictionaries cannot be fingerprinted.
+
+    Parameters:
+        cache (dict): cache (see create_cache())
+        frame (pd.DataFrame): DataFrame of interest
+        groups (list|str): specifies how to group the stations
+        plan (dict): aggregation plan (see amtk_metrics.compile_metrics())
+        precision (int): Number of decimal places in which to round the metrics
+        variables: run time variables referenced by the derived metrics
+
+    Returns:
+        pd.DataFrame: DataFrame of metrics for each group
+    """
+
+    if not isinstance(groups, (list, str)):
+        raise TypeError("Groups invalid: pass a column name or a list of column names")
+
+    key_columns = [groups] if isinstance(groups, str) else list(groups)
+    key_columns += list(dict.fromkeys(col for col, _ in plan["aggs"].values()))
+
+    return get_cached(
+        cache, mtrc.get_metrics_by_group, frame, key_columns, groups, plan, precision, **variables
+    )
+
+
+def get_sum_stats(cache, frame, agg_columns, agg_funcs):
+    """Cached amtk_detrain.get_sum_stats() (see get_cached()).
+
+    Parameters:
+        cache (dict): cache (see create_cache())
+        frame (pd.DataFrame): DataFrame of interest
+        agg_columns (list): List of columns to aggregate
+        agg_funcs (list): List of aggregation functions to compute
+
+    Returns:
+        pd.DataFrame: DataFrame of summary statistics for detraining passengers
+    """
+
+    return get_cached(
+        cache,
+        detrn.get_sum_stats,
+        frame,
+        get_key_columns(None, agg_columns),
+        list(agg_columns),
+        list(agg_funcs),
+    )
+
+
+def get_sum_stats_by_group(
+    cache, frame, groups, agg_columns, agg_funcs, total_arrivals=None, total_detrain=None
+):
+    """Cached amtk_detrain.get_sum_stats_by_group() (see get_cached()). Only column (list|str)
+    < groups > are supported, since functions and dictionaries cannot be fingerprinted.
+
+    Parameters:
+        cache (dict): cache (see create_cache())
+        frame (pd.DataFrame): DataFrame of interest
+        groups (list|str): specifies how to group the stations
+        agg_columns (list): List of columns to aggregate
+        agg_funcs (list): List of aggregation functions to compute
+        total_arrivals (int): Total number of train arrivals
+        total_detrain (int): Total number of detraining passengers
+
+    Returns:
+        pd.DataFrame: DataFrame of summary statistics for detraining passengers
+    """
+
+    if not isinstance(groups, (list, str)):
+        raise TypeError("Groups invalid: pass a column name or a list of column names")
+
+    return get_cached(
+        cache,
+        detrn.get_sum_stats_by_group,
+        frame,
+        get_key_columns(groups, agg_columns),
+        groups,
+        list(agg_columns),
+        list(agg_funcs),
+        total_arrivals,
+        total_detrain,
+    )
@@ -0,0 +1,216 @@
+import numpy as np
+import pandas as pd
+
+import fra_amtrak.amtk_similarity as sim
+
+
+def assign_clusters(vectors, centroids):
+    """Assigns each row of < vectors > to its nearest centroid. Squared euclidean distances to all
+    < centroids > are computed with a single matrix product.
+
+    Parameters:
+        vectors (np.ndarray): feature vectors (rows x features)
+        centroids (np.ndarray): cluster centroids (clusters x features)
+
+    Returns:
+        tuple: cluster labels and squared distances to the assigned centroids
+    """
+
+    distances = (
+        np.einsum("ij,ij->i", vectors, vectors)[:, None]
+        + np.einsum("ij,ij->i", centroids, centroids)
+        - 2 * vectors @ centroids.T
+    )
+    labels = np.argmin(distances, axis=1)
+
+    return labels, np.maximum(distances[np.arange(labels.size), labels], 0)
+
+
+def fit_kmeans(
+    vectors, k=4, n_init=4, max_iter=100, tol=1.0e-6, batch_size=None, seed=24
+):
+    """Partitions the rows of < vectors > into < k > clusters with k-means. Centroids are seeded
+    with k-means++ and refined with Lloyd iterations in which the assignment step is a single
+    matrix product (see assign_clusters()) and the update step a single np.add.at() scatter.
+
+    If a < batch_size > is provided mini-batch k-means is used instead: each iteration assigns a
+    random batch of rows and moves each centroid toward the mean of its batch rows weighted by
+    the number of rows the centroid has absorbed so far. A final full assignment labels every row.
+
+    The best of < n_init > runs (lowest inertia) is returned. Runs draw from
+    np.random.default_rng(< seed >) and are reproducible.
+
+    Parameters:
+        vectors (np.ndarray): feature vectors (rows x features)
+        k (int): Number of clusters
+        n_init (int): Number of runs with different centroid seeds
+        max_iter (int): Maximum number of iterations per run
+        tol (float): Convergence threshold on the centroid shift
+        batch_size (int): Mini-batch size; None uses full-batch k-means
+        seed (int): Seed for the random generator
+
+    Returns:
+        tuple: cluster labels, centroids, and inertia (sum of squared distances)
+    """
+
+    vectors = np.asarray(vectors, dtype=np.float64)
+    n_rows = vectors.shape[0]
+    k = min(k, n_rows)
+    rng = np.random.default_rng(seed)
+
+    best = None
+    for _ in range(n_init):
+        centroids = init_centroids(vectors, k, rng)
+
+        if batch_size:
+            counts = np.zeros(k)
+            for _ in range(max_iter):
+                batch = vectors[rng.choice(n_rows, size=min(batch_size, n_rows), replace=False)]
+                labels, _ = assign_clusters(batch, centroids)
+
+                sums = np.zeros_like(centroids)
+                np.add.at(sums, labels, batch)
+                batch_counts = np.bincount(labels, minlength=k)
+
+                counts_new = counts + batch_counts
+                updated = batch_counts > 0
+                shifted = centroids.copy()
+                shifted[updated] = (
+                    centroids[updated] * counts[updated, None] + sums[updated]
+                ) / counts_new[updated, None]
+
+                shift = np.sum((shifted - centroids) ** 2)
+                centroids, counts = shifted, counts_new
+                if shift <= tol:
+                    break
+        else:
+            for _ in range(max_iter):
+                labels, distances = assign_clusters(vectors, centroids)
+
+                sums = np.zeros_like(centroids)
+                np.add.at(sums, labels, vectors)
+                counts = np.bincount(labels, minlength=k)
+
+                # Re-seed empty clusters with the rows farthest from their centroids
+                empty = np.flatnonzero(counts == 0)
+                shifted = sums / np.maximum(counts, 1)[:, None]
+                if empty.size:
+                    shifted[empty] = vectors[np.argsort(-distances)[:empty.size]]
+
+                shift = np.sum((shifted - centroids) ** 2)
+                centroids = shifted
+                if shift <= tol:
+                    break
+
+        labels, distances = assign_clusters(vectors, centroids)
+        inertia = distances.sum()
+        if best is None or inertia < best[2]:
+            best = (labels, centroids, inertia)
+
+    return best
+
+
+def get_clusters(
+    frame, entity="Arrival Station Code", k=4, batch_size=None, seed=24, precision=4
+):
+    """Segments every < entity > (e.g., "Arrival Station Code" or "Train Number") in < frame > into
+    < k > behaviour clusters by its quarterly late to total detraining ratio and mean minutes late
+    profile (see amtk_similarity.create_feature_matrix()). Clusters are numbered from 0 in order
+    of increasing mean minutes late.
+
+    The assignments are joined back to the entity dimension (station name, state, region,
+    division, and location for stations) together with each entity's mean and standard deviation
+    (volatility) across quarters of both metrics, so that every entity can be placed and charted
+    in a single run.
+
+    Parameters:
+        frame (pd.DataFrame): DataFrame of interest
+        entity (str): Entity column
+        k (int): Number of clusters
+        batch_size (int): Mini-batch size; None uses full-batch k-means
+        seed (int): Seed for the random generator
+        precision (int): Number of decimal places in which to round the computed metrics
+
+    Returns:
+        tuple: DataFrame of entity cluster assignments and DataFrame of cluster centroids
+    """
+
+    ratio = "Late to Total Detraining Customers Ratio"
+    mean_min_late = "Late Detraining Customers Avg Min Late mean"
+
+    stats = sim.get_profile_stats(frame, entity)
+    features = sim.create_feature_matrix(stats, entity, (ratio, mean_min_late))
+
+    labels, centroids, _ = fit_kmeans(features.to_numpy(), k=k, batch_size=batch_size, seed=seed)
+
+    # Number clusters by increasing mean minutes late
+    is_min_late = features.columns.str.startswith(mean_min_late)
+    order = np.argsort(centroids[:, is_min_late].mean(axis=1), kind="stable")
+    rank = np.empty_like(order)
+    rank[order] = np.arange(order.size)
+    labels, centroids = rank[labels], centroids[order]
+
+    # Entity profile across quarters
+    profile = stats.groupby(entity)[[ratio, mean_min_late]].agg(["mean", "std"])
+    profile.columns = [f"{col} {func}" for col, func in profile.columns]
+    profile = profile.reindex(features.index)
+
+    distances = np.sqrt(((features.to_numpy() - centroids[labels]) ** 2).sum(axis=1))
+    clusters = profile.assign(Cluster=labels, **{"Centroid Distance": distances})
+    clusters.insert(0, "Cluster", clusters.pop("Cluster"))
+
+    # Join back to the entity dimension
+    if entity == "Arrival Station Code":
+        dimension = frame[[
+            entity,
+            "Arrival Station",
+            "State",
+            "Region",
+            "Division",
+            "Latitude",
+            "Longitude",
+        ]].drop_duplicates(entity)
+    else:
+        dimension = frame[[entity, "Service Line", "Service", "Sub Service"]].drop_duplicates(
+            entity
+        )
+    clusters = dimension.merge(clusters.reset_index(), on=entity, how="inner")
+
+    centroids = pd.DataFrame(centroids, columns=features.columns).rename_axis("Cluster")
+    centroids.insert(0, "Members", np.bincount(labels, minlength=centroids.shape[0]))
+
+    return (
+        clusters.sort_values(by=["Cluster", entity], ignore_index=True).round(precision),
+        centroids.round(precision),
+    )
+
+
+def init_centroids(vectors, k, rng):
+    """Seeds < k > centroids from the rows of < vectors > with k-means++: the first centroid is a
+    random row; each further centroid is drawn with probability proportional to the squared
+    distance of each row to its nearest centroid chosen so far.
+
+    Parameters:
+        vectors (np.ndarray): feature vectors (rows x features)
+        k (int): Number of clusters
+        rng (np.random.Generator): random generator
+
+    Returns:
+        np.ndarray: initial centroids (clusters x features)
+    """
+
+    centroids = np.empty((k, vectors.shape[1]))
+    centroids[0] = vectors[rng.integers(vectors.shape[0])]
+    closest = np.sum((vectors - centroids[0]) ** 2, axis=1)
+
+    for i in range(1, k):
+        total = closest.sum()
+        idx = (
+            rng.choice(vectors.shape[0], p=closest / total)
+            if total > 0
+            else rng.integers(vectors.shape[0])
+        )
+        centroids[i] = vectors[idx]
+        closest = np.minimum(closest, np.sum((vectors - centroids[i]) ** 2, axis=1))
+
+    return centroids
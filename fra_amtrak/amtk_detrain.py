@@ -1,3 +1,8 @@
+import numpy as np
+
+import fra_amtrak.amtk_period as prd
+
+
 def assign_color(fiscal_quarter, colors):
     """Returns a color from < colors > based on the passed in
     < fiscal quarter >. The fiscal quarter format is < year >Q< quarter > (e.g., 2024Q3).
@@ -197,18 +202,19 @@ def get_qtr_avg_min_late(frame, columns, column, colors):
         pd.DataFrame: DataFrame of quarterly average late arrival times for detraining passengers
     """
 
-    # Group by fiscal year and quarter and flatten
-    avg_min_late = frame.groupby(columns[:2])[columns].apply(lambda x: x).reset_index(drop=True)
+    # Order by fiscal year and quarter (single stable sort on the period key)
+    avg_min_late = prd.get_period_view(frame, columns, year=columns[0], quarter=columns[1])
 
-    # Add column
-    avg_min_late.loc[:, column] = avg_min_late.apply(format_year_quarter, axis=1)
+    # Add column (vectorized fiscal period keys and labels)
+    keys = prd.get_period_keys(avg_min_late, *columns[:2])
+    avg_min_late.loc[:, column] = prd.get_period_labels(keys)
 
     # Drop columns and reorder
     avg_min_late.drop(columns[:2], axis=1, inplace=True)
     avg_min_late.insert(0, column, avg_min_late.pop(column))
 
     # Assign alternating colors
-    avg_min_late.loc[:, "Color"] = avg_min_late[column].apply(assign_color, colors=colors)
+    avg_min_late.loc[:, "Color"] = prd.assign_period_colors(keys, colors)
 
     return avg_min_late
 
@@ -403,17 +409,22 @@ def get_train_arrivals_by_group(frame, groups):
 
 def predict_avg_min_late_by_distance(result, distance_mi):
     """Given a specified < distance > predicts the average minutes late for late detraining
-    passengers based on the computed linear regression < result >.
+    passengers based on the computed linear regression < result >. The < distance_mi > may be a
+    single value or an array of distances, in which case the predictions are computed in a single
+    vectorized operation.
 
     Parameters:
         result (pd.Series): Series of linear regression coefficients
-        distance_mi (int): distance in miles
+        distance_mi (int|np.ndarray): distance(s) in miles
 
     Returns:
-        float: Predicted average minutes late for late detraining passengers
+        float|np.ndarray: Predicted average minutes late for late detraining passengers
     """
 
     if not hasattr(result, "slope") or not hasattr(result, "intercept"):
         raise ValueError("Result object must have 'slope' and 'intercept' attributes.")
 
+    if np.ndim(distance_mi):
+        distance_mi = np.asarray(distance_mi, dtype=np.float64)
+
     return result.slope * distance_mi + result.intercept
\ No newline at end of file
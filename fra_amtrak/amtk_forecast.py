@@ -0,0 +1,322 @@
+import numpy as np
+import pandas as pd
+import scipy.stats as stats
+
+from concurrent.futures import ProcessPoolExecutor
+
+import fra_amtrak.amtk_period as prd
+import fra_amtrak.amtk_tensor as tns
+
+
+def fit_seasonal_naive(values, horizon=1):
+    """Forecasts every series (row) of < values > with the seasonal naive method: the forecast for
+    a fiscal quarter is the value observed in the same quarter of the previous year. If that value
+    is missing the last observed value is used. The residual standard deviation is estimated from
+    the seasonal (lag 4) differences of each series.
+
+    Parameters:
+        values (np.ndarray): series values (series x contiguous fiscal quarters)
+        horizon (int): Number of fiscal quarters to forecast
+
+    Returns:
+        tuple: forecasts and forecast standard deviations (series x horizon)
+    """
+
+    n_series, n_periods = values.shape
+    steps = np.arange(horizon)
+    last = get_last_observed(values)
+
+    # Same quarter of the most recent year (repeats for horizons beyond a year)
+    season = n_periods - 4 + steps % 4
+    forecast = np.full((n_series, horizon), np.nan)
+    in_range = season >= 0
+    forecast[:, in_range] = values[:, season[in_range]]
+    forecast = np.where(np.isnan(forecast), last[:, None], forecast)
+
+    diffs = values[:, 4:] - values[:, :-4] if n_periods > 4 else np.full((n_series, 1), np.nan)
+    with np.errstate(invalid="ignore"):
+        n_diffs = (~np.isnan(diffs)).sum(axis=1)
+        sigma = np.sqrt(np.nansum(diffs**2, axis=1) / np.maximum(n_diffs, 1))
+    sigma = np.where(n_diffs > 0, sigma, np.nan)
+
+    return forecast, sigma[:, None] * np.sqrt(steps // 4 + 1)
+
+
+def fit_seasonal_ols(values, first_key, horizon=1):
+    """Fits a linear trend plus fiscal quarter seasonal model
+
+        y(t) = a + b * t + s(quarter(t))
+
+    to every series (row) of < values > by least squares. The normal equations of all series are
+    assembled with batched matrix products (each series masks its own missing quarters) and
+    solved at once with np.linalg.solve(). A ridge term of 1e-9 is added to the diagonal of every
+    normal matrix so that the batched solve does not fail on singular systems (e.g., a series that
+    never reports one of the fiscal quarters); it is negligible next to the entries of well-posed
+    systems (results match per-series least squares). Series with too few observations to fit
+    the five coefficients are assigned missing values. Forecast standard deviations include the
+    coefficient uncertainty.
+
+    Parameters:
+        values (np.ndarray): series values (series x contiguous fiscal quarters)
+        first_key (int): Fiscal period key of the first column
+        horizon (int): Number of fiscal quarters to forecast
+
+    Returns:
+        tuple: forecasts and forecast standard deviations (series x horizon)
+    """
+
+    n_periods = values.shape[1]
+    design = get_seasonal_design(first_key, n_periods + horizon)
+    fitted, future = design[:n_periods], design[n_periods:]
+    n_coefs = design.shape[1]
+
+    reported = ~np.isnan(values)
+    weights = reported.astype(np.float64)
+    observed = np.where(reported, values, 0)
+    n_obs = weights.sum(axis=1)
+
+    # Batched normal equations (1e-9 ridge term guards against singular systems)
+    xtx = np.einsum("st,ti,tj->sij", weights, fitted, fitted) + 1.0e-9 * np.eye(n_coefs)
+    xty = np.einsum("st,ti->si", observed, fitted)
+    coefs = np.linalg.solve(xtx, xty[..., None])[..., 0]
+
+    residuals = np.where(reported, values - coefs @ fitted.T, 0)
+    dof = n_obs - n_coefs
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sigma = np.sqrt((residuals**2).sum(axis=1) / dof)
+
+    forecast = coefs @ future.T
+    leverage = np.einsum("hi,sij,hj->sh", future, np.linalg.inv(xtx), future)
+    spread = sigma[:, None] * np.sqrt(1 + leverage)
+
+    fit = (dof > 0)[:, None]
+    return np.where(fit, forecast, np.nan), np.where(fit, spread, np.nan)
+
+
+def fit_ses(values, horizon=1, alphas=(0.1, 0.2, 0.3, 0.5, 0.7, 0.9)):
+    """Forecasts every series (row) of < values > with simple exponential smoothing. All series and
+    all candidate smoothing constants < alphas > are smoothed together (one vectorized update per
+    fiscal quarter); each series keeps the constant with the lowest one-step-ahead squared error.
+    Missing quarters carry the level forward.
+
+    Parameters:
+        values (np.ndarray): series values (series x contiguous fiscal quarters)
+        horizon (int): Number of fiscal quarters to forecast
+        alphas (tuple): Candidate smoothing constants
+
+    Returns:
+        tuple: forecasts and forecast standard deviations (series x horizon)
+    """
+
+    n_series, n_periods = values.shape
+    alphas = np.asarray(alphas, dtype=np.float64)[:, None]
+
+    level = np.full((alphas.size, n_series), np.nan)
+    sse = np.zeros((alphas.size, n_series))
+    n_errors = np.zeros(n_series)
+
+    for t in range(n_periods):
+        obs = values[:, t]
+        reported = ~np.isnan(obs)
+        started = ~np.isnan(level[0])
+
+        error = obs - level
+        scored = reported & started
+        sse += np.where(scored, error**2, 0)
+        n_errors += scored
+
+        updated = np.where(started, level + alphas * error, obs)
+        level = np.where(reported, updated, level)
+
+    best = np.argmin(sse, axis=0)
+    columns = np.arange(n_series)
+    alpha = alphas[best, 0]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sigma = np.sqrt(sse[best, columns] / n_errors)
+    sigma = np.where(n_errors > 0, sigma, np.nan)
+
+    steps = np.arange(horizon)
+    forecast = np.repeat(level[best, columns][:, None], horizon, axis=1)
+
+    return forecast, sigma[:, None] * np.sqrt(1 + steps * alpha[:, None] ** 2)
+
+
+def forecast_series(values, first_key, horizon=1, models=("seasonal naive", "ses", "seasonal ols")):
+    """Fits each of the passed in < models > to every series (row) of < values >. Runs in a single
+    process; get_forecasts() distributes chunks of series across a process pool.
+
+    Parameters:
+        values (np.ndarray): series values (series x contiguous fiscal quarters)
+        first_key (int): Fiscal period key of the first column
+        horizon (int): Number of fiscal quarters to forecast
+        models (tuple): "seasonal naive", "ses", and/or "seasonal ols"
+
+    Returns:
+        dict: model names and tuples of forecasts and forecast standard deviations
+    """
+
+    forecasts = {}
+
+    for model in models:
+        if model == "seasonal naive":
+            forecasts[model] = fit_seasonal_naive(values, horizon)
+        elif model == "ses":
+            forecasts[model] = fit_ses(values, horizon)
+        elif model == "seasonal ols":
+            forecasts[model] = fit_seasonal_ols(values, first_key, horizon)
+        else:
+            raise ValueError("Model invalid: choose seasonal naive, ses, or seasonal ols")
+
+    return forecasts
+
+
+def get_forecasts(
+    frame,
+    horizon=1,
+    models=("seasonal naive", "ses", "seasonal ols"),
+    ci=0.95,
+    min_periods=4,
+    max_workers=1,
+    chunk_series=5_000,
+    precision=4,
+):
+    """Forecasts total detraining customers, the late to total detraining customers ratio, and
+    the average minutes late for late detraining customers for the next < horizon > fiscal
+    quarters of every train and station series in < frame >.
+
+    The fact table is pivoted once into train x station x fiscal quarter arrays (see
+    amtk_tensor.create_tensor()); series with fewer than < min_periods > reported quarters are
+    skipped. Every model is fitted to all series at once with array operations (see
+    forecast_series()). The chunks of < chunk_series > series are fitted serially by default; if
+    there is more than one chunk and < max_workers > is not 1 (None uses every CPU), they are
+    fitted in parallel in a process pool. Parallel calls must run under an
+    if __name__ == "__main__" guard where worker processes are spawned (macOS, Windows).
+
+    Parameters:
+        frame (pd.DataFrame): DataFrame of interest
+        horizon (int): Number of fiscal quarters to forecast
+        models (tuple): "seasonal naive", "ses", and/or "seasonal ols"
+        ci (float): Prediction interval confidence level
+        min_periods (int): Minimum number of reported quarters required to forecast a series
+        max_workers (int): Maximum number of worker processes; 1 fits serially
+        chunk_series (int): Number of series fitted per chunk
+        precision (int): Number of decimal places in which to round the forecasts
+
+    Returns:
+        pd.DataFrame: DataFrame of forecasts and prediction intervals
+    """
+
+    tensor = tns.create_tensor(frame)
+    keys = tensor["Fiscal Period Key"]
+    n_trains, n_stations = tensor["Train Number"].size, tensor["Arrival Station Code"].size
+
+    # Contiguous fiscal quarters (gaps become missing columns)
+    first_key = int(keys[0])
+    n_periods = int(keys[-1]) - first_key + 1
+
+    total = tensor["Total Detraining Customers"].reshape(-1, keys.size)
+    late = tensor["Late Detraining Customers"].reshape(-1, keys.size)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        late_share = np.where(total > 0, late / total, np.nan)
+
+    series = np.flatnonzero((~np.isnan(total)).sum(axis=1) >= min_periods)
+    trains, stations = np.unravel_index(series, (n_trains, n_stations))
+
+    metrics = {
+        "Total Detraining Customers": total,
+        "Late to Total Detraining Customers Ratio": late_share,
+        "Late Detraining Customers Avg Min Late": tensor[
+            "Late Detraining Customers Avg Min Late"
+        ].reshape(-1, keys.size),
+    }
+
+    # Stack metrics as rows: (metrics * series) x contiguous quarters
+    values = np.full((len(metrics) * series.size, n_periods), np.nan)
+    for i, metric in enumerate(metrics.values()):
+        values[i * series.size:(i + 1) * series.size, keys - first_key] = metric[series]
+
+    chunks = [
+        values[start:start + chunk_series] for start in range(0, values.shape[0], chunk_series)
+    ]
+    args = (
+        chunks,
+        [first_key] * len(chunks),
+        [horizon] * len(chunks),
+        [models] * len(chunks),
+    )
+    if len(chunks) > 1 and max_workers != 1:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(forecast_series, *args))
+    else:
+        results = list(map(forecast_series, *args))
+
+    z_value = stats.norm.ppf(0.5 + ci / 2)
+    target_keys = first_key + n_periods + np.arange(horizon)
+    n_rows = values.shape[0]
+
+    tables = []
+    for model in models:
+        forecast = np.vstack([result[model][0] for result in results])
+        sigma = np.vstack([result[model][1] for result in results])
+
+        tables.append(
+            pd.DataFrame({
+                "Train Number": np.tile(tensor["Train Number"][trains], len(metrics) * horizon),
+                "Arrival Station Code": np.tile(
+                    tensor["Arrival Station Code"][stations], len(metrics) * horizon
+                ),
+                "Metric": np.tile(np.repeat(list(metrics), series.size), horizon),
+                "Model": model,
+                "Fiscal Period Key": np.repeat(target_keys, n_rows),
+                "Forecast": forecast.ravel(order="F"),
+                "Lower": (forecast - z_value * sigma).ravel(order="F"),
+                "Upper": (forecast + z_value * sigma).ravel(order="F"),
+            })
+        )
+
+    forecasts = pd.concat(tables, ignore_index=True)
+
+    period_keys = forecasts.pop("Fiscal Period Key").to_numpy()
+    years, quarters = np.divmod(period_keys, 4)
+    forecasts.insert(2, "Fiscal Year", years)
+    forecasts.insert(3, "Fiscal Quarter", quarters + 1)
+    forecasts.insert(4, "Fiscal Year Quarter", prd.get_period_labels(period_keys))
+
+    return forecasts.round(precision)
+
+
+def get_last_observed(values):
+    """Returns the last non-missing value of every series (row) of < values >.
+
+    Parameters:
+        values (np.ndarray): series values (series x fiscal quarters)
+
+    Returns:
+        np.ndarray: last observed values (missing if a series has no values)
+    """
+
+    reported = ~np.isnan(values)
+    last = values.shape[1] - 1 - np.argmax(reported[:, ::-1], axis=1)
+
+    return np.where(reported.any(axis=1), values[np.arange(values.shape[0]), last], np.nan)
+
+
+def get_seasonal_design(first_key, n_periods):
+    """Returns the design matrix of the seasonal trend model: an intercept, a linear time index,
+    and indicator columns for fiscal quarters 2, 3, and 4 (quarter 1 is the baseline).
+
+    Parameters:
+        first_key (int): Fiscal period key of the first row
+        n_periods (int): Number of fiscal quarters (rows)
+
+    Returns:
+        np.ndarray: design matrix (fiscal quarters x 5)
+    """
+
+    t = np.arange(n_periods, dtype=np.float64)
+    quarter = (first_key + np.arange(n_periods)) % 4  # 0 = fiscal quarter 1
+
+    return np.column_stack([np.ones(n_periods), t] + [quarter == q for q in (1, 2, 3)]).astype(
+        np.float64
+    )
@@ -18,7 +18,7 @@ def aggregate_data(frame, columns, k=1.5):
     """
 
     # Compute aggregation statistics
-    agg_stats = frame.groupby(columns[0])[[columns[1]]].describe().reset_index()
+    agg_stats = frame.groupby(columns[0], observed=True)[[columns[1]]].describe().reset_index()
 
     # Rename columns
     agg_stats.columns = [columns[0], "count", "mean", "std", "min", "25%", "50%", "75%", "max"]
@@ -34,13 +34,19 @@ def aggregate_data(frame, columns, k=1.5):
     # Add lower bound
     mask_lower = data_points[columns[1]] >= data_points["min_"]
     agg_stats["lower"] = (
-        data_points[mask_lower].groupby(columns[0])[columns[1]].min().reset_index(drop=True)
+        data_points[mask_lower]
+        .groupby(columns[0], observed=True)[columns[1]]
+        .min()
+        .reset_index(drop=True)
     )
 
     # Add upper bound
     mask_upper = data_points[columns[1]] <= data_points["max_"]
     agg_stats["upper"] = (
-        data_points[mask_upper].groupby(columns[0])[columns[1]].max().reset_index(drop=True)
+        data_points[mask_upper]
+        .groupby(columns[0], observed=True)[columns[1]]
+        .max()
+        .reset_index(drop=True)
     )
 
     # Calculate outliers separately
@@ -48,7 +54,11 @@ def aggregate_data(frame, columns, k=1.5):
         (data_points[columns[1]] < data_points["min_"])
         | (data_points[columns[1]] > data_points["max_"])
     ]
-    outliers = outliers.groupby(columns[0])[columns[1]].apply(list).reset_index(name="outliers")
+    outliers = (
+        outliers.groupby(columns[0], observed=True)[columns[1]]
+        .apply(list)
+        .reset_index(name="outliers")
+    )
 
     # Initialize the 'outliers' column with empty lists and set dtype to object.
     agg_stats["outliers"] = [[] for _ in range(len(agg_stats))]
@@ -0,0 +1,218 @@
+import numpy as np
+import pandas as pd
+import scipy.sparse as sparse
+import scipy.sparse.csgraph as csgraph
+
+import fra_amtrak.amtk_route as rte
+
+
+def create_graph(frame, stop_order=None, directions=None, station_orders=None):
+    """Builds a sparse graph representation of the Amtrak network from the passed in < frame >.
+    Stations, trains, and sub services are factorized into sorted integer codes and linked by
+    scipy.sparse CSR matrices:
+
+        station_train: stations x trains incidence (1 if the train serves the station)
+        train_sub_service: trains x sub services incidence (1 if the train belongs to the sub
+            service)
+        adjacency: stations x stations symmetric adjacency; each edge joins consecutive stops in
+            route order and is weighted by the number of trains that serve it
+
+    If no < stop_order > is provided it is derived from < frame > by amtk_route.get_stop_order()
+    using the optional < directions > and < station_orders > mappings.
+
+    Parameters:
+        frame (pd.DataFrame): DataFrame of interest
+        stop_order (pd.DataFrame): Train Number, Arrival Station Code, and Stop Order columns
+        directions (dict): train numbers and their direction of travel
+        station_orders (dict): train numbers and dictionaries of station codes and their order
+
+    Returns:
+        dict: node labels and sparse matrices
+    """
+
+    trn, code, sub_svc = "Train Number", "Arrival Station Code", "Sub Service"
+
+    if stop_order is None:
+        stop_order = rte.get_stop_order(frame, directions, station_orders)
+
+    stations = pd.Index(np.sort(frame[code].dropna().unique()), name=code)
+    trains = pd.Index(np.sort(frame[trn].dropna().unique()), name=trn)
+    sub_services = pd.Index(np.sort(frame[sub_svc].dropna().unique()), name=sub_svc)
+
+    # Station x train incidence
+    pairs = frame[[code, trn]].dropna().drop_duplicates()
+    rows, cols = stations.get_indexer(pairs[code]), trains.get_indexer(pairs[trn])
+    station_train = sparse.csr_matrix(
+        (np.ones(rows.size), (rows, cols)), shape=(stations.size, trains.size)
+    )
+
+    # Train x sub service incidence
+    pairs = frame[[trn, sub_svc]].dropna().drop_duplicates()
+    rows, cols = trains.get_indexer(pairs[trn]), sub_services.get_indexer(pairs[sub_svc])
+    train_sub_service = sparse.csr_matrix(
+        (np.ones(rows.size), (rows, cols)), shape=(trains.size, sub_services.size)
+    )
+
+    # Consecutive stops in route order
+    stops = stop_order.sort_values(by=[trn, "Stop Order"])
+    prev_code = stops.groupby(trn, sort=False)[code].shift(1)
+    edges = prev_code.notna().to_numpy()
+    rows = stations.get_indexer(prev_code[edges])
+    cols = stations.get_indexer(stops.loc[edges, code])
+    valid = (rows >= 0) & (cols >= 0) & (rows != cols)
+    rows, cols = rows[valid], cols[valid]
+
+    adjacency = sparse.csr_matrix(
+        (np.ones(rows.size), (rows, cols)), shape=(stations.size, stations.size)
+    )
+    adjacency = (adjacency + adjacency.T).tocsr()  # undirected; duplicates are summed
+
+    return {
+        "stations": stations,
+        "trains": trains,
+        "sub_services": sub_services,
+        "station_train": station_train,
+        "train_sub_service": train_sub_service,
+        "adjacency": adjacency,
+    }
+
+
+def get_connected_components(graph):
+    """Labels each station in < graph > with the connected component of the station adjacency
+    matrix to which it belongs (e.g., isolated or disconnected route segments). Components are
+    numbered from 0 in order of decreasing size.
+
+    Parameters:
+        graph (dict): node labels and sparse matrices (see create_graph())
+
+    Returns:
+        pd.Series: Series of component labels indexed by station code
+    """
+
+    _, labels = csgraph.connected_components(graph["adjacency"], directed=False)
+
+    # Renumber components by size (largest first)
+    sizes = np.bincount(labels)
+    rank = np.empty_like(sizes)
+    rank[np.argsort(-sizes, kind="stable")] = np.arange(sizes.size)
+
+    return pd.Series(rank[labels], index=graph["stations"], name="Component")
+
+
+def get_neighbour_mean(graph, values):
+    """Computes the adjacency-weighted mean of the neighbouring stations' < values > for every
+    station in < graph > with two sparse matrix-vector products. Missing values are ignored;
+    stations without valued neighbours are assigned missing values.
+
+    Parameters:
+        graph (dict): node labels and sparse matrices (see create_graph())
+        values (np.ndarray): station values aligned to graph["stations"]
+
+    Returns:
+        np.ndarray: neighbour means aligned to graph["stations"]
+    """
+
+    adjacency = graph["adjacency"]
+    reported = ~np.isnan(values)
+
+    weights = adjacency @ reported.astype(np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        neighbour_mean = (adjacency @ np.where(reported, values, 0)) / weights
+
+    return np.where(weights > 0, neighbour_mean, np.nan)
+
+
+def get_route_overlap(graph, level="Sub Service"):
+    """Counts the stations shared by every pair of routes in < graph > with a single sparse
+    product of the station incidence matrix with itself. The < level > determines whether routes
+    are compared by "Sub Service" or by "Train Number". The diagonal holds the number of stations
+    each route serves.
+
+    Parameters:
+        graph (dict): node labels and sparse matrices (see create_graph())
+        level (str): "Sub Service" or "Train Number"
+
+    Returns:
+        pd.DataFrame: DataFrame of shared station counts (routes x routes)
+    """
+
+    if level == "Sub Service":
+        incidence = graph["station_train"] @ graph["train_sub_service"]
+        incidence.data = np.ones_like(incidence.data)  # binarize
+        labels = graph["sub_services"]
+    elif level == "Train Number":
+        incidence = graph["station_train"]
+        labels = graph["trains"]
+    else:
+        raise ValueError("Level invalid: choose Sub Service or Train Number")
+
+    overlap = (incidence.T @ incidence).toarray().astype(np.int64)
+
+    return pd.DataFrame(overlap, index=labels, columns=labels)
+
+
+def get_station_degree(graph):
+    """Computes the degree of each station in < graph >: the number of trains that serve the
+    station, the number of sub services that serve the station, and the number of adjacent
+    stations (consecutive stops on any route).
+
+    Parameters:
+        graph (dict): node labels and sparse matrices (see create_graph())
+
+    Returns:
+        pd.DataFrame: DataFrame of station degrees indexed by station code
+    """
+
+    station_sub_service = graph["station_train"] @ graph["train_sub_service"]
+
+    return pd.DataFrame(
+        {
+            "Trains Served": np.diff(graph["station_train"].indptr),
+            "Sub Services Served": np.diff(station_sub_service.tocsr().indptr),
+            "Adjacent Stations": np.diff(graph["adjacency"].indptr),
+        },
+        index=graph["stations"],
+    )
+
+
+def propagate_delay(graph, values, alpha=0.5, steps=1):
+    """Propagates a station delay metric across neighbouring stations. The < values > (e.g., mean
+    minutes late by station code) are aligned to the stations in < graph >; stations without a
+    value are treated as missing. Each step blends a station's own value with the mean of its
+    neighbours' current values (see get_neighbour_mean()):
+
+        x(k + 1) = (1 - < alpha >) * x(0) + < alpha > * neighbour mean of x(k)
+
+    Stations without a value of their own take the neighbour mean; stations with no value and no
+    valued neighbours remain missing.
+
+    Parameters:
+        graph (dict): node labels and sparse matrices (see create_graph())
+        values (pd.Series): Series of station values indexed by station code
+        alpha (float): Weight assigned to the neighbour mean
+        steps (int): Number of propagation steps
+
+    Returns:
+        pd.DataFrame: DataFrame of station, neighbour mean, and propagated values
+    """
+
+    initial = values.reindex(graph["stations"]).to_numpy(dtype=np.float64, na_value=np.nan)
+
+    current = initial
+    for _ in range(steps):
+        neighbour_mean = get_neighbour_mean(graph, current)
+        blended = np.where(
+            np.isnan(neighbour_mean), initial, (1 - alpha) * initial + alpha * neighbour_mean
+        )
+        current = np.where(np.isnan(initial), neighbour_mean, blended)
+
+    name = values.name or "Value"
+
+    return pd.DataFrame(
+        {
+            name: initial,
+            f"{name} neighbour mean": get_neighbour_mean(graph, initial),
+            f"{name} propagated": current,
+        },
+        index=graph["stations"],
+    )
@@ -0,0 +1,199 @@
+import numpy as np
+import pandas as pd
+import scipy.sparse as sparse
+import scipy.stats as stats
+
+import fra_amtrak.amtk_period as prd
+
+
+def create_host_frame(attributed, hosts, host_miles, precision=2):
+    """Returns a DataFrame of attributed host delay. The < attributed > array holds late
+    detraining customers, minutes late, and total detraining customers (one row per host).
+    Derived ratios are computed from the attributed totals. Hosts are ranked by minutes late.
+
+    Parameters:
+        attributed (np.ndarray): attributed metrics (hosts x 3)
+        hosts (np.ndarray): host railroad names
+        host_miles (np.ndarray): route miles operated over each host
+        precision (int): Number of decimal places in which to round the computed metrics
+
+    Returns:
+        pd.DataFrame: DataFrame of host railroads and attributed delay
+    """
+
+    late, minutes, total = attributed[:, 0], attributed[:, 1], attributed[:, 2]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        host_delay = pd.DataFrame({
+            "Host": hosts,
+            "Host Miles": host_miles,
+            "Total Detraining Customers": total,
+            "Late Detraining Customers": late,
+            "Late Detraining Customers Min Late": minutes,
+            "Late Detraining Customers Avg Min Late": minutes / late,
+            "Late to Total Detraining Customers Ratio": late / total,
+            "Min Late per Host Mile": minutes / host_miles,
+        })
+
+    host_delay["Rank"] = stats.rankdata(-minutes, method="min")
+
+    return host_delay.round(precision)
+
+
+def get_host_delay(frame, sub_services, precision=2):
+    """Apportions late detraining customers and minutes late to host railroads across the entire
+    network. Each sub service's totals are split among its hosts in proportion to the miles each
+    host contributes to the route (see get_host_weights()). The attribution for all hosts is
+    computed with a single sparse matrix product; hosts are ranked by minutes late.
+
+    Parameters:
+        frame (pd.DataFrame): DataFrame of interest
+        sub_services (list): sub service dictionaries (see amtk_sub_services.json)
+        precision (int): Number of decimal places in which to round the computed metrics
+
+    Returns:
+        pd.DataFrame: DataFrame of host railroads and attributed delay, ranked
+    """
+
+    weights, sub_names, hosts, host_miles = get_host_weights(sub_services)
+    _, matrix = get_sub_service_matrix(frame, sub_names)
+
+    # (hosts x sub services) @ (sub services x metrics)
+    attributed = np.asarray(weights.T @ matrix[0])
+
+    return create_host_frame(attributed, hosts, host_miles, precision).sort_values(
+        by="Rank", ignore_index=True
+    )
+
+
+def get_host_delay_by_period(frame, sub_services, precision=2):
+    """Apportions late detraining customers and minutes late to host railroads by fiscal
+    quarter. Each sub service's quarterly totals are split among its hosts in proportion to the
+    miles each host contributes to the route. All quarters are attributed with a single sparse
+    matrix product; hosts are ranked by minutes late within each quarter.
+
+    Parameters:
+        frame (pd.DataFrame): DataFrame of interest
+        sub_services (list): sub service dictionaries (see amtk_sub_services.json)
+        precision (int): Number of decimal places in which to round the computed metrics
+
+    Returns:
+        pd.DataFrame: DataFrame of fiscal quarters, host railroads, and attributed delay, ranked
+    """
+
+    weights, sub_names, hosts, host_miles = get_host_weights(sub_services)
+    keys, matrix = get_sub_service_matrix(frame, sub_names, by_period=True)
+    n_periods, n_subs, n_metrics = matrix.shape
+
+    # Stack periods and metrics as columns: (sub services x periods * metrics)
+    stacked = matrix.transpose(1, 0, 2).reshape(n_subs, n_periods * n_metrics)
+    attributed = np.asarray(weights.T @ stacked)
+
+    # (hosts x periods x metrics) -> (periods * hosts x metrics), period major
+    attributed = attributed.reshape(hosts.size, n_periods, n_metrics).transpose(1, 0, 2)
+    attributed = attributed.reshape(n_periods * hosts.size, n_metrics)
+
+    host_delay = create_host_frame(
+        attributed, np.tile(hosts, n_periods), np.tile(host_miles, n_periods), precision
+    )
+
+    # Rank hosts within each period
+    minutes = attributed[:, 1].reshape(n_periods, hosts.size)
+    host_delay["Rank"] = stats.rankdata(-minutes, method="min", axis=1).ravel()
+
+    period_keys = np.repeat(keys, hosts.size)
+    years, quarters = np.divmod(period_keys, 4)
+    host_delay.insert(0, "Fiscal Year", years)
+    host_delay.insert(1, "Fiscal Quarter", quarters + 1)
+    host_delay.insert(2, "Fiscal Year Quarter", prd.get_period_labels(period_keys))
+
+    return host_delay.sort_values(by=["Fiscal Year", "Fiscal Quarter", "Rank"], ignore_index=True)
+
+
+def get_host_weights(sub_services):
+    """Expands each sub service into a host-mile vector. Returns a sparse CSR matrix of
+    sub service by host weights in which each row holds the share of the sub service's route miles
+    operated over each host (rows sum to 1; sub services without host miles are left empty).
+
+    Parameters:
+        sub_services (list): sub service dictionaries (see amtk_sub_services.json)
+
+    Returns:
+        tuple: sparse weight matrix, sub service names, host names, and total miles per host
+    """
+
+    sub_names = np.array([sub_svc["sub service"] for sub_svc in sub_services], dtype=object)
+
+    entries = [
+        (row, host["host"], host["miles"])
+        for row, sub_svc in enumerate(sub_services)
+        for host in sub_svc["hosts"]
+    ]
+    rows = np.array([entry[0] for entry in entries], dtype=np.int64)
+    miles = np.array([entry[2] for entry in entries], dtype=np.float64)
+    hosts, cols = np.unique(
+        np.array([entry[1] for entry in entries], dtype=object), return_inverse=True
+    )
+
+    shape = (sub_names.size, hosts.size)
+    host_miles = sparse.csr_matrix((miles, (rows, cols)), shape=shape)
+
+    # Normalize each row by the sub service's route miles
+    route_miles = np.asarray(host_miles.sum(axis=1)).ravel()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        scale = np.where(route_miles > 0, 1 / route_miles, 0)
+    weights = sparse.diags(scale) @ host_miles
+
+    return (
+        weights.tocsr(),
+        sub_names,
+        hosts,
+        np.asarray(host_miles.sum(axis=0)).ravel(),
+    )
+
+
+def get_sub_service_matrix(frame, sub_names, by_period=False):
+    """Accumulates late detraining customers, minutes late (late detraining customers multiplied by
+    their average minutes late), and total detraining customers for each sub service in
+    < sub_names >. Rows are matched on the "Sub Service" column; rows belonging to other sub
+    services are ignored. If < by_period > is True the totals are also split by fiscal quarter.
+
+    Parameters:
+        frame (pd.DataFrame): DataFrame of interest
+        sub_names (np.ndarray): sub service names (matrix row order)
+        by_period (bool): Split the totals by fiscal quarter
+
+    Returns:
+        tuple: sorted fiscal period keys and an array of totals (periods x sub services x 3)
+    """
+
+    sub_codes = pd.Categorical(frame["Sub Service"], categories=sub_names).codes.astype(np.int64)
+
+    if by_period:
+        keys, period_codes = np.unique(
+            prd.get_period_keys(frame, "Fiscal Year", "Fiscal Quarter"), return_inverse=True
+        )
+    else:
+        keys, period_codes = np.zeros(1, dtype=np.int64), np.zeros(len(frame), dtype=np.int64)
+
+    # Missing periods (key -1) sort first; drop them
+    n_missing = int((keys < 0).sum())
+    keys, period_codes = keys[n_missing:], period_codes - n_missing
+
+    late = frame["Late Detraining Customers"].to_numpy(dtype=np.float64, na_value=np.nan)
+    avg_min_late = frame["Late Detraining Customers Avg Min Late"].to_numpy(
+        dtype=np.float64, na_value=np.nan
+    )
+    total = frame["Total Detraining Customers"].to_numpy(dtype=np.float64, na_value=np.nan)
+    metrics = np.nan_to_num(np.column_stack((late, late * avg_min_late, total)))
+
+    # Ignore rows outside the sub service list or missing a fiscal period
+    mask = (sub_codes >= 0) & (period_codes >= 0)
+
+    flat = period_codes[mask] * sub_names.size + sub_codes[mask]
+    size = keys.size * sub_names.size
+    matrix = np.column_stack([
+        np.bincount(flat, weights=metrics[mask, i], minlength=size) for i in range(3)
+    ])
+
+    return keys, matrix.reshape(keys.size, sub_names.size, 3)
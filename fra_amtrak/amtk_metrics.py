@@ -0,0 +1,155 @@
+import pandas as pd
+import re
+
+
+def compile_metrics(metrics, agg_columns, agg_funcs, names=None):
+    """Compiles the declarative < metrics > spec (the notebook.toml [metrics] table) into a single
+    aggregation plan for the requested metric < names > (every [metrics.base] entry and derived
+    metric if None). The base aggregates are every < agg_columns > x < agg_funcs > pair (named
+    "< column > < func >", as in amtk_detrain.compute_sum_stats_by_group()) plus the
+    [metrics.base] entries (name = [column, func]). Every other entry of < metrics > (except
+    "order") is a derived metric: a DataFrame.eval() expression that references aggregates or
+    other derived metrics by backtick-quoted name and run time variables (e.g., network totals)
+    as @name, or a table with the expression ("expr") and a "round" flag.
+
+    References are resolved recursively; the derived metrics are ordered so that every metric is
+    evaluated after the metrics it references. Only the base aggregates that are part of the
+    < agg_columns > x < agg_funcs > grid or that are referenced are computed. The output columns
+    follow the "order" list of < metrics > ("agg" marks the grid); metrics that are not listed
+    follow in < names > order.
+
+    Parameters:
+        metrics (dict): metrics spec
+        agg_columns (list): List of columns to aggregate
+        agg_funcs (list): List of aggregation functions to compute
+        names (list): Metrics (derived or base aggregates) to compute
+
+    Returns:
+        dict: aggregation plan (named aggregations, ordered expressions, output columns)
+    """
+
+    grid = {f"{col} {func}": (col, func) for col in agg_columns for func in agg_funcs}
+    base = grid | {name: tuple(spec) for name, spec in metrics.get("base", {}).items()}
+    derived = {
+        name: spec if isinstance(spec, dict) else {"expr": spec}
+        for name, spec in metrics.items()
+        if name not in ("base", "order")
+    }
+    order = metrics.get("order", [])
+
+    if names is None:
+        names = [name for name in order if name != "agg"]
+        names += [
+            name for name in list(metrics.get("base", {})) + list(derived) if name not in names
+        ]
+
+    columns = []
+    for name in order if "agg" in order else ["agg", *order]:
+        if name == "agg":
+            columns += list(grid)
+        elif name in names and name not in grid:
+            columns.append(name)
+    columns += [name for name in names if name not in columns and name not in grid]
+
+    plan = {"aggs": dict(grid), "exprs": {}, "columns": columns}
+    for name in names:
+        resolve_metric(name, base, derived, plan)
+
+    return plan
+
+
+def get_metrics_by_group(frame, groups, plan, precision=4, **variables):
+    """Computes the metrics of the compiled < plan > (see compile_metrics()) for the specified
+    < groups >. All base aggregates are computed in one DataFrameGroupBy.agg() call (named
+    aggregations) and rounded to < precision > decimal places; the derived metrics are then
+    evaluated column-wise with DataFrame.eval(), in dependency order, with the passed in
+    < variables > (e.g., total_arrivals, total_detrain) available as @name. Derived metrics are
+    rounded to < precision > only if their spec sets "round". As with
+    amtk_detrain.get_sum_stats_by_group(), metrics whose variables are not provided (or are 0)
+    are omitted, along with any metrics that reference them.
+
+    Parameters:
+        frame (pd.DataFrame): DataFrame of interest
+        groups (list|str): specifies how to group the stations
+        plan (dict): aggregation plan
+        precision (int): Number of decimal places in which to round the metrics
+        variables: run time variables referenced by the derived metrics
+
+    Returns:
+        pd.DataFrame: DataFrame of metrics for each group
+    """
+
+    stats = (
+        frame.groupby(groups, observed=True)
+        .agg(
+            **{
+                name: pd.NamedAgg(column=col, aggfunc=func)
+                for name, (col, func) in plan["aggs"].items()
+            }
+        )
+        .round(precision)
+        .reset_index()
+    )
+    group_columns = [col for col in stats.columns if col not in plan["aggs"]]
+
+    for name, metric in plan["exprs"].items():
+        if all(variables.get(var) for var in metric["variables"]) and all(
+            ref in stats.columns for ref in metric["refs"]
+        ):
+            values = stats.eval(metric["expr"], local_dict=variables)
+            stats[name] = values.round(precision) if metric["round"] else values
+
+    return stats[group_columns + [col for col in plan["columns"] if col in stats.columns]]
+
+
+def get_references(expr):
+    """Returns the backtick-quoted names (aggregates or metrics) and the @ prefixed run time
+    variables referenced by the passed in metric < expr >.
+
+    Parameters:
+        expr (str): DataFrame.eval() expression
+
+    Returns:
+        tuple: list of referenced names and list of referenced variables
+    """
+
+    return re.findall(r"`([^`]+)`", expr), re.findall(r"@(\w+)", expr)
+
+
+def resolve_metric(name, base, derived, plan, path=()):
+    """Adds the metric < name > and, recursively, every aggregate and metric it references to the
+    aggregation < plan > (see compile_metrics()). Derived metrics are added after their
+    references, so the insertion order of the plan expressions is a valid evaluation order.
+
+    Parameters:
+        name (str): metric name
+        base (dict): base aggregates (name = (column, func))
+        derived (dict): derived metric specs (expression and round flag)
+        plan (dict): aggregation plan (updated in place)
+        path (tuple): metrics being resolved (guards against circular references)
+
+    Returns:
+        None
+    """
+
+    if name in plan["aggs"] or name in plan["exprs"]:
+        return
+    if name in path:
+        raise ValueError(f"Metric invalid: {name} references itself")
+    if name in base:
+        plan["aggs"][name] = base[name]
+        return
+    if name not in derived:
+        raise ValueError(f"Metric invalid: {name} is not a base aggregate or derived metric")
+
+    expr = derived[name]["expr"]
+    refs, variables = get_references(expr)
+    for ref in refs:
+        resolve_metric(ref, base, derived, plan, path + (name,))
+
+    plan["exprs"][name] = {
+        "expr": expr,
+        "refs": refs,
+        "variables": variables,
+        "round": derived[name].get("round", False),
+    }
@@ -0,0 +1,166 @@
+import numpy as np
+import pandas as pd
+import scipy.stats as stats
+
+
+def compute_linregress(sums):
+    """Computes scipy.stats.linregress() style coefficients from a DataFrame of sufficient
+    statistics (one row per group). The < sums > DataFrame must include the columns n, sum_x, sum_y,
+    sum_xy, sum_xx, and sum_yy.
+
+    Parameters:
+        sums (pd.DataFrame): DataFrame of sufficient statistics
+
+    Returns:
+        pd.DataFrame: DataFrame of n, slope, intercept, rvalue, pvalue, stderr, and intercept_stderr
+    """
+
+    n = sums["n"].to_numpy(dtype=np.float64)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        xmean = sums["sum_x"].to_numpy() / n
+        ymean = sums["sum_y"].to_numpy() / n
+
+        # Biased (co)variances, as in linregress()
+        ssxm = np.maximum(sums["sum_xx"].to_numpy() / n - xmean**2, 0)
+        ssym = np.maximum(sums["sum_yy"].to_numpy() / n - ymean**2, 0)
+        ssxym = sums["sum_xy"].to_numpy() / n - xmean * ymean
+
+        # Guard against round-off when x (or y) is constant
+        ssxm = np.where(ssxm <= 1.0e-12 * xmean**2, 0, ssxm)
+        ssym = np.where(ssym <= 1.0e-12 * ymean**2, 0, ssym)
+
+        r = np.where(
+            (ssxm == 0) | (ssym == 0), 0.0, np.clip(ssxym / np.sqrt(ssxm * ssym), -1.0, 1.0)
+        )
+        slope = np.where(ssxm > 0, ssxym / ssxm, np.nan)
+        intercept = ymean - slope * xmean
+
+        df = n - 2
+        tiny = 1.0e-20
+        t = r * np.sqrt(df / ((1.0 - r + tiny) * (1.0 + r + tiny)))
+        pvalue = 2 * stats.t.sf(np.abs(t), df)
+        slope_stderr = np.sqrt((1 - r**2) * ssym / ssxm / df)
+
+        # Two data points: perfect fit
+        two = n == 2
+        pvalue = np.where(two, np.where(ssym == 0, 1.0, 0.0), pvalue)
+        slope_stderr = np.where(two, 0.0, slope_stderr)
+        intercept_stderr = slope_stderr * np.sqrt(ssxm + xmean**2)
+
+    coefs = pd.DataFrame(
+        {
+            "n": n.astype(np.int64),
+            "slope": slope,
+            "intercept": intercept,
+            "rvalue": r,
+            "pvalue": pvalue,
+            "stderr": slope_stderr,
+            "intercept_stderr": intercept_stderr,
+        },
+        index=sums.index,
+    )
+
+    # No defined slope
+    coefs.loc[np.isnan(slope) | (n < 2), coefs.columns[1:]] = np.nan
+
+    return coefs
+
+
+def fit_linregress_by_group(
+    frame,
+    x="Route Miles",
+    y="Late Detraining Customers Avg Min Late",
+    columns=("Service Line", "Service", "Sub Service"),
+    network=True,
+):
+    """Fits a least-squares regression of < y > on < x > for every group of every grouping level
+    in < columns > (plus the entire network if < network > is True) in a single pass. The results
+    match scipy.stats.linregress() fitted separately on each group.
+
+    Rows missing an < x > or < y > value are dropped. The sufficient statistics (n, sum x, sum y,
+    sum xy, sum x^2, sum y^2) are accumulated once at the finest grouping and rolled up to the
+    coarser levels; the coefficients are then computed for all groups with array arithmetic.
+    Groups in which every < x > value is identical (e.g., a sub service with a single route
+    distance) have no defined slope and are assigned missing values.
+
+    Parameters:
+        frame (pd.DataFrame): DataFrame of interest
+        x (str): Independent variable column
+        y (str): Dependent variable column
+        columns (tuple): Grouping level columns
+        network (bool): Include a network-wide fit
+
+    Returns:
+        pd.DataFrame: DataFrame of regression coefficients indexed by level and group
+    """
+
+    columns = list(columns)
+    data = frame[columns + [x, y]].dropna(subset=[x, y])
+
+    x_vals = data[x].to_numpy(dtype=np.float64)
+    y_vals = data[y].to_numpy(dtype=np.float64)
+    sums = pd.DataFrame({
+        "n": np.ones(x_vals.size),
+        "sum_x": x_vals,
+        "sum_y": y_vals,
+        "sum_xy": x_vals * y_vals,
+        "sum_xx": x_vals * x_vals,
+        "sum_yy": y_vals * y_vals,
+    })
+    for col in columns:
+        sums[col] = data[col].to_numpy()
+
+    # Sufficient statistics at the finest grouping
+    finest = sums.groupby(columns, observed=True, dropna=False).sum() if columns else None
+
+    levels = []
+    if network:
+        total = sums.drop(columns=columns).sum().to_frame().T
+        total.index = pd.MultiIndex.from_tuples([("Network", "Network")], names=["Level", "Group"])
+        levels.append(total)
+
+    # Roll up to each grouping level
+    for col in columns:
+        level = finest.groupby(level=col, dropna=False).sum()
+        level.index = pd.MultiIndex.from_arrays(
+            [np.full(len(level), col, dtype=object), level.index], names=["Level", "Group"]
+        )
+        levels.append(level)
+
+    sums = pd.concat(levels)
+
+    return compute_linregress(sums)
+
+
+def predict_by_group(coefs, distances, groups=None, level="Network"):
+    """Predicts the average minutes late for late detraining passengers for arrays of
+    < distances > and < groups > using the regression coefficients in < coefs > (see
+    fit_linregress_by_group()). Each distance is paired with the < level > group at the same
+    position; if no < groups > are provided the network coefficients are used. Distances whose group
+    has no fitted model are assigned missing values.
+
+    Parameters:
+        coefs (pd.DataFrame): DataFrame of regression coefficients indexed by level and group
+        distances (np.ndarray|pd.Series): distances in miles
+        groups (np.ndarray|pd.Series): group names (one per distance)
+        level (str): Grouping level of < groups >
+
+    Returns:
+        np.ndarray: Predicted average minutes late for late detraining passengers
+    """
+
+    distances = np.asarray(distances, dtype=np.float64)
+
+    if groups is None:
+        level, groups = "Network", np.full(distances.shape, "Network", dtype=object)
+
+    level_coefs = coefs.xs(level, level="Level")
+
+    positions = level_coefs.index.get_indexer(np.asarray(groups, dtype=object))
+    found = positions >= 0
+
+    slope = np.where(found, level_coefs["slope"].to_numpy()[positions], np.nan)
+    intercept = np.where(found, level_coefs["intercept"].to_numpy()[positions], np.nan)
+
+    return slope * distances + intercept
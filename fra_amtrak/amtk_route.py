@@ -0,0 +1,162 @@
+import numpy as np
+import pandas as pd
+
+import fra_amtrak.amtk_period as prd
+
+
+def get_route_segments(
+    frame, stop_order=None, directions=None, station_orders=None, precision=4
+):
+    """Computes the change in mean minutes late and late share between every pair of consecutive
+    stops along each train's route, for all trains and all fiscal quarters at once.
+
+    The < frame > is reduced to one row per train, station, and fiscal quarter (late to total
+    detraining ratio and mean late arrival time for late detraining passengers). The rows are then
+    ordered by train, fiscal period, and stop order and a grouped diff() computes the increment from
+    the previous reporting stop on the same train in the same quarter. A train's first reporting
+    stop has no predecessor and is excluded.
+
+    If no < stop_order > is provided it is derived from < frame > by get_stop_order() using the
+    optional < directions > and < station_orders > mappings.
+
+    Parameters:
+        frame (pd.DataFrame): DataFrame of interest
+        stop_order (pd.DataFrame): Train Number, Arrival Station Code, and Stop Order columns
+        directions (dict): train numbers and their direction of travel
+        station_orders (dict): train numbers and dictionaries of station codes and their order
+        precision (int): Number of decimal places in which to round the computed metrics
+
+    Returns:
+        pd.DataFrame: DataFrame of route segments indexed by train number, from station code, to
+        station code, and fiscal period key
+    """
+
+    trn, code = "Train Number", "Arrival Station Code"
+    year, quarter, key = "Fiscal Year", "Fiscal Quarter", "Fiscal Period Key"
+    ratio = "Late to Total Detraining Customers Ratio"
+    mean_min_late = "Late Detraining Customers Avg Min Late mean"
+
+    if stop_order is None:
+        stop_order = get_stop_order(frame, directions, station_orders)
+
+    # One row per train, station, and fiscal quarter
+    stops = (
+        frame.groupby([trn, code, year, quarter], sort=False)
+        .agg(
+            total=("Total Detraining Customers", "sum"),
+            late=("Late Detraining Customers", "sum"),
+            mean_min_late=("Late Detraining Customers Avg Min Late", "mean"),
+        )
+        .reset_index()
+    )
+    stops[key] = prd.get_period_keys(stops, year, quarter)
+    stops[ratio] = stops["late"] / stops["total"]
+    stops.rename(columns={"mean_min_late": mean_min_late}, inplace=True)
+
+    # Order each train's stops along its route
+    stops = stops.merge(stop_order[[trn, code, "Stop Order"]], on=[trn, code], how="inner")
+    stops.sort_values(by=[trn, key, "Stop Order"], inplace=True, ignore_index=True)
+
+    # Increment from the previous stop (same train, same quarter)
+    grouped = stops.groupby([trn, key], sort=False)
+    deltas = grouped[[mean_min_late, ratio]].diff()
+
+    segments = pd.DataFrame({
+        trn: stops[trn],
+        "From Station Code": grouped[code].shift(1),
+        "To Station Code": stops[code],
+        key: stops[key],
+        year: stops[year],
+        quarter: stops[quarter],
+        "Stop Order": stops["Stop Order"],
+        mean_min_late: stops[mean_min_late],
+        f"{mean_min_late} diff": deltas[mean_min_late],
+        ratio: stops[ratio],
+        f"{ratio} diff": deltas[ratio],
+    })
+
+    # Drop each train's first stop (no predecessor)
+    segments = segments[segments["From Station Code"].notna()]
+
+    # Index for fast lookup
+    segments = segments.set_index([trn, "From Station Code", "To Station Code", key]).sort_index()
+
+    return segments.round(precision)
+
+
+def get_stop_order(frame, directions=None, station_orders=None):
+    """Returns the order in which each train serves its stations. The ordering mirrors
+    amtk_network.create_route() but is computed for every train in a single sort.
+
+    A train listed in < station_orders > is ordered by its station order dictionary (see
+    amtk_sub_services.json). Otherwise a train listed in < directions > is ordered by latitude
+    (northbound/southbound) or longitude (eastbound/westbound). Trains with neither are ordered
+    along the axis (latitude or longitude) with the greater extent, ascending.
+
+    Parameters:
+        frame (pd.DataFrame): DataFrame of interest
+        directions (dict): train numbers and their direction of travel
+        station_orders (dict): train numbers and dictionaries of station codes and their order
+
+    Returns:
+        pd.DataFrame: DataFrame of train numbers, station codes, and stop order (0-based)
+    """
+
+    trn, code = "Train Number", "Arrival Station Code"
+
+    stops = frame[[trn, code, "Latitude", "Longitude"]].drop_duplicates([trn, code])
+    stops = stops.reset_index(drop=True)
+
+    lat = stops["Latitude"].to_numpy(dtype=np.float64)
+    lon = stops["Longitude"].to_numpy(dtype=np.float64)
+
+    # Default: principal axis (greater latitude or longitude extent) per train
+    grouped = stops.groupby(trn, sort=False)
+    lat_range = grouped["Latitude"].transform("max") - grouped["Latitude"].transform("min")
+    lon_range = grouped["Longitude"].transform("max") - grouped["Longitude"].transform("min")
+    by_lat = (lat_range > lon_range).to_numpy()
+
+    primary = np.where(by_lat, lat, lon)
+    secondary = np.where(by_lat, lon, lat)
+
+    if directions:
+        direction = stops[trn].map({num: str(d).lower() for num, d in directions.items()})
+
+        for names, values, others in (
+            (("nb", "northbound"), lat, lon),
+            (("sb", "southbound"), -lat, lon),
+            (("eb", "eastbound"), lon, lat),
+            (("wb", "westbound"), -lon, lat),
+        ):
+            mask = direction.isin(names).to_numpy()
+            primary = np.where(mask, values, primary)
+            secondary = np.where(mask, others, secondary)
+
+        unknown = direction.notna() & ~direction.isin(
+            ("nb", "northbound", "sb", "southbound", "eb", "eastbound", "wb", "westbound")
+        )
+        if unknown.any():
+            raise ValueError(
+                "Direction invalid: choose eastbound, westbound, northbound, or southbound"
+            )
+
+    if station_orders:
+        positions = pd.DataFrame(
+            [
+                (num, stn_code, pos)
+                for num, order in station_orders.items()
+                for stn_code, pos in order.items()
+            ],
+            columns=[trn, code, "position"],
+        )
+        position = stops[[trn, code]].merge(positions, on=[trn, code], how="left")["position"]
+        has_order = stops[trn].isin(station_orders.keys()).to_numpy()
+        primary = np.where(has_order, position.to_numpy(dtype=np.float64), primary)
+        secondary = np.where(has_order, 0.0, secondary)
+
+    # Single sort: train, then primary and secondary route keys
+    order = np.lexsort((secondary, primary, stops[trn].to_numpy()))
+    stops = stops.iloc[order].reset_index(drop=True)
+    stops["Stop Order"] = stops.groupby(trn, sort=False).cumcount()
+
+    return stops[[trn, code, "Stop Order"]]
@@ -0,0 +1,166 @@
+import numpy as np
+import pandas as pd
+import scipy.spatial as spatial
+
+import fra_amtrak.amtk_detrain as detrn
+import fra_amtrak.amtk_period as prd
+
+
+def create_feature_matrix(
+    stats,
+    entity,
+    metrics=(
+        "Late to Total Detraining Customers Ratio",
+        "Late Detraining Customers Avg Min Late mean",
+    ),
+    year="Fiscal Year",
+    quarter="Fiscal Quarter",
+):
+    """Pivots the passed in quarterly summary statistics < stats > into one z-normalized feature
+    vector per < entity > (e.g., "Arrival Station Code" or "Train Number"). Each feature is one
+    of the < metrics > in one fiscal quarter. The < stats > are expected to be the output of
+    amtk_detrain.get_sum_stats_by_group() grouped by < entity >, < year >, and < quarter > (see
+    get_profile_stats()).
+
+    Each feature column is z-normalized (mean 0, standard deviation 1) so that minutes late and
+    late share carry equal weight. Quarters in which an entity has no train arrivals are assigned
+    the column mean (0 after normalization); constant columns are set to 0.
+
+    Parameters:
+        stats (pd.DataFrame): DataFrame of quarterly summary statistics
+        entity (str): Entity column
+        metrics (tuple): Metric columns
+        year (str): Fiscal year column
+        quarter (str): Fiscal quarter column
+
+    Returns:
+        pd.DataFrame: DataFrame of z-normalized features (entities x metrics * quarters)
+    """
+
+    metrics = list(metrics)
+    keys = prd.get_period_keys(stats, year, quarter)
+    labels = prd.get_period_labels(keys)
+
+    features = pd.DataFrame(
+        {entity: stats[entity].to_numpy(), "Fiscal Year Quarter": labels}
+        | {metric: stats[metric].to_numpy(dtype=np.float64) for metric in metrics}
+    ).pivot_table(
+        index=entity, columns="Fiscal Year Quarter", values=metrics, aggfunc="mean", observed=True
+    )
+    features.columns = [f"{metric} {period}" for metric, period in features.columns]
+
+    values = features.to_numpy(dtype=np.float64)
+    with np.errstate(invalid="ignore"):
+        mean = np.nanmean(values, axis=0)
+        std = np.nanstd(values, axis=0)
+        values = np.where(std > 0, (values - mean) / np.where(std > 0, std, 1), 0)
+
+    return pd.DataFrame(np.nan_to_num(values), index=features.index, columns=features.columns)
+
+
+def get_nearest_neighbours(
+    features, queries=None, k=5, metric="cosine", kdtree=False, batch_size=1024
+):
+    """Finds the < k > nearest neighbours of each of the passed in < queries > (entity labels) among
+    the rows of the < features > matrix (see create_feature_matrix()). If no < queries > are
+    provided every entity is queried. An entity is never returned as its own neighbour.
+
+    Distances are computed in batches of < batch_size > queries with a single matrix product per
+    batch: cosine distance (1 - cosine similarity) or euclidean distance. If < kdtree > is True a
+    scipy.spatial.cKDTree is queried instead (cosine distances are derived from the euclidean
+    distances between unit-length feature vectors).
+
+    Parameters:
+        features (pd.DataFrame): DataFrame of feature vectors indexed by entity
+        queries (list): Entity labels to query
+        k (int): Number of neighbours to return
+        metric (str): "cosine" or "euclidean"
+        kdtree (bool): Query a KD-tree rather than computing all pairwise distances
+        batch_size (int): Number of queries per matrix product
+
+    Returns:
+        pd.DataFrame: DataFrame of entities, neighbour ranks, neighbours, and distances
+    """
+
+    if metric not in ("cosine", "euclidean"):
+        raise ValueError("Metric invalid: choose cosine or euclidean")
+
+    vectors = features.to_numpy(dtype=np.float64)
+    labels = features.index
+
+    if metric == "cosine":
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors = np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+
+    positions = np.arange(labels.size) if queries is None else labels.get_indexer(queries)
+    if (positions < 0).any():
+        raise KeyError(f"Entities not found: {list(np.asarray(queries)[positions < 0])}")
+
+    k = min(k, labels.size - 1)
+
+    if kdtree:
+        tree = spatial.cKDTree(vectors)
+        distances, neighbours = tree.query(vectors[positions], k=k + 1)
+        distances, neighbours = np.atleast_2d(distances), np.atleast_2d(neighbours)
+
+        # Drop self matches (an entity may tie with a duplicate of itself)
+        is_self = neighbours == positions[:, None]
+        keep = np.where(is_self.any(axis=1)[:, None], ~is_self, np.arange(k + 1) < k)
+        distances = distances[keep].reshape(-1, k)
+        neighbours = neighbours[keep].reshape(-1, k)
+
+        if metric == "cosine":
+            distances = distances**2 / 2  # |u - v|^2 = 2 - 2 cos(u, v)
+    else:
+        sq_norms = np.einsum("ij,ij->i", vectors, vectors)
+        distances, neighbours = [], []
+
+        for start in range(0, positions.size, batch_size):
+            batch = positions[start:start + batch_size]
+            products = vectors[batch] @ vectors.T
+
+            if metric == "cosine":
+                dist = 1 - products
+            else:
+                dist = np.sqrt(np.maximum(sq_norms[batch, None] + sq_norms - 2 * products, 0))
+
+            dist[np.arange(batch.size), batch] = np.inf  # exclude self
+
+            nearest = np.argpartition(dist, k - 1, axis=1)[:, :k] if k else dist[:, :0]
+            nearest_dist = np.take_along_axis(dist, nearest, axis=1)
+            order = np.argsort(nearest_dist, axis=1, kind="stable")
+
+            neighbours.append(np.take_along_axis(nearest, order, axis=1))
+            distances.append(np.take_along_axis(nearest_dist, order, axis=1))
+
+        distances, neighbours = np.vstack(distances), np.vstack(neighbours)
+
+    return pd.DataFrame({
+        labels.name: np.repeat(labels[positions], k),
+        "Rank": np.tile(np.arange(1, k + 1), positions.size),
+        "Neighbour": labels[neighbours.ravel()],
+        "Distance": np.maximum(distances.ravel(), 0),
+    })
+
+
+def get_profile_stats(frame, entity, year="Fiscal Year", quarter="Fiscal Quarter"):
+    """Computes the quarterly summary statistics of each < entity > (e.g., "Arrival Station Code"
+    or "Train Number") with amtk_detrain.get_sum_stats_by_group(). The output is the input to
+    create_feature_matrix().
+
+    Parameters:
+        frame (pd.DataFrame): DataFrame of interest
+        entity (str): Entity column
+        year (str): Fiscal year column
+        quarter (str): Fiscal quarter column
+
+    Returns:
+        pd.DataFrame: DataFrame of quarterly summary statistics for each entity
+    """
+
+    return detrn.get_sum_stats_by_group(
+        frame,
+        [entity, year, quarter],
+        ["Total Detraining Customers", "Late Detraining Customers"],
+        ["sum"],
+    )
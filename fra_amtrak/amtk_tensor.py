@@ -0,0 +1,181 @@
+import numpy as np
+import pandas as pd
+
+import fra_amtrak.amtk_period as prd
+
+
+def create_tensor(frame, dtype=np.float64):
+    """Pivots the passed in < frame > once into dense train x station x fiscal quarter arrays of
+    total detraining customers, late detraining customers, and average minutes late for late
+    detraining customers. Train numbers, arrival station codes, and fiscal period keys are
+    factorized into sorted integer codes that index the array axes. Cells without a train arrival
+    are assigned missing values. Should a train, station, and quarter appear in more than one row,
+    the detraining totals are summed and the average minutes late are averaged.
+
+    The returned dictionary holds the axis labels ("Train Number", "Arrival Station Code", and
+    "Fiscal Period Key") and one array per metric keyed by column name. Use the accessor functions
+    in this module to slice the arrays.
+
+    Parameters:
+        frame (pd.DataFrame): DataFrame of interest
+        dtype (np.dtype): Data type of the metric arrays
+
+    Returns:
+        dict: axis labels and metric arrays
+    """
+
+    trn_codes, trains = pd.factorize(frame["Train Number"], sort=True)
+    stn_codes, stations = pd.factorize(frame["Arrival Station Code"], sort=True)
+    periods, period_codes = np.unique(
+        prd.get_period_keys(frame, "Fiscal Year", "Fiscal Quarter"), return_inverse=True
+    )
+
+    # Drop missing periods (key -1 sorts first)
+    n_missing = int((periods < 0).sum())
+    periods, period_codes = periods[n_missing:], period_codes - n_missing
+
+    mask = (trn_codes >= 0) & (stn_codes >= 0) & (period_codes >= 0)
+    shape = (trains.size, stations.size, periods.size)
+    flat = np.ravel_multi_index((trn_codes[mask], stn_codes[mask], period_codes[mask]), shape)
+    size = trains.size * stations.size * periods.size
+
+    arrivals = np.bincount(flat, minlength=size)
+    tensor = {
+        "Train Number": trains,
+        "Arrival Station Code": stations,
+        "Fiscal Period Key": periods,
+    }
+
+    for metric in (
+        "Total Detraining Customers",
+        "Late Detraining Customers",
+        "Late Detraining Customers Avg Min Late",
+    ):
+        values = frame[metric].to_numpy(dtype=np.float64, na_value=np.nan)[mask]
+        reported = ~np.isnan(values)
+        sums = np.bincount(flat[reported], weights=values[reported], minlength=size)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            if metric == "Late Detraining Customers Avg Min Late":
+                counts = np.bincount(flat[reported], minlength=size)
+                cells = np.where(counts > 0, sums / counts, np.nan)
+            else:
+                cells = np.where(arrivals > 0, sums, np.nan)
+
+        tensor[metric] = cells.astype(dtype, copy=False).reshape(shape)
+
+    return tensor
+
+
+def get_codes(tensor, train=None, station=None, period=None):
+    """Returns the integer array positions of the passed in < train > number, < station > code,
+    and fiscal < period > in < tensor >. The < period > may be a fiscal period key (e.g., 8098) or
+    label (e.g., 2024Q3). Axes that are not specified are returned as slice(None).
+
+    Parameters:
+        tensor (dict): axis labels and metric arrays (see create_tensor())
+        train (int): Train number
+        station (str): Arrival station code
+        period (int|str): Fiscal period key or label
+
+    Returns:
+        tuple: train, station, and period positions
+    """
+
+    codes = []
+
+    for axis, label in (
+        ("Train Number", train),
+        ("Arrival Station Code", station),
+        ("Fiscal Period Key", period),
+    ):
+        if label is None:
+            codes.append(slice(None))
+            continue
+
+        if axis == "Fiscal Period Key":
+            if isinstance(label, str):
+                year, quarter = label.split("Q")
+                label = int(year) * 4 + int(quarter) - 1
+            code = int(np.searchsorted(tensor[axis], label))
+            if code == tensor[axis].size or tensor[axis][code] != label:
+                raise KeyError(f"{axis} not found: {label}")
+        else:
+            code = tensor[axis].get_loc(label)
+
+        codes.append(code)
+
+    return tuple(codes)
+
+
+def get_period_snapshot(tensor, period, metric="Late Detraining Customers Avg Min Late"):
+    """Returns the network snapshot (trains x stations) of the passed in < metric > for a single
+    fiscal < period >. The array is a view of < tensor >; do not modify it.
+
+    Parameters:
+        tensor (dict): axis labels and metric arrays (see create_tensor())
+        period (int|str): Fiscal period key or label
+        metric (str): Metric column name
+
+    Returns:
+        np.ndarray: 2D array of trains x stations
+    """
+
+    return get_slice(tensor, metric, period=period)
+
+
+def get_slice(tensor, metric, train=None, station=None, period=None):
+    """Returns a slice of the passed in < metric > array. Each specified axis (< train >,
+    < station >, < period >) is fixed; unspecified axes are retained. The slice is computed with
+    basic indexing and is therefore a view of < tensor > (no copy, no rescan of the fact table).
+
+    Parameters:
+        tensor (dict): axis labels and metric arrays (see create_tensor())
+        metric (str): Metric column name
+        train (int): Train number
+        station (str): Arrival station code
+        period (int|str): Fiscal period key or label
+
+    Returns:
+        np.ndarray: view of the metric array
+    """
+
+    return tensor[metric][get_codes(tensor, train, station, period)]
+
+
+def get_station_series(
+    tensor, station, metric="Late Detraining Customers Avg Min Late", train=None
+):
+    """Returns the quarterly series of the passed in < metric > for a < station >. If a < train >
+    is provided a 1D array of fiscal quarters is returned; otherwise a 2D array of trains x fiscal
+    quarters. The array is a view of < tensor >; do not modify it.
+
+    Parameters:
+        tensor (dict): axis labels and metric arrays (see create_tensor())
+        station (str): Arrival station code
+        metric (str): Metric column name
+        train (int): Train number
+
+    Returns:
+        np.ndarray: 1D or 2D array of quarterly values
+    """
+
+    return get_slice(tensor, metric, train=train, station=station)
+
+
+def get_train_profile(tensor, train, metric="Late Detraining Customers Avg Min Late", period=None):
+    """Returns the station profile of the passed in < metric > for a < train >. If a < period > is
+    provided a 1D array of stations is returned; otherwise a 2D array of stations x fiscal
+    quarters. The array is a view of < tensor >; do not modify it.
+
+    Parameters:
+        tensor (dict): axis labels and metric arrays (see create_tensor())
+        train (int): Train number
+        metric (str): Metric column name
+        period (int|str): Fiscal period key or label
+
+    Returns:
+        np.ndarray: 1D or 2D array of station values
+    """
+
+    return get_slice(tensor, metric, train=train, period=period)
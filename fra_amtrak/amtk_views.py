@@ -0,0 +1,212 @@
+import hashlib
+import json
+import pandas as pd
+import pathlib as pl
+
+import fra_amtrak.amtk_metrics as mtrc
+
+
+def create_view(
+    frame, group, metrics, agg_columns, agg_funcs, year="Fiscal Year", quarter="Fiscal Quarter"
+):
+    """Computes the quarterly summary statistics of every < group > member (e.g., every service
+    line, service, sub service, station, or train) in < frame > from the < metrics > spec (see
+    amtk_metrics.compile_metrics()). The train arrival ratio and the detraining ratio of each
+    quarter are computed against the totals of the member (rather than the network), so that the
+    rows of a single member match the quarterly stats of the member's subset of < frame >.
+
+    Parameters:
+        frame (pd.DataFrame): DataFrame of interest
+        group (str): Group column
+        metrics (dict): metrics spec
+        agg_columns (list): List of columns to aggregate
+        agg_funcs (list): List of aggregation functions to compute
+        year (str): Fiscal year column
+        quarter (str): Fiscal quarter column
+
+    Returns:
+        pd.DataFrame: DataFrame of quarterly summary statistics for each group member
+    """
+
+    plan = mtrc.compile_metrics(metrics, agg_columns, agg_funcs)
+    view = mtrc.get_metrics_by_group(frame, [group, year, quarter], plan)
+
+    # Member totals (one grouped transform per column rather than a subset per member)
+    members = view.groupby(group, sort=False)
+    total_detrain = "Total Detraining Customers sum"
+    view.insert(
+        view.columns.get_loc(total_detrain),
+        "Train Arrival Ratio",
+        view["Train Arrivals"] / members["Train Arrivals"].transform("sum"),
+    )
+    view.insert(
+        view.columns.get_loc(total_detrain),
+        "Detraining Ratio",
+        view[total_detrain] / members[total_detrain].transform("sum"),
+    )
+
+    return view
+
+
+def get_file_digest(source, block_size=1 << 20):
+    """Computes a SHA-256 digest of the contents of the < source > file, read in blocks of
+    < block_size > bytes.
+
+    Parameters:
+        source (str|pl.Path): Path of the source data file
+        block_size (int): Number of bytes read per block
+
+    Returns:
+        str: hexadecimal digest
+    """
+
+    digest = hashlib.sha256()
+    with open(source, "rb") as file_obj:
+        while block := file_obj.read(block_size):
+            digest.update(block)
+
+    return digest.hexdigest()
+
+
+def get_fingerprint(source_digest, definition):
+    """Computes the dependency fingerprint of a view from the digest of its source data
+    < source_digest > (see get_file_digest()) and the view < definition >. A view is stale if
+    either its source data or its definition changes.
+
+    Parameters:
+        source_digest (str): hexadecimal digest of the source data file
+        definition (dict): View definition (group, metrics, aggregation columns and functions)
+
+    Returns:
+        str: hexadecimal digest
+    """
+
+    payload = json.dumps({"source": source_digest} | definition, sort_keys=True)
+
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def read_view(filepath):
+    """Reads the view persisted at < filepath > by write_view().
+
+    Parameters:
+        filepath (str|pl.Path): Path of the view file
+
+    Returns:
+        tuple: view fingerprint and DataFrame of quarterly summary statistics
+    """
+
+    with open(filepath, "r") as file_obj:
+        payload = json.load(file_obj)
+
+    return payload["fingerprint"], pd.DataFrame(payload["records"], columns=payload["columns"])
+
+
+def read_views(
+    source,
+    dirpath,
+    views,
+    metrics,
+    agg_columns,
+    agg_funcs,
+    year="Fiscal Year",
+    quarter="Fiscal Quarter",
+    dtype=None,
+    names=None,
+    frame=None,
+):
+    """Reads the materialized quarterly statistics < views > (view names mapped to group columns,
+    e.g., {"service_line": "Service Line"}) from < dirpath >; if < names > are provided only those
+    views are read (and, if needed, built). Each view is persisted as < name >_qtr_stats.json
+    together with the dependency fingerprint of its < source > data and definition (see
+    get_fingerprint()). The source file is hashed once per call.
+
+    Views that are missing or stale are refreshed on read: the view is recomputed with
+    create_view() from the source rows and the result is written back to < dirpath >. The rows are
+    taken from < frame > if the caller has already loaded the < source > file; otherwise the
+    < source > CSV file is loaded (once, and only if needed). Fresh views are returned without
+    touching the raw rows. Views built from < frame > are persisted under the fingerprint of
+    < source >, so < frame > must hold the unmodified contents of the < source > file (no
+    filtered, edited, or derived rows).
+
+    Parameters:
+        source (str|pl.Path): Path of the source data CSV file
+        dirpath (str|pl.Path): Directory of the view files
+        views (dict): View names and group columns
+        metrics (dict): metrics spec
+        agg_columns (list): List of columns to aggregate
+        agg_funcs (list): List of aggregation functions to compute
+        year (str): Fiscal year column
+        quarter (str): Fiscal quarter column
+        dtype (dict): Column data types passed to pd.read_csv() when the source is loaded
+        names (list): Names of the views to read; None reads every view in < views >
+        frame (pd.DataFrame): Unmodified rows of the < source > file, if already loaded
+
+    Returns:
+        dict: view names and DataFrames of quarterly summary statistics
+    """
+
+    dirpath = pl.Path(dirpath)
+    source_digest = get_file_digest(source)  # hashed once for all views
+    results = {}
+
+    for name in views if names is None else names:
+        group = views[name]
+        definition = {
+            "group": group,
+            "metrics": metrics,
+            "agg_columns": list(agg_columns),
+            "agg_funcs": list(agg_funcs),
+            "year": year,
+            "quarter": quarter,
+        }
+        fingerprint = get_fingerprint(source_digest, definition)
+        filepath = dirpath.joinpath(f"{name}_qtr_stats.json")
+
+        if filepath.exists():
+            view_fingerprint, view = read_view(filepath)
+            if view_fingerprint == fingerprint:
+                results[name] = view
+                continue
+
+        # Missing or stale: recompute from the source rows
+        if frame is None:
+            frame = pd.read_csv(source, dtype=dtype, low_memory=False)
+
+        view = create_view(frame, group, metrics, agg_columns, agg_funcs, year, quarter)
+        write_view(view, filepath, fingerprint, name, group)
+        results[name] = view
+
+    return results
+
+
+def write_view(view, filepath, fingerprint, name, group):
+    """Persists the passed in < view > to < filepath > as JSON. The records (one per group member
+    and fiscal quarter) are stored together with the view < name >, < group > column, column
+    order, and dependency < fingerprint > (see get_fingerprint()). Values are written with the
+    json module (shortest round-trip float repr), so the view reads back without loss of
+    precision; missing values are written as NaN.
+
+    Parameters:
+        view (pd.DataFrame): DataFrame of quarterly summary statistics
+        filepath (str|pl.Path): Path of the view file
+        fingerprint (str): Dependency fingerprint of the view
+        name (str): View name
+        group (str): Group column
+
+    Returns:
+        None
+    """
+
+    filepath = pl.Path(filepath)
+    filepath.parent.mkdir(parents=True, exist_ok=True)
+
+    payload = {
+        "view": name,
+        "group": group,
+        "fingerprint": fingerprint,
+        "columns": view.columns.tolist(),
+        "records": view.to_dict(orient="records"),
+    }
+    with open(filepath, "w") as file_obj:
+        json.dump(payload, file_obj, indent=2)
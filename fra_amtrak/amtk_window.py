@@ -0,0 +1,143 @@
+import numpy as np
+import pandas as pd
+
+import fra_amtrak.amtk_detrain as detrn
+import fra_amtrak.amtk_period as prd
+
+
+def add_window_metrics(
+    stats,
+    groups=None,
+    metrics=(
+        "Total Detraining Customers sum",
+        "Late to Total Detraining Customers Ratio",
+        "Late Detraining Customers Avg Min Late mean",
+    ),
+    window=4,
+    year="Fiscal Year",
+    quarter="Fiscal Quarter",
+    precision=4,
+):
+    """Adds period-over-period window metrics to the passed in quarterly summary statistics
+    < stats > (e.g., the output of amtk_detrain.get_sum_stats_by_group() grouped by < groups >,
+    < year >, and < quarter >). For each of the < metrics > the following columns are added:
+
+        QoQ diff, QoQ pct change: change from the previous fiscal quarter
+        YoY diff, YoY pct change: change from the same fiscal quarter of the previous year
+        rolling mean: mean over the trailing < window > fiscal quarters (current included)
+        rank: rank (1 = highest) among the < groups > in the same fiscal quarter
+
+    The rows are sorted once by group and fiscal period key. Prior periods are located with a
+    vectorized search for the key - 1 (QoQ) and key - 4 (YoY) within the same group, so missing
+    quarters yield missing deltas rather than comparisons against the wrong quarter. Rolling
+    means are computed from grouped cumulative sums over the same keys and ignore missing values.
+    If no < groups > are provided the rows are treated as a single (e.g., network) series.
+
+    Parameters:
+        stats (pd.DataFrame): DataFrame of quarterly summary statistics
+        groups (list|str): Group columns (excluding the fiscal year and quarter)
+        metrics (tuple): Metric columns
+        window (int): Number of fiscal quarters in the rolling mean
+        year (str): Fiscal year column
+        quarter (str): Fiscal quarter column
+        precision (int): Number of decimal places in which to round the computed metrics
+
+    Returns:
+        pd.DataFrame: DataFrame sorted by group and fiscal period with window metrics added
+    """
+
+    groups = [groups] if isinstance(groups, str) else list(groups or [])
+    metrics = [metric for metric in metrics if metric in stats.columns]
+
+    keys = prd.get_period_keys(stats, year, quarter)
+    codes = (
+        stats.groupby(groups, sort=True, dropna=False).ngroup().to_numpy()
+        if groups
+        else np.zeros(len(stats), dtype=np.int64)
+    )
+
+    # One sort: group, then fiscal period
+    order = np.lexsort((keys, codes))
+    window_stats = stats.iloc[order].reset_index(drop=True)
+    keys, codes = keys[order], codes[order]
+
+    # Combined (group, period) search key; strictly increasing for unique group periods
+    span = keys.max(initial=0) + window + 5
+    combined = codes * span + keys
+
+    # Prior period positions (same group); missing quarters are not found
+    lags = {}
+    for label, lag in (("QoQ", 1), ("YoY", 4)):
+        targets = combined - lag
+        positions = np.minimum(np.searchsorted(combined, targets), max(combined.size - 1, 0))
+        lags[label] = (positions, combined[positions] == targets)
+
+    # Rolling window start: first row of the same group at or after key - window + 1
+    start = np.searchsorted(combined, combined - window + 1)
+
+    columns = {}
+    for metric in metrics:
+        values = window_stats[metric].to_numpy(dtype=np.float64, na_value=np.nan)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            for label, (positions, found) in lags.items():
+                prior = np.where(found, values[positions], np.nan)
+                columns[f"{metric} {label} diff"] = values - prior
+                columns[f"{metric} {label} pct change"] = np.where(
+                    prior != 0, (values - prior) / prior, np.nan
+                )
+
+            reported = ~np.isnan(values)
+            sums = np.concatenate(([0], np.cumsum(np.where(reported, values, 0))))
+            counts = np.concatenate(([0], np.cumsum(reported)))
+            idx = np.arange(values.size)
+            window_count = counts[idx + 1] - counts[start]
+            columns[f"{metric} rolling {window}Q mean"] = np.where(
+                window_count > 0, (sums[idx + 1] - sums[start]) / window_count, np.nan
+            )
+
+        columns[f"{metric} rank"] = (
+            pd.Series(values).groupby(keys).rank(method="min", ascending=False).to_numpy()
+        )
+
+    window_stats = pd.concat(
+        [window_stats, pd.DataFrame(columns, index=window_stats.index).round(precision)], axis=1
+    )
+
+    return window_stats
+
+
+def get_window_stats(
+    frame,
+    groups,
+    agg_columns,
+    agg_funcs,
+    window=4,
+    year="Fiscal Year",
+    quarter="Fiscal Quarter",
+    precision=4,
+):
+    """Computes quarterly summary statistics for the passed in < groups > with
+    amtk_detrain.get_sum_stats_by_group() and adds QoQ and YoY deltas, percent changes, rolling
+    means, and ranks (see add_window_metrics()).
+
+    Parameters:
+        frame (pd.DataFrame): DataFrame of interest
+        groups (list|str): Group columns (excluding the fiscal year and quarter)
+        agg_columns (list): List of columns to aggregate
+        agg_funcs (list): List of aggregation functions to compute
+        window (int): Number of fiscal quarters in the rolling mean
+        year (str): Fiscal year column
+        quarter (str): Fiscal quarter column
+        precision (int): Number of decimal places in which to round the computed metrics
+
+    Returns:
+        pd.DataFrame: DataFrame of quarterly summary statistics with window metrics
+    """
+
+    groups = [groups] if isinstance(groups, str) else list(groups or [])
+    stats = detrn.get_sum_stats_by_group(frame, groups + [year, quarter], agg_columns, agg_funcs)
+
+    return add_window_metrics(
+        stats, groups, window=window, year=year, quarter=quarter, precision=precision
+    )
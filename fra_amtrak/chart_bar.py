@@ -1,5 +1,7 @@
 import altair as alt
 
+import fra_amtrak.amtk_period as prd
+
 
 def configure_bar_text(frame, x_shorthand, y_shorthand, color):
     """Returns a text configuration object for a bar chart.
@@ -120,8 +122,8 @@ def create_detrain_chart_frame(frame, columns):
     chart_data = frame[columns.values()].copy()  # deep copy (avoid SettingWithCopyWarning)
 
     # X axis label: < year >Q< quarter > periods
-    chart_data.loc[:, "Fiscal Period"] = (
-        chart_data[columns["year"]].astype(str) + "Q" + chart_data[columns["quarter"]].astype(str)
+    chart_data.loc[:, "Fiscal Period"] = prd.get_period_labels(
+        prd.get_period_keys(chart_data, columns["year"], columns["quarter"])
     )
 
     # BREAK: forget to subtract Late from Total for On Time count
@@ -1,5 +1,8 @@
 import altair as alt
 
+import fra_amtrak.amtk_frame as frm
+import fra_amtrak.chart_box_preagg as boxp
+
 
 def configure_color(shorthand, colors):
     """Returns a color configuration object for a bar chart.
@@ -85,10 +88,16 @@ def create_box_plot(
     padding=15,
     height=125,
     width=600,
+    max_rows=5_000,
 ):
     """Instantiates a box chart object configured with the provided data, axes shorthands, colors, and
     title.
 
+    If < frame > exceeds < max_rows > rows the box statistics (quartiles, whiskers, and outliers)
+    are computed server-side with amtk_frame.aggregate_data() and the chart is rendered with
+    chart_box_preagg.create_boxplot(). The spec then embeds one row per box rather than one row
+    per train arrival. Set < max_rows > to None to always embed the raw rows.
+
     Parameters:
         frame (DataFrame): data frame
         x_shorthand (str): shorthand value for the x-axis
@@ -101,11 +110,27 @@ def create_box_plot(
         padding (int): padding
         height (int): height
         width (int): width
+        max_rows (int): row count above which box statistics are pre-aggregated
 
     Returns:
         alt.Chart: box chart object
     """
 
+    if max_rows is not None and frame.shape[0] > max_rows:
+        return create_preagg_box_plot(
+            frame,
+            x_shorthand,
+            x_title,
+            y_shorthand,
+            y_title,
+            y_sort,
+            colors,
+            title,
+            padding,
+            height,
+            width,
+        )
+
     base = alt.Chart(frame)
     box = base.mark_boxplot(size=20).encode(
         x=configure_x_axis(x_shorthand, x_title),
@@ -125,3 +150,88 @@ def create_box_plot(
     )
 
     return chart
+
+
+def create_preagg_box_plot(
+    frame,
+    x_shorthand,
+    x_title,
+    y_shorthand,
+    y_title,
+    y_sort,
+    colors,
+    title,
+    padding=15,
+    height=125,
+    width=600,
+):
+    """Instantiates a box chart object from box statistics computed server-side. The < frame > rows
+    are reduced to one row per < y_shorthand > entity (quartiles, Tukey whiskers at 1.5 IQR, and
+    outliers, matching the Vega-Lite boxplot defaults) with amtk_frame.aggregate_data(). The box,
+    whisker, median, and outlier layers are drawn with the axes, color scale, and tooltips of
+    create_box_plot(), so the chart matches its raw row counterpart.
+
+    Parameters:
+        frame (DataFrame): data frame
+        x_shorthand (str): shorthand value for the x-axis
+        x_title (str): title for the x-axis
+        y_shorthand (str): shorthand value for the y-axis
+        y_title (str): title for the y-axis
+        y_sort (list): sort the entities of interest
+        colors (dict): color palette
+        title (str): title for the chart
+        padding (int): padding
+        height (int): height
+        width (int): width
+
+    Returns:
+        alt.LayerChart: box chart object
+    """
+
+    x_field, y_field = x_shorthand.split(":")[0], y_shorthand.split(":")[0]
+    x_tooltip_title = x_shorthand[-14:-2].title()
+
+    # Project the plotted columns only; rows without a value are not part of any box. Entities are
+    # colored by the configure_color() scale (aggregate_data() carries a "Color" column through)
+    data = frame.loc[frame[x_field].notna(), [y_field, x_field]]
+    data = data.assign(Color=data[y_field])
+
+    agg_stats = frm.aggregate_data(data, [y_field, x_field])
+
+    base = alt.Chart(agg_stats).encode(
+        y=configure_y_axis(y_shorthand, y_title, y_sort),
+        tooltip=[
+            alt.Tooltip(y_shorthand, title=y_shorthand[:-2].title()),
+            alt.Tooltip("lower:Q", title="Lower Whisker"),
+            alt.Tooltip("25%:Q", title="25% Quartile"),
+            alt.Tooltip("50%:Q", title="Median"),
+            alt.Tooltip("75%:Q", title="75% Quartile"),
+            alt.Tooltip("upper:Q", title="Upper Whisker"),
+        ],
+    )
+
+    rules = base.mark_rule().encode(x=configure_x_axis("lower:Q", x_title), x2="upper:Q")
+    bars = base.mark_bar(size=20).encode(
+        x="25%:Q", x2="75%:Q", color=configure_color(y_shorthand, colors)
+    )
+    ticks = boxp.configure_median_line(base, "#FFFFFF", 20, boxp.Orient.HORIZONTAL)
+    outliers = (
+        base.transform_flatten(flatten=["outliers"])
+        .mark_point(style="boxplot-outliers")
+        .encode(
+            x="outliers:Q",
+            color=configure_color(y_shorthand, colors),
+            tooltip=[
+                alt.Tooltip(y_shorthand, title=y_shorthand[:-2].title()),
+                alt.Tooltip("outliers:Q", title=x_tooltip_title),
+            ],
+        )
+    )
+
+    chart = (
+        alt.layer(rules, bars, ticks, outliers)
+        .configure_view(stroke=None, strokeWidth=0)
+        .properties(title=title, padding=padding, width=width, height=height)
+    )
+
+    return chart
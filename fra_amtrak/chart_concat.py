@@ -27,8 +27,6 @@ def concat_charts(charts, orient, columns=2, spacing=10, title=""):
     else:
         concat = alt.hconcat(*charts)
 
-    print(f"Type of concat: {type(concat)}")
-
     return alt.ConcatChart(concat=[concat], columns=columns, spacing=spacing, title=title)
 
     # return alt.ConcatChart(
@@ -68,6 +66,128 @@ def configure_legend(frame, orient, height=50, width=20):
     )
 
 
+def create_dashboard(
+    frame,
+    entity_shorthand,
+    entity_title,
+    x_shorthand,
+    x_title,
+    y_shorthand,
+    y_title,
+    entities=None,
+    columns=2,
+    title="",
+    color="#00537e",
+    height=200,
+    width=300,
+    weight_shorthand=None,
+):
+    """Creates a multi-entity dashboard (e.g., of service lines, services, or stations) that ships
+    the passed in < frame > once. The plotted columns are registered as a single top-level
+    dataset; every view is a data-less chart that inherits it and derives its rows with transforms
+    and parameters:
+
+    - an overview bar chart of the mean < y_shorthand > value of every entity, with a linked
+      point selection (click, shift-click to add entities) on the < entity_shorthand > field. If
+      < y_shorthand > holds group means (e.g., quarterly means), pass the group sizes as
+      < weight_shorthand >: the bars then show sum(y * n) / sum(n), the mean over the underlying
+      rows, rather than the unweighted mean of the group means
+    - a drill-down line chart of < y_shorthand > by < x_shorthand > (e.g., fiscal period)
+      filtered by the selection (all entities when nothing is selected)
+    - optional small multiples, one per entity in < entities >, filtered by a field equal
+      predicate and laid out in < columns > columns
+
+    Parameters:
+        frame (pd.DataFrame): DataFrame of interest
+        entity_shorthand (str): shorthand value for the entity field
+        entity_title (str): entity title
+        x_shorthand (str): shorthand value for the drill-down x-axis
+        x_title (str): drill-down x-axis title
+        y_shorthand (str): shorthand value for the y-axis (quantitative)
+        y_title (str): y-axis title
+        entities (list): entities drawn as small multiples; None omits them
+        columns (int): number of small multiple columns
+        title (str|dict): dashboard title (see chart_title.format_title())
+        color (str): overview bar color
+        height (int): view height
+        width (int): view width
+        weight_shorthand (str): shorthand value for the < y_shorthand > weights; None weighs
+            every row equally
+
+    Returns:
+        alt.VConcatChart: dashboard
+    """
+
+    # Project the plotted columns (shipped once as the top-level dataset)
+    entity, x, y = (
+        shorthand.split(":")[0] for shorthand in (entity_shorthand, x_shorthand, y_shorthand)
+    )
+    weight = weight_shorthand.split(":")[0] if weight_shorthand else None
+    data = frame[list(dict.fromkeys([entity, x, y] + ([weight] if weight else [])))]
+
+    selection = alt.selection_point(fields=[entity], name="entity_select")
+
+    overview = alt.Chart()
+    overview_y = f"mean({y}):Q"
+    if weight:
+        overview = (
+            overview.transform_calculate(weighted=f"datum['{y}'] * datum['{weight}']")
+            .transform_aggregate(
+                weighted="sum(weighted)", weight_sum=f"sum({weight})", groupby=[entity]
+            )
+            .transform_calculate(weighted_mean="datum.weighted / datum.weight_sum")
+        )
+        overview_y = "weighted_mean:Q"
+
+    overview = (
+        overview.mark_bar(color=color)
+        .encode(
+            x=alt.X(entity_shorthand, sort="-y", title=entity_title),
+            y=alt.Y(overview_y, title=y_title),
+            opacity=alt.condition(selection, alt.value(1.0), alt.value(0.3)),
+            tooltip=[
+                alt.Tooltip(entity_shorthand, title=entity_title),
+                alt.Tooltip(overview_y, title=y_title, format=",.2f"),
+            ],
+        )
+        .add_params(selection)
+        .properties(height=height, width=width)
+    )
+
+    line = alt.Chart().mark_line(point=True)
+    encoding = {
+        "x": alt.X(x_shorthand, title=x_title),
+        "y": alt.Y(f"mean({y}):Q", title=y_title),
+        "tooltip": [
+            alt.Tooltip(entity_shorthand, title=entity_title),
+            alt.Tooltip(x_shorthand, title=x_title),
+            alt.Tooltip(f"mean({y}):Q", title=y_title, format=",.2f"),
+        ],
+    }
+
+    drill_down = (
+        line.encode(color=alt.Color(entity_shorthand, title=entity_title), **encoding)
+        .transform_filter(selection)
+        .properties(height=height, width=width)
+    )
+
+    views = [alt.hconcat(overview, drill_down)]
+    if entities:
+        views.append(
+            alt.concat(
+                *[
+                    line.encode(**encoding)
+                    .transform_filter(alt.FieldEqualPredicate(field=entity, equal=value))
+                    .properties(title=str(value), height=height // 2, width=width // 2)
+                    for value in entities
+                ],
+                columns=columns,
+            )
+        )
+
+    return alt.vconcat(*views, data=data).properties(title=title, padding=15)
+
+
 def create_layered_histogram(charts, legend, title):
     # Combine histograms
     layered_histogram = (
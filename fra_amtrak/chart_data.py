@@ -0,0 +1,68 @@
+import altair as alt
+import hashlib
+import json
+import pathlib as pl
+
+
+def enable_data_store(dirpath="chart_data", urlpath=None):
+    """Registers and enables the "amtk_store" Altair data transformer (see to_data_store()). Once
+    enabled, every chart DataFrame (including the single row frames of rule layers) is written to
+    < dirpath > once and referenced by URL instead of being inlined in the Vega-Lite spec. The
+    renderer must be able to fetch < urlpath > (e.g., a path relative to the notebook).
+
+    Parameters:
+        dirpath (str|pl.Path): Directory of the dataset files
+        urlpath (str): URL path prepended to the dataset file names; None uses < dirpath >
+
+    Returns:
+        None
+    """
+
+    alt.data_transformers.register("amtk_store", to_data_store)
+    alt.data_transformers.enable(
+        "amtk_store",
+        dirpath=str(dirpath),
+        urlpath=str(dirpath) if urlpath is None else urlpath,
+    )
+
+
+def get_dataset_bytes(data):
+    """Serializes the passed in chart < data > as compact JSON records (sanitized by Altair, e.g.,
+    timestamps and missing values). JSON is read by the stock Vega loader; binary formats such as
+    Arrow would require the vega-loader-arrow plugin in every renderer.
+
+    Parameters:
+        data (pd.DataFrame): chart data
+
+    Returns:
+        bytes: serialized dataset
+    """
+
+    values = alt.utils.data.to_values(data)["values"]
+    return json.dumps(values, separators=(",", ":"), sort_keys=True).encode("utf-8")
+
+
+def to_data_store(data, dirpath="chart_data", urlpath="chart_data"):
+    """Altair data transformer that writes the passed in chart < data > to a content-addressed file
+    in < dirpath > and returns a URL data reference. The file name is the SHA-256 digest of the
+    serialized dataset (see get_dataset_bytes()), so identical datasets across layers, charts, and
+    notebook runs share one file and one URL. Existing files are not rewritten.
+
+    Parameters:
+        data (pd.DataFrame): chart data
+        dirpath (str): Directory of the dataset files
+        urlpath (str): URL path prepended to the dataset file names
+
+    Returns:
+        dict: Vega-Lite URL data (url and format)
+    """
+
+    payload = get_dataset_bytes(data)
+    filename = f"{hashlib.sha256(payload).hexdigest()[:32]}.json"
+
+    filepath = pl.Path(dirpath).joinpath(filename)
+    if not filepath.exists():
+        filepath.parent.mkdir(parents=True, exist_ok=True)
+        filepath.write_bytes(payload)
+
+    return {"url": f"{urlpath.rstrip('/')}/{filename}", "format": {"type": "json"}}
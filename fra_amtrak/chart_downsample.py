@@ -0,0 +1,142 @@
+import numpy as np
+import pandas as pd
+
+
+def bin_scatter(frame, x, y, bins=100):
+    """Reduces the < x >, < y > points in < frame > to one point per occupied cell of a regular
+    < bins > x < bins > grid spanning the data. Each cell is represented by the centroid (mean x
+    and mean y) of its points and the number of points it holds, so dense regions keep their
+    shape and weight while the number of points shipped to the browser is capped at bins ** 2.
+    Cell codes, counts, and sums are computed with a single np.bincount() per statistic.
+
+    Parameters:
+        frame (pd.DataFrame): DataFrame of interest
+        x (str): x column
+        y (str): y column
+        bins (int): Number of grid cells along each axis
+
+    Returns:
+        pd.DataFrame: DataFrame of cell centroids and point counts ("count")
+    """
+
+    x_values = frame[x].to_numpy(dtype=np.float64, na_value=np.nan)
+    y_values = frame[y].to_numpy(dtype=np.float64, na_value=np.nan)
+    valid = ~(np.isnan(x_values) | np.isnan(y_values))
+    x_values, y_values = x_values[valid], y_values[valid]
+
+    if not x_values.size:
+        return pd.DataFrame({x: [], y: [], "count": []})
+
+    cells = np.zeros(x_values.size, dtype=np.int64)
+    for values in (x_values, y_values):
+        span = values.max() - values.min()
+        codes = (
+            np.minimum(((values - values.min()) / span * bins).astype(np.int64), bins - 1)
+            if span > 0
+            else np.zeros(values.size, dtype=np.int64)
+        )
+        cells = cells * bins + codes
+
+    counts = np.bincount(cells, minlength=bins * bins)
+    occupied = np.flatnonzero(counts)
+
+    return pd.DataFrame({
+        x: np.bincount(cells, weights=x_values, minlength=bins * bins)[occupied] / counts[occupied],
+        y: np.bincount(cells, weights=y_values, minlength=bins * bins)[occupied] / counts[occupied],
+        "count": counts[occupied],
+    })
+
+
+def downsample_lines(frame, y, group=None, max_points=500, x=None):
+    """Downsamples every line (< group > member, e.g., each train) in < frame > to at most
+    < max_points > rows with Largest-Triangle-Three-Buckets (see get_lttb_indices()). Points are
+    placed along the line by the numeric < x > column or, if None (e.g., nominal station or
+    fiscal period axes), by their position within the line in < frame > order. Lines with at
+    most < max_points > rows are kept whole. The selected rows are returned in their original
+    order with their original index.
+
+    Parameters:
+        frame (pd.DataFrame): DataFrame of interest
+        y (str): y column
+        group (str): Group (line) column; None treats < frame > as a single line
+        max_points (int): Maximum number of points per line
+        x (str): Numeric x column; None uses row positions
+
+    Returns:
+        pd.DataFrame: DataFrame of the selected rows
+    """
+
+    codes = (
+        frame.groupby(group, sort=False, dropna=False).ngroup().to_numpy()
+        if group
+        else np.zeros(len(frame), dtype=np.int64)
+    )
+    y_values = frame[y].to_numpy(dtype=np.float64, na_value=np.nan)
+    x_values = (
+        frame[x].to_numpy(dtype=np.float64, na_value=np.nan)
+        if x
+        else np.arange(len(frame), dtype=np.float64)
+    )
+
+    order = np.argsort(codes, kind="stable")
+    starts = np.flatnonzero(np.r_[True, codes[order][1:] != codes[order][:-1]])
+    ends = np.r_[starts[1:], len(frame)]
+
+    selected = []
+    for start, end in zip(starts, ends):
+        rows = order[start:end]
+        if rows.size <= max_points:
+            selected.append(rows)
+        else:
+            selected.append(rows[get_lttb_indices(x_values[rows], y_values[rows], max_points)])
+
+    selected = np.sort(np.concatenate(selected)) if selected else np.empty(0, dtype=np.int64)
+
+    return frame.iloc[selected]
+
+
+def get_lttb_indices(x, y, n_out):
+    """Selects < n_out > of the passed in points with the Largest-Triangle-Three-Buckets (LTTB)
+    algorithm: the first and last points are kept, the remaining points are split into n_out - 2
+    buckets, and from each bucket the point forming the largest triangle with the previously
+    selected point and the mean of the next bucket is kept. Peaks and troughs survive, so the
+    downsampled line keeps the shape of the original. Missing y values are treated as 0 for
+    selection purposes.
+
+    Parameters:
+        x (np.ndarray): x values (ascending)
+        y (np.ndarray): y values
+        n_out (int): Number of points to select
+
+    Returns:
+        np.ndarray: indices of the selected points
+    """
+
+    n = x.size
+    if n_out >= n or n_out < 3:
+        return np.arange(n) if n_out >= n else np.array([0, n - 1][:n_out], dtype=np.int64)
+
+    y = np.nan_to_num(y)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)  # bucket boundaries (interior)
+
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    prev = 0
+
+    for i in range(n_out - 2):
+        lower, upper = edges[i], edges[i + 1]
+
+        # Mean of the next bucket (the last point for the final bucket)
+        next_upper = edges[i + 2] if i + 2 < edges.size else n
+        next_x = x[upper:next_upper].mean()
+        next_y = y[upper:next_upper].mean()
+
+        # Twice the triangle areas (the constant factor does not change the argmax)
+        areas = np.abs(
+            (x[prev] - next_x) * (y[lower:upper] - y[prev])
+            - (x[prev] - x[lower:upper]) * (next_y - y[prev])
+        )
+        prev = lower + int(np.argmax(areas))
+        selected[i + 1] = prev
+
+    return selected
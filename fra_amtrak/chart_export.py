@@ -0,0 +1,112 @@
+import altair as alt
+import hashlib
+import orjson
+import pandas as pd
+import pathlib as pl
+
+from concurrent.futures import ProcessPoolExecutor
+
+
+def dump_spec(spec):
+    """Serializes the passed in Vega-Lite < spec > to compact JSON bytes (UTF-8, sorted keys) with
+    orjson. A spec is serialized once: the same bytes are hashed for its content address and
+    written to disk, so identical specs yield identical bytes, file names, and file contents.
+
+    Parameters:
+        spec (dict): Vega-Lite spec
+
+    Returns:
+        bytes: serialized spec
+    """
+
+    return orjson.dumps(spec, option=orjson.OPT_SORT_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+
+
+def export_chart(builder, dirpath, html=True):
+    """Builds and exports one chart. The < builder > is a dictionary with an "entity" label and
+    either a ready Vega-Lite "spec" (e.g., stamped from a chart_template template) or a chart
+    function "func" and its keyword arguments "kwargs" (including the chart data). The spec is
+    written to < dirpath > as < hash >.json, where < hash > is the SHA-256 digest of the
+    serialized spec (see dump_spec()); if < html > is True a standalone < hash >.html
+    page is also written. Charts whose spec file already exists are unchanged and are not rewritten.
+
+    Parameters:
+        builder (dict): entity label and spec or chart function and keyword arguments
+        dirpath (str|pl.Path): Output directory
+        html (bool): Write a standalone HTML page
+
+    Returns:
+        dict: entity label, spec hash, output paths, and whether the files were written
+    """
+
+    spec = builder["spec"] if "spec" in builder else builder["func"](**builder["kwargs"]).to_dict()
+    payload = dump_spec(spec)
+    spec_hash = hashlib.sha256(payload).hexdigest()
+
+    dirpath = pl.Path(dirpath)
+    spec_path = dirpath.joinpath(f"{spec_hash}.json")
+    html_path = dirpath.joinpath(f"{spec_hash}.html") if html else None
+
+    written = not spec_path.exists() or (html and not html_path.exists())
+    if written:
+        if html:
+            html_path.write_text(
+                alt.utils.html.spec_to_html(
+                    spec,
+                    mode="vega-lite",
+                    vega_version=alt.VEGA_VERSION,
+                    vegaembed_version=alt.VEGAEMBED_VERSION,
+                    vegalite_version=alt.VEGALITE_VERSION,
+                ),
+                encoding="utf-8",
+            )
+        # Written last: marks the chart as exported
+        spec_path.write_bytes(payload)
+
+    return {
+        "Entity": builder["entity"],
+        "Spec Hash": spec_hash,
+        "Spec Path": str(spec_path),
+        "HTML Path": str(html_path) if html else None,
+        "Written": written,
+    }
+
+
+def export_charts(builders, dirpath, html=True, max_workers=None, chunksize=8):
+    """Exports the passed in chart < builders > (see export_chart()) to the content-addressed
+    output directory < dirpath >. Charts are built, serialized, and written in parallel worker
+    processes (chunks of < chunksize > builders per task) unless < max_workers > is 1. Charts
+    whose spec hash has already been exported are skipped. A manifest mapping each entity to its
+    spec hash is written to < dirpath >/manifest.json.
+
+    Chart functions must be importable (module-level) so that they can be sent to the workers.
+
+    Parameters:
+        builders (list): chart builder dictionaries
+        dirpath (str|pl.Path): Output directory
+        html (bool): Write standalone HTML pages
+        max_workers (int): Maximum number of worker processes
+        chunksize (int): Number of builders per worker task
+
+    Returns:
+        pd.DataFrame: DataFrame of entities, spec hashes, output paths, and written flags
+    """
+
+    dirpath = pl.Path(dirpath)
+    dirpath.mkdir(parents=True, exist_ok=True)
+
+    args = (builders, [dirpath] * len(builders), [html] * len(builders))
+    if len(builders) > 1 and max_workers != 1:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(export_chart, *args, chunksize=chunksize))
+    else:
+        results = list(map(export_chart, *args))
+
+    exports = pd.DataFrame(
+        results, columns=["Entity", "Spec Hash", "Spec Path", "HTML Path", "Written"]
+    )
+
+    manifest = dict(zip(exports["Entity"].astype(str), exports["Spec Hash"]))
+    dirpath.joinpath("manifest.json").write_bytes(dump_spec(manifest))
+
+    return exports
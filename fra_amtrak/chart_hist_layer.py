@@ -1,7 +1,78 @@
 import altair as alt
+import numpy as np
 import pandas as pd
 
 
+def bin_layers(
+    frame, x_shorthand, x_title, x2_shorthand, order_shorthand, color_shorthand, max_bins, bin_step
+):
+    """Bins and aggregates the < x_title > values of every layered series (< color_shorthand > and
+    < order_shorthand > pair) in < frame > server-side. All series are binned in one vectorized
+    pass over a shared set of bins that follow the Vega bin transform: bins of width < bin_step >
+    (or a nice step yielding at most < max_bins > bins) starting at a multiple of the step, with
+    the maximum value assigned to the last bin. Counts and sums are accumulated with a single
+    np.bincount() per statistic over combined series and bin codes.
+
+    Only non-empty bins are returned, each with its bin start and end, late arrivals count, mean
+    minutes late, and "start - end" range label, so the browser only draws rectangles.
+
+    Parameters:
+        frame (pd.DataFrame): DataFrame of interest
+        x_shorthand (str): shorthand value for the x-axis (bin start)
+        x_title (str): column of values to bin
+        x2_shorthand (str): shorthand value for the x2 channel (bin end)
+        order_shorthand (str): shorthand value for the order
+        color_shorthand (str): shorthand value for the color
+        max_bins (int): maximum number of bins
+        bin_step (int): bin step size
+
+    Returns:
+        pd.DataFrame: DataFrame of bin rows
+    """
+
+    # Remove encoding shorthand suffixes (e.g., ':N')
+    x = x_shorthand[:-2]
+    x2 = x2_shorthand[:-2]
+    color = color_shorthand[:-2]
+    order = order_shorthand[:-2]
+
+    values = frame[x_title].to_numpy(dtype=np.float64, na_value=np.nan)
+    valid = ~np.isnan(values)
+    values = values[valid]
+    # Layered series codes (one per color and order pair)
+    layers = frame.loc[valid, [color, order]]
+    codes = layers.groupby([color, order], sort=True).ngroup().to_numpy()
+    series = layers.drop_duplicates().sort_values([color, order], ignore_index=True)
+
+    # Shared bins (Vega: nice start/stop at multiples of the step)
+    vmin, vmax = (values.min(), values.max()) if values.size else (0.0, 0.0)
+    step = bin_step or get_bin_step(vmax - vmin, max_bins)
+    start = np.floor(vmin / step) * step
+    stop = max(np.ceil(vmax / step) * step, start + step)
+    n_bins = round((stop - start) / step)
+
+    bins = np.floor(1.0e-14 + (np.minimum(values, stop - step) - start) / step).astype(np.int64)
+    cells = codes * n_bins + bins
+
+    counts = np.bincount(cells, minlength=len(series) * n_bins)
+    sums = np.bincount(cells, weights=values, minlength=len(series) * n_bins)
+    filled = np.flatnonzero(counts)
+
+    bin_start = start + step * (filled % n_bins)
+    bin_end = bin_start + step
+    binned = series.iloc[filled // n_bins].reset_index(drop=True)
+    binned.insert(0, x, bin_start)
+    binned.insert(1, x2, bin_end)
+    binned["count"] = counts[filled]
+    binned["mean_late"] = sums[filled] / counts[filled]
+    binned["bin_range"] = [
+        f"{format_bin_edge(lower)} - {format_bin_edge(upper)}"
+        for lower, upper in zip(bin_start, bin_end)
+    ]
+
+    return binned
+
+
 def configure_bar(
     chart,
     x_shorthand,
@@ -217,8 +288,11 @@ def create_layered_histogram(
     padding=10,
     height=300,
     width=600,
+    server_side=False,
 ):
-    """Creates a layered histogram.
+    """Creates a layered histogram. If < server_side > is True the layered series are binned and
+    aggregated in Python (see bin_layers()) and only the bin rows are embedded in the chart;
+    otherwise the raw rows are binned client-side by Vega (see transform_data()).
 
     Paremeters:
         frame (pd.DataFrame): DataFrame of interest
@@ -244,21 +318,36 @@ def create_layered_histogram(
         padding (int): padding value
         height (int): chart height
         width (int): chart width
+        server_side (bool): bin and aggregate the series in Python
 
     Returns:
         alt.Chart: layered histogram
     """
 
-    chrt_data = transform_data(
-        frame,
-        x_shorthand,
-        x_title,
-        x2_shorthand,
-        hst_order_shorthand,
-        hst_color_shorthand,
-        max_bins,
-        bin_step,
-    )
+    if server_side:
+        chrt_data = alt.Chart(
+            bin_layers(
+                frame,
+                x_shorthand,
+                x_title,
+                x2_shorthand,
+                hst_order_shorthand,
+                hst_color_shorthand,
+                max_bins,
+                bin_step,
+            )
+        )
+    else:
+        chrt_data = transform_data(
+            frame,
+            x_shorthand,
+            x_title,
+            x2_shorthand,
+            hst_order_shorthand,
+            hst_color_shorthand,
+            max_bins,
+            bin_step,
+        )
     bar = configure_bar(
         chrt_data,
         x_shorthand,
@@ -288,6 +377,44 @@ def create_layered_histogram(
     # return chart.properties(title=title, padding=padding, height=height, width=width)
 
 
+def format_bin_edge(value):
+    """Formats a bin edge the way JavaScript converts a number to a string (integral values
+    without a decimal point), so that server-side bin range labels match Vega's.
+
+    Parameters:
+        value (float): bin edge
+
+    Returns:
+        str: formatted bin edge
+    """
+
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def get_bin_step(span, max_bins):
+    """Returns the smallest nice bin step (1, 2, or 5 times a power of ten) that divides the
+    passed in < span > into at most < max_bins > bins.
+
+    Parameters:
+        span (float): extent of the binned values
+        max_bins (int): maximum number of bins
+
+    Returns:
+        float: bin step
+    """
+
+    if span <= 0:
+        return 1.0
+
+    raw = span / max_bins
+    magnitude = 10 ** np.floor(np.log10(raw))
+    for nice in (1, 2, 5):
+        if nice * magnitude >= raw:
+            return float(nice * magnitude)
+
+    return float(10 * magnitude)
+
+
 def transform_data(
     frame, x_shorthand, x_title, x2_shorthand, order_shorthand, color_shorthand, max_bins, bin_step
 ):
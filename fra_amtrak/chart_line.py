@@ -1,4 +1,8 @@
 import altair as alt
+import numpy as np
+import pandas as pd
+
+import fra_amtrak.chart_downsample as dsmp
 
 
 def configure_color(shorthand, colors):
@@ -200,8 +204,14 @@ def create_line_chart(
     padding=10,
     height=300,
     width=600,
+    max_points=None,
+    group=None,
 ):
-    """Creates a line chart.
+    """Creates a line chart. If < max_points > is set, each line (< group > member, by default
+    each < color_shorthand > member) is downsampled to at most < max_points > points with
+    Largest-Triangle-Three-Buckets (see chart_downsample.downsample_lines()) before the data are
+    attached to the chart. Quantitative x-axes place points by their x values; other x-axes
+    (e.g., stations, fiscal periods) by their row order, so < frame > rows must be in x-axis order.
 
     Parameters:
         frame (DataFrame): data frame
@@ -219,11 +229,23 @@ def create_line_chart(
         padding (int): padding value
         height (int): chart height
         width (int): chart width
+        max_points (int): Maximum number of points per line; None disables downsampling
+        group (str): Line column; None uses the < color_shorthand > column
 
     Returns:
         alt.Chart: line chart
     """
 
+    if max_points:
+        x = x_shorthand.split(":")[0]
+        frame = dsmp.downsample_lines(
+            frame,
+            y_shorthand.split(":")[0],
+            group or color_shorthand.split(":")[0],
+            max_points,
+            x if x_shorthand.endswith(":Q") else None,
+        )
+
     line = configure_line(
         frame,
         x_shorthand,
@@ -257,8 +279,11 @@ def create_line_chart_interp(
     padding=10,
     height=300,
     width=600,
+    group="Train Number",
 ):
-    """Creates a line chart featuring interpolated values.
+    """Creates a line chart featuring interpolated values. Missing < y_shorthand > values are
+    estimated for each < group > member (see interpolate_by_group()) and drawn as a dashed line
+    beneath the observed values.
 
     Parameters:
         frame (DataFrame): data frame
@@ -276,13 +301,20 @@ def create_line_chart_interp(
         padding (int): padding value
         height (int): chart height
         width (int): chart width
+        group (str): Group column (series interpolated independently)
 
     Returns:
         alt.Chart: line chart
     """
 
+    # Project the plotted columns (rather than copying the whole frame)
+    shorthands = [x_shorthand, y_shorthand, color_shorthand, group] + [
+        dict_["shorthand"] for dict_ in tooltip_config
+    ]
+    plotted = frame[list(dict.fromkeys(shorthand.split(":")[0] for shorthand in shorthands))]
+
     line = configure_line(
-        frame,
+        plotted,
         x_shorthand,
         x_title,
         x_sort_order,
@@ -295,13 +327,9 @@ def create_line_chart_interp(
         tooltip_config,
     )
 
-    # Hack: copy frame, estimate missing values using linear interpolation
-    frame_interp = frame.copy()
-    frame_interp["Late Detraining Customers Avg Min Late mean"] = (
-        frame.groupby("Train Number")["Late Detraining Customers Avg Min Late mean"]
-        .apply(lambda group: group.interpolate())
-        .reset_index(drop=True)
-    )
+    # Estimate missing values using linear interpolation
+    y = y_shorthand.split(":")[0]
+    frame_interp = plotted.assign(**{y: interpolate_by_group(plotted, y, group)})
 
     line_interp = configure_line_dash(
         frame_interp,
@@ -321,3 +349,65 @@ def create_line_chart_interp(
     return alt.layer(line, line_interp).properties(
         title=title, padding=padding, height=height, width=width
     )
+
+
+def interpolate_by_group(frame, column, group):
+    """Fills missing < column > values of every < group > member (e.g., each train) in < frame >
+    by linear interpolation between the nearest observed values along the member's rows (in
+    < frame > order, e.g., route order). As with pd.Series.interpolate(), trailing gaps repeat the
+    last observed value and leading gaps remain missing.
+
+    All groups are filled at once: the rows are stably sorted by group, the previous and next
+    observed positions of every row are found with running maximum/minimum accumulations, and
+    the linear weights are applied in a single NumPy expression. The result is aligned to the
+    < frame > index, whatever the row order.
+
+    Parameters:
+        frame (pd.DataFrame): DataFrame of interest
+        column (str): Column to interpolate
+        group (str): Group column
+
+    Returns:
+        pd.Series: Series of interpolated values
+    """
+
+    values = frame[column].to_numpy(dtype=np.float64, na_value=np.nan)
+    codes = frame.groupby(group, sort=False).ngroup().to_numpy()
+
+    # Group rows contiguously (frame order kept within each group)
+    order = np.argsort(codes, kind="stable")
+    sorted_values, sorted_codes = values[order], codes[order]
+    positions = np.arange(values.size)
+
+    starts = np.flatnonzero(np.r_[True, sorted_codes[1:] != sorted_codes[:-1]])
+    counts = np.diff(np.r_[starts, values.size])
+    group_start = np.repeat(starts, counts)
+    group_end = group_start + np.repeat(counts, counts) - 1
+
+    observed = ~np.isnan(sorted_values)
+    prev = np.maximum.accumulate(np.where(observed, positions, -1))
+    nxt = np.minimum.accumulate(np.where(observed, positions, values.size)[::-1])[::-1]
+    has_prev = prev >= group_start
+    has_next = nxt <= group_end
+
+    prev_values = sorted_values[np.clip(prev, 0, None)]
+    next_values = sorted_values[np.clip(nxt, None, values.size - 1)]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        weights = (positions - prev) / (nxt - prev)
+    filled = np.where(
+        observed,
+        sorted_values,
+        np.where(
+            has_prev & has_next,
+            prev_values + weights * (next_values - prev_values),
+            np.where(has_prev, prev_values, np.nan),
+        ),
+    )
+
+    # Rows without a group are not interpolated
+    filled = np.where(sorted_codes >= 0, filled, sorted_values)
+
+    interpolated = np.empty_like(values)
+    interpolated[order] = filled
+
+    return pd.Series(interpolated, index=frame.index, name=column)
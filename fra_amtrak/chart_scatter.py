@@ -0,0 +1,180 @@
+import altair as alt
+
+import fra_amtrak.chart_downsample as dsmp
+
+
+def configure_points(
+    frame, x_shorthand, x_title, y_shorthand, y_title, color, size, tooltip_config
+):
+    """Returns a point (circle) chart object. If < size > is set, the area of each point is scaled
+    by the passed in < size > column (e.g., the number of points in a grid cell).
+
+    Parameters:
+        frame (pd.DataFrame): DataFrame of interest
+        x_shorthand (str): shorthand value for the x-axis
+        x_title (str): title for the x-axis
+        y_shorthand (str): shorthand value for the y-axis
+        y_title (str): title for the y-axis
+        color (str): point color
+        size (str): shorthand value for the point size; None uses a fixed size
+        tooltip_config (list): nested dictionaries containing tooltip config values
+
+    Returns:
+        alt.Chart: point chart object
+    """
+
+    encodings = {
+        "x": configure_x_axis(x_shorthand, x_title),
+        "y": configure_y_axis(y_shorthand, y_title),
+        "tooltip": configure_tooltip(tooltip_config),
+    }
+    if size:
+        encodings["size"] = alt.Size(
+            shorthand=size, legend=alt.Legend(title="Points"), scale=alt.Scale(range=[10, 300])
+        )
+
+    return alt.Chart(frame).mark_circle(color=color, opacity=0.6).encode(**encodings)
+
+
+def configure_tooltip(config):
+    """Returns a tooltip configuration object for a scatter chart.
+
+    Parameters:
+        config (list): nested dictionaries containing tooltip configuration values
+
+    Returns:
+        alt.Chart: tooltip configuration object
+    """
+
+    return [
+        alt.Tooltip(dict_["shorthand"], title=dict_["title"], format=dict_["format"])
+        if dict_["format"]
+        else alt.Tooltip(dict_["shorthand"], title=dict_["title"])
+        for dict_ in config
+    ]
+
+
+def configure_x_axis(shorthand, title):
+    """Returns an alt.X object configured with the provided < shorthand > and
+    other values.
+
+    Parameters:
+        shorthand (str): shorthand value for the x-axis
+        title (str): x-axis title
+
+    Returns:
+        alt.X: x-axis object
+    """
+
+    return alt.X(
+        shorthand=shorthand,
+        axis=alt.Axis(
+            grid=True,
+            labelFontWeight="normal",
+            labelPadding=5,
+            title=title,
+            titleFontSize=10,
+            titleFontWeight="bold",
+        ),
+    )
+
+
+def configure_y_axis(shorthand, title):
+    """Returns an alt.Y object configured with the provided < shorthand > and
+    other values.
+
+    Parameters:
+        shorthand (str): shorthand value for the y-axis
+        title (str): y-axis title
+
+    Returns:
+        alt.Y: y-axis object
+    """
+
+    return alt.Y(
+        shorthand=shorthand,
+        axis=alt.Axis(
+            grid=True,
+            labelAngle=0,
+            labelFontWeight="normal",
+            labelPadding=5,
+            title=title,
+            titleFontSize=10,
+            titleFontWeight="bold",
+        ),
+    )
+
+
+def create_scatter_chart(
+    frame,
+    x_shorthand,
+    x_title,
+    y_shorthand,
+    y_title,
+    color,
+    tooltip_config,
+    title,
+    padding=10,
+    height=400,
+    width=600,
+    max_points=None,
+    bins=100,
+):
+    """Creates a scatter chart of the passed in < x_shorthand > and < y_shorthand > quantitative
+    columns. If < max_points > is set and < frame > holds more rows, the points are binned on a
+    < bins > x < bins > grid (see chart_downsample.bin_scatter()) and one point per occupied cell
+    is drawn at the cell centroid, sized by the number of points in the cell. The binned chart
+    ships at most bins ** 2 points to the browser whatever the length of < frame >; its tooltips
+    report the cell centroid and point count (< tooltip_config > applies to unbinned charts).
+
+    Parameters:
+        frame (pd.DataFrame): DataFrame of interest
+        x_shorthand (str): shorthand value for the x-axis
+        x_title (str): title for the x-axis
+        y_shorthand (str): shorthand value for the y-axis
+        y_title (str): title for the y-axis
+        color (str): point color
+        tooltip_config (list): nested dictionaries containing tooltip config values
+        title (str): chart title
+        padding (int): padding value
+        height (int): chart height
+        width (int): chart width
+        max_points (int): Maximum number of unbinned points; None disables binning
+        bins (int): Number of grid cells along each axis
+
+    Returns:
+        alt.Chart: scatter chart
+    """
+
+    x, y = x_shorthand.split(":")[0], y_shorthand.split(":")[0]
+
+    if max_points and len(frame) > max_points:
+        points = configure_points(
+            dsmp.bin_scatter(frame, x, y, bins),
+            f"{x}:Q",
+            x_title,
+            f"{y}:Q",
+            y_title,
+            color,
+            "count:Q",
+            [
+                {"shorthand": f"{x}:Q", "title": x_title, "format": ",.1f"},
+                {"shorthand": f"{y}:Q", "title": y_title, "format": ",.1f"},
+                {"shorthand": "count:Q", "title": "Points", "format": ","},
+            ],
+        )
+    else:
+        # Project the plotted columns (rather than attaching the whole frame)
+        columns = [x, y] + [dict_["shorthand"].split(":")[0] for dict_ in tooltip_config]
+        points = configure_points(
+            frame[list(dict.fromkeys(columns))],
+            x_shorthand,
+            x_title,
+            y_shorthand,
+            y_title,
+            color,
+            None,
+            tooltip_config,
+        )
+
+    return points.properties(title=title, padding=padding, height=height, width=width)
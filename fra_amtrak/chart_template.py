@@ -0,0 +1,101 @@
+import altair as alt
+
+
+def create_template(create_func, frame, **kwargs):
+    """Builds a chart template: the chart returned by < create_func > (e.g.,
+    chart_line.create_line_chart() or chart_box_preagg.create_boxplot()) called with an empty
+    (zero row) slice of the sample < frame > as its data argument (the first positional argument)
+    and the passed in keyword arguments < kwargs >. The empty slice keeps the column dtypes, so
+    Altair infers the same encoding types as for the full data. The chart is converted to a
+    Vega-Lite spec (and validated against the schema) once; per-entity charts are then stamped
+    out with stamp_template() without constructing or validating any further Altair objects.
+    The template is always built with inline datasets, whatever data transformer is enabled.
+
+    The < kwargs > must include the chart title argument; any placeholder value may be passed since
+    the title is replaced when the template is stamped.
+
+    Parameters:
+        create_func (func): chart function
+        frame (pd.DataFrame): sample chart data (column names and dtypes)
+        kwargs: keyword arguments passed to < create_func >
+
+    Returns:
+        dict: Vega-Lite spec and names of the placeholder datasets
+    """
+
+    # Inline (default transformer) data, so the placeholder datasets exist even if another data
+    # transformer (e.g., chart_data.enable_data_store()) is enabled
+    with alt.data_transformers.enable("default"):
+        spec = create_func(frame.iloc[:0], **kwargs).to_dict()
+    data_names = [name for name, values in spec.get("datasets", {}).items() if not values]
+
+    return {"spec": spec, "data_names": data_names}
+
+
+def get_template(templates, create_func, frame, **kwargs):
+    """Returns the chart template (see create_template()) for the passed in < create_func >,
+    < frame > columns and dtypes, and keyword arguments < kwargs > from < templates >, creating
+    and storing it on first use. Charts that share a configuration (e.g., every per-train box
+    plot) are built and validated once. Templates are keyed on dtype names (categories are
+    ignored), so categorical fields should be encoded with an explicit type (e.g., ":N").
+
+    Parameters:
+        templates (dict): template cache
+        create_func (func): chart function
+        frame (pd.DataFrame): sample chart data (column names and dtypes)
+        kwargs: keyword arguments passed to < create_func >
+
+    Returns:
+        dict: Vega-Lite spec and names of the placeholder datasets
+    """
+
+    key = (
+        f"{create_func.__module__}.{create_func.__name__}",
+        repr(frame.dtypes.astype(str).to_dict()),
+        repr(sorted(kwargs.items())),
+    )
+    if key not in templates:
+        templates[key] = create_template(create_func, frame, **kwargs)
+
+    return templates[key]
+
+
+def stamp_template(template, frame, title):
+    """Stamps out a per-entity Vega-Lite spec from the passed in chart < template > (see
+    create_template()) by substituting the entity's data < frame > and < title >. The data are
+    serialized once into the spec's top-level datasets in place of the empty placeholder dataset;
+    all other parts of the spec are shared with the template (shallow copy) and must be treated
+    as read-only.
+
+    Parameters:
+        template (dict): chart template
+        frame (pd.DataFrame): entity chart data
+        title (str|dict): entity chart title (see chart_title.format_title())
+
+    Returns:
+        dict: Vega-Lite spec
+    """
+
+    values = alt.utils.data.to_values(frame)["values"]
+
+    spec = dict(template["spec"])
+    spec["datasets"] = spec["datasets"] | dict.fromkeys(template["data_names"], values)
+    spec["title"] = title
+
+    return spec
+
+
+def to_chart(spec):
+    """Converts a stamped Vega-Lite < spec > (see stamp_template()) back into an Altair chart
+    object for display, skipping schema validation (the template was validated when created).
+
+    Parameters:
+        spec (dict): Vega-Lite spec
+
+    Returns:
+        alt.Chart|alt.LayerChart: chart object
+    """
+
+    if "layer" in spec:
+        return alt.LayerChart.from_dict(spec, validate=False)
+    return alt.Chart.from_dict(spec, validate=False)
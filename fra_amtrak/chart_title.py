@@ -1,23 +1,38 @@
 def format_title(
-    frame, title_text, multiline=True, anchor="middle", font_size=14, subtitle_font_size=12
+    frame,
+    title_text,
+    multiline=True,
+    anchor="middle",
+    font_size=14,
+    subtitle_font_size=12,
+    cache=None,
 ):
-    """Returns a formatted title for the chart.
+    """Returns a formatted title for the chart. The subtitle statistics are read from a
+    precomputed summary (see get_title_summary() and get_title_summaries()) if one is passed in as
+    < frame >; otherwise they are computed from the summary statistics DataFrame < frame > (once
+    per DataFrame if a < cache > is provided).
 
-    Returns:
-        frame (pd.DataFrame): summary statistics DataFrame
+    Parameters:
+        frame (pd.DataFrame|dict): summary statistics DataFrame or precomputed summary
         title_text (str): title of the chart
         multiline (bool): whether the title should be split into multiple lines
         anchor (str): anchor position
         font_size (int): font size
         subtitle_font_size (int): subtitle font size
+        cache (dict): summary cache (see get_title_summary())
+
+    Returns:
+        dict: title configuration
     """
 
-    detrain_total = int(frame["Total Detraining Customers sum"].sum())
-    detrain_late = int(frame["Late Detraining Customers sum"].sum())
+    summary = frame if isinstance(frame, dict) else get_title_summary(frame, cache)
+
+    detrain_total = summary["detrain_total"]
+    detrain_late = summary["detrain_late"]
     detrain_late_pct = round(detrain_late / detrain_total * 100, 2)
     detrain_on_time = int(detrain_total - detrain_late)
     detrain_on_time_pct = round(detrain_on_time / detrain_total * 100, 2)
-    mean_mins_late = frame["Late Detraining Customers Avg Min Late mean"].mean()
+    mean_mins_late = summary["mean_mins_late"]
 
     return {
         "text": title_text.split("\n") if multiline else title_text,
@@ -31,3 +46,85 @@ def format_title(
         "fontSize": font_size,
         "subtitleFontSize": subtitle_font_size,
     }
+
+
+def format_titles(frame, group, title_texts, **kwargs):
+    """Returns formatted titles (see format_title()) for many entities at once. The subtitle
+    statistics of every < group > member in < frame > are computed in a single grouped reduction
+    (see get_title_summaries()); < title_texts > maps each entity to its title text. Remaining
+    keyword arguments < kwargs > are passed to format_title().
+
+    Parameters:
+        frame (pd.DataFrame): summary statistics DataFrame
+        group (str|list): Entity column(s)
+        title_texts (dict): title text of each entity
+        kwargs: keyword arguments passed to format_title()
+
+    Returns:
+        dict: title configuration of each entity
+    """
+
+    summaries = get_title_summaries(frame, group)
+
+    return {
+        entity: format_title(summaries[entity], title_text, **kwargs)
+        for entity, title_text in title_texts.items()
+    }
+
+
+def get_title_summaries(frame, group):
+    """Computes the title summary (see get_title_summary()) of every < group > member (e.g., each
+    train or station) of the summary statistics DataFrame < frame > in a single grouped reduction.
+
+    Parameters:
+        frame (pd.DataFrame): summary statistics DataFrame
+        group (str|list): Entity column(s)
+
+    Returns:
+        dict: title summary of each entity
+    """
+
+    totals = frame.groupby(group, observed=True, sort=False).agg(
+        detrain_total=("Total Detraining Customers sum", "sum"),
+        detrain_late=("Late Detraining Customers sum", "sum"),
+        mean_mins_late=("Late Detraining Customers Avg Min Late mean", "mean"),
+    )
+
+    return {
+        entity: {
+            "detrain_total": int(row.detrain_total),
+            "detrain_late": int(row.detrain_late),
+            "mean_mins_late": row.mean_mins_late,
+        }
+        for entity, row in zip(totals.index, totals.itertuples(index=False))
+    }
+
+
+def get_title_summary(frame, cache=None):
+    """Computes the statistics reported in a chart subtitle from the summary statistics DataFrame
+    < frame >: the total and late detraining customers and the mean of the average minutes late.
+    If a < cache > dictionary is provided, the summary is stored under the identity of < frame >
+    (the DataFrame is held by the cache so that its identity cannot be reused), so repeated titles
+    for the same DataFrame reduce it once. DataFrames must not be mutated once cached.
+
+    Parameters:
+        frame (pd.DataFrame): summary statistics DataFrame
+        cache (dict): summary cache; None disables caching
+
+    Returns:
+        dict: title summary
+    """
+
+    if cache is not None and id(frame) in cache:
+        return cache[id(frame)][1]
+
+    summary = {
+        "detrain_total": int(frame["Total Detraining Customers sum"].sum()),
+        "detrain_late": int(frame["Late Detraining Customers sum"].sum()),
+        "mean_mins_late": frame["Late Detraining Customers Avg Min Late mean"].mean(),
+    }
+
+    if cache is not None:
+        cache[id(frame)] = (frame, summary)
+
+    return summary
@@ -6,11 +6,13 @@ import tomllib as tl
 
 import fra_amtrak.amtk_detrain as detrn
 import fra_amtrak.amtk_frame as frm
+import fra_amtrak.amtk_metrics as mtrc
 import fra_amtrak.amtk_network as ntwk
 import fra_amtrak.chart_box_preagg as boxp
 import fra_amtrak.chart_hist as hst
 import fra_amtrak.chart_hist_layer as hstl
 import fra_amtrak.chart_line as lne
+import fra_amtrak.chart_template as tmpl
 import fra_amtrak.chart_title as ttl
 
 # 1 Read files
@@ -25,11 +27,28 @@ AGG = const["agg"]
 CHRT_BAR = const["chart"]["bar"]
 COLORS = const["colors"]
 COLS = const["columns"]
+METRICS = const["metrics"]
 DIRECTION = const["train"]["direction"]
 SVC = const["services"]
 SUB_SVC = const["train"]["sub_service"]
 TRN = const["train"]
 
+title_cache = {}
+
+# Chart templates (per-train box plots share one validated spec; see chart_template)
+templates = {}
+box_config = {
+    "x_shorthand": "Fiscal Year Quarter:N",
+    "x_title": "Period",
+    "y_shorthand": "Late Detraining Customers Avg Min Late:Q",
+    "y_title": "Average Minutes Late",
+    "box_size": 20,
+    "outlier_shorthand": "outliers:Q",
+    "color_shorthand": "Color:N",
+    "chart_title": "",
+    "orient": boxp.Orient.VERTICAL,
+}
+
 filepath = parent_path.joinpath("data", "processed", "amtk_sub_services.json")
 with open(filepath, "r") as file:
     amtk_sub_svcs = json.load(file)
@@ -89,7 +108,7 @@ chrt_data = frm.bin_data(mich_mm_late, COLS["avg_mm_late"], mich_bins)
 
 # Chart title
 title_txt = f"Amtrak {SVC['mich']} Service Late Detraining Passengers"
-title = ttl.format_title(mich_stats, title_txt)
+title = ttl.format_title(mich_stats, title_txt, cache=title_cache)
 
 # Tooltips
 tooltip_config = [
@@ -121,12 +140,8 @@ chart = hst.create_histogram(
 
 #3.0 Michigan sub services: on-time performance metrics (entire period)
 
-mich_sub_svcs_stats = detrn.get_sum_stats_by_group(
-    mich,
-    [COLS["sub_svc"]],
-    AGG["columns"],
-    AGG["funcs"],
-)
+metrics_plan = mtrc.compile_metrics(METRICS, AGG["columns"], AGG["funcs"])
+mich_sub_svcs_stats = mtrc.get_metrics_by_group(mich, [COLS["sub_svc"]], metrics_plan)
 
 #3.1 Michigan sub services: visualize distribution of mean late arrival times
 
@@ -164,7 +179,9 @@ hst_order = {sub_svc["sub_svc"]: sub_svc["order"] for sub_svc in sub_svcs}
 chrt_data["order"] = chrt_data[COLS["sub_svc"]].map(hst_order)
 
 # Chart title
-title = ttl.format_title(mich_stats, f"Amtrak {SVC['mich']} Service Late Detraining Passengers")
+title = ttl.format_title(
+    mich_stats, f"Amtrak {SVC['mich']} Service Late Detraining Passengers", cache=title_cache
+)
 
 # Tooltip configuration
 tooltip_config = [
@@ -195,6 +212,7 @@ chart = hstl.create_layered_histogram(
     sigma_color=COLORS["anth_gray"],
     tooltip_config=tooltip_config,
     title=title,
+    server_side=True,
 )
 # chart.display()
 
@@ -284,27 +302,18 @@ title_txt = (
     f"Amtrak {txt['name']} Train {txt['number']} Late Detraining Passengers\n"
     f"{txt['route']} ({txt['direction']})"
 )
-title = ttl.format_title(amtk_364_rte_stats, title_txt)
+title = ttl.format_title(amtk_364_rte_stats, title_txt, cache=title_cache)
 
 # Create and display the vertical boxplot
-chart_vertical = boxp.create_boxplot(
-    data=chrt_data,
-    x_shorthand="Fiscal Year Quarter:N",
-    x_title="Period",
-    y_shorthand="Late Detraining Customers Avg Min Late:Q",
-    y_title="Average Minutes Late",
-    box_size=20,
-    outlier_shorthand="outliers:Q",
-    color_shorthand="Color:N",
-    chart_title=title,
-    orient=boxp.Orient.VERTICAL,
-)
+template = tmpl.get_template(templates, boxp.create_boxplot, chrt_data, **box_config)
+spec_vertical = tmpl.stamp_template(template, chrt_data, title)
+# chart_vertical = tmpl.to_chart(spec_vertical)
 # chart_vertical.display()
 
 #4.7 Blue Water: visualize eastbound mean late arrival times by station
 # Chart title
 title_txt = f"Amtrak {SUB_SVC['blwtr']} Service Late Detraining Passengers (2202 Q1 - 2024 Q3)"
-title = ttl.format_title(amtk_364_rte_stats, title_txt)
+title = ttl.format_title(amtk_364_rte_stats, title_txt, cache=title_cache)
 
 # Arrange stations by direction of travel
 x_sort_order = amtk_364_rte_stats.index.tolist()
@@ -386,28 +395,19 @@ title_txt = (
     f"Amtrak {txt['name']} Train {txt['number']} Late Detraining Passengers\n"
     f"{txt['route']} ({txt['direction']})"
 )
-title = ttl.format_title(amtk_365_rte_stats, title_txt)
+title = ttl.format_title(amtk_365_rte_stats, title_txt, cache=title_cache)
 
 # Create and display the vertical boxplot
-chart_vertical = boxp.create_boxplot(
-    data=chrt_data,
-    x_shorthand="Fiscal Year Quarter:N",
-    x_title="Period",
-    y_shorthand="Late Detraining Customers Avg Min Late:Q",
-    y_title="Average Minutes Late",
-    box_size=20,
-    outlier_shorthand="outliers:Q",
-    color_shorthand="Color:N",
-    chart_title=title,
-    orient=boxp.Orient.VERTICAL,
-)
+template = tmpl.get_template(templates, boxp.create_boxplot, chrt_data, **box_config)
+spec_vertical = tmpl.stamp_template(template, chrt_data, title)
+# chart_vertical = tmpl.to_chart(spec_vertical)
 # chart_vertical.display()
 
 #4.10 Blue Water: visualize westbound mean late arrival times by station
 
 # Chart title
 title_txt = f"Amtrak {SUB_SVC['blwtr']} Service Late Detraining Passengers (2022 Q1 - 2024 Q3)"
-title = ttl.format_title(amtk_365_rte_stats, title_txt)
+title = ttl.format_title(amtk_365_rte_stats, title_txt, cache=title_cache)
 
 # Arrange stations by direction of travel
 x_sort_order = amtk_365_rte_stats.index.tolist()
@@ -528,27 +528,18 @@ title_txt = (
     f"Amtrak {txt['name']} Train {txt['number']} Late Detraining Passengers\n"
     f"{txt['route']} ({txt['direction']})"
 )
-title = ttl.format_title(amtk_370_rte_stats, title_txt)
+title = ttl.format_title(amtk_370_rte_stats, title_txt, cache=title_cache)
 
 # Create and display the vertical boxplot
-chart_vertical = boxp.create_boxplot(
-    data=chrt_data,
-    x_shorthand="Fiscal Year Quarter:N",
-    x_title="Period",
-    y_shorthand="Late Detraining Customers Avg Min Late:Q",
-    y_title="Average Minutes Late",
-    box_size=20,
-    outlier_shorthand="outliers:Q",
-    color_shorthand="Color:N",
-    chart_title=title,
-    orient=boxp.Orient.VERTICAL,
-)
+template = tmpl.get_template(templates, boxp.create_boxplot, chrt_data, **box_config)
+spec_vertical = tmpl.stamp_template(template, chrt_data, title)
+# chart_vertical = tmpl.to_chart(spec_vertical)
 # chart_vertical.display()
 
 # 5.7 Pere Marquette: visualize eastbound mean late arrival times by station
 # Chart title
 title_txt = f"Amtrak {SUB_SVC['prmrq']} Service Late Detraining Passengers (2022 Q1 - 2024 Q3)"
-title = ttl.format_title(amtk_370_rte_stats, title_txt)
+title = ttl.format_title(amtk_370_rte_stats, title_txt, cache=title_cache)
 
 # Arrange stations by direction of travel
 x_sort_order = amtk_370_rte_stats.index.tolist()
@@ -634,28 +625,19 @@ title_txt = (
     f"Amtrak {txt['name']} Train {txt['number']} Late Detraining Passengers\n"
     f"{txt['route']} ({txt['direction']})"
 )
-title = ttl.format_title(amtk_371_rte_stats, title_txt)
+title = ttl.format_title(amtk_371_rte_stats, title_txt, cache=title_cache)
 
 # Create and display the vertical boxplot
-chart_vertical = boxp.create_boxplot(
-    data=chrt_data,
-    x_shorthand="Fiscal Year Quarter:N",
-    x_title="Period",
-    y_shorthand="Late Detraining Customers Avg Min Late:Q",
-    y_title="Average Minutes Late",
-    box_size=20,
-    outlier_shorthand="outliers:Q",
-    color_shorthand="Color:N",
-    chart_title=title,
-    orient=boxp.Orient.VERTICAL,
-)
+template = tmpl.get_template(templates, boxp.create_boxplot, chrt_data, **box_config)
+spec_vertical = tmpl.stamp_template(template, chrt_data, title)
+# chart_vertical = tmpl.to_chart(spec_vertical)
 # chart_vertical.display()
 
 #5.10 Pere Marquette: visualize westbound mean late arrival times by station
 
 # Chart title
 title_txt = f"Amtrak {SUB_SVC['prmrq']} Service Late Detraining Passengers (2022 Q1 - 2024 Q3)"
-title = ttl.format_title(amtk_371_rte_stats, title_txt)
+title = ttl.format_title(amtk_371_rte_stats, title_txt, cache=title_cache)
 
 # Arrange stations by direction of travel
 x_sort_order = amtk_371_rte_stats.index.tolist()
@@ -735,12 +717,7 @@ wolv_stn_order_wb = wolv_sub_svc["station order"]["westbound"]
 #6.5 Wolverine: eastbound detraining passengers summary statistics
 wolv_eb = wolv[wolv["Train Number"].isin([350, 352, 354])]
 
-wolv_eb_stats = detrn.get_sum_stats_by_group(
-    wolv_eb,
-    COLS["sub_svc"],
-    AGG["columns"],
-    AGG["funcs"],
-)
+wolv_eb_stats = mtrc.get_metrics_by_group(wolv_eb, COLS["sub_svc"], metrics_plan)
 wolv_eb_stats.drop(columns="Sub Service", inplace=True)
 
 rte_cols = [
@@ -815,6 +792,18 @@ wolv_eb_trns = [
     {"number": 354, "route": amtk_354_rte, "stats": amtk_354_rte_stats},
 ]
 
+# Chart titles (the route stats of all three trains are reduced at once)
+title_txts = {}
+for trn in wolv_eb_trns:
+    txt = TRN[str(trn["number"])]
+    title_txts[trn["number"]] = (
+        f"Amtrak {txt['name']} Train {txt['number']} Late Detraining Passengers\n"
+        f"{txt['route']} ({txt['direction']})"
+    )
+titles = ttl.format_titles(
+    pd.concat([trn["stats"] for trn in wolv_eb_trns]), COLS["trn"], title_txts
+)
+
 # Assemble charts
 for trn in wolv_eb_trns:
     chrt_data = detrn.get_qtr_avg_min_late(
@@ -827,26 +816,12 @@ for trn in wolv_eb_trns:
     )
 
     # Create chart title
-    txt = TRN[str(trn["number"])]
-    title_txt = (
-        f"Amtrak {txt['name']} Train {txt['number']} Late Detraining Passengers\n"
-        f"{txt['route']} ({txt['direction']})"
-    )
-    title = ttl.format_title(trn["stats"], title_txt)
+    title = titles[trn["number"]]
 
     # Create and display the vertical boxplot
-    chart_vertical = boxp.create_boxplot(
-        data=chrt_data,
-        x_shorthand="Fiscal Year Quarter:N",
-        x_title="Period",
-        y_shorthand="Late Detraining Customers Avg Min Late:Q",
-        y_title="Average Minutes Late",
-        box_size=20,
-        outlier_shorthand="outliers:Q",
-        color_shorthand="Color:N",
-        chart_title=title,
-        orient=boxp.Orient.VERTICAL,
-    )
+    template = tmpl.get_template(templates, boxp.create_boxplot, chrt_data, **box_config)
+    spec_vertical = tmpl.stamp_template(template, chrt_data, title)
+    # chart_vertical = tmpl.to_chart(spec_vertical)
     # chart_vertical.display()
 
 #6.7 Wolverine: visualize eastbound mean late arrival times by station
@@ -875,7 +850,7 @@ chrt_data = pd.concat([amtk_350_chrt_data, amtk_352_chrt_data, amtk_354_chrt_dat
 
 # Chart title
 title_txt = f"Amtrak {SUB_SVC['wolv']} Service Late Detraining Passengers"
-title = ttl.format_title(wolv_eb_stats, title_txt)
+title = ttl.format_title(wolv_eb_stats, title_txt, cache=title_cache)
 
 # Arrange stations by direction of travel
 x_sort_order = chrt_data.index.tolist()
@@ -915,12 +890,7 @@ chart = lne.create_line_chart_interp(
 
 wolv_wb = wolv[wolv["Train Number"].isin([351, 353, 355])]
 
-wolv_wb_stats = detrn.get_sum_stats_by_group(
-    wolv_wb,
-    COLS["sub_svc"],
-    AGG["columns"],
-    AGG["funcs"],
-)
+wolv_wb_stats = mtrc.get_metrics_by_group(wolv_wb, COLS["sub_svc"], metrics_plan)
 wolv_wb_stats.drop(columns="Sub Service", inplace=True)
 
 # Train 351 westbound
@@ -984,6 +954,18 @@ wolv_wb_trns = [
     {"number": 355, "route": amtk_355_rte, "stats": amtk_355_rte_stats},
 ]
 
+# Chart titles (the route stats of all three trains are reduced at once)
+title_txts = {}
+for trn in wolv_wb_trns:
+    txt = TRN[str(trn["number"])]
+    title_txts[trn["number"]] = (
+        f"Amtrak {txt['name']} Train {txt['number']} Late Detraining Passengers\n"
+        f"{txt['route']} ({txt['direction']})"
+    )
+titles = ttl.format_titles(
+    pd.concat([trn["stats"] for trn in wolv_wb_trns]), COLS["trn"], title_txts
+)
+
 # Assemble charts
 for trn in wolv_wb_trns:
     chrt_data = detrn.get_qtr_avg_min_late(
@@ -996,26 +978,12 @@ for trn in wolv_wb_trns:
     )
 
     # Create chart title
-    txt = TRN[str(trn["number"])]
-    title_txt = (
-        f"Amtrak {txt['name']} Train {txt['number']} Late Detraining Passengers\n"
-        f"{txt['route']} ({txt['direction']})"
-    )
-    title = ttl.format_title(trn["stats"], title_txt)
+    title = titles[trn["number"]]
 
     # Create and display the vertical boxplot
-    chart_vertical = boxp.create_boxplot(
-        data=chrt_data,
-        x_shorthand="Fiscal Year Quarter:N",
-        x_title="Period",
-        y_shorthand="Late Detraining Customers Avg Min Late:Q",
-        y_title="Average Minutes Late",
-        box_size=20,
-        outlier_shorthand="outliers:Q",
-        color_shorthand="Color:N",
-        chart_title=title,
-        orient=boxp.Orient.VERTICAL,
-    )
+    template = tmpl.get_template(templates, boxp.create_boxplot, chrt_data, **box_config)
+    spec_vertical = tmpl.stamp_template(template, chrt_data, title)
+    # chart_vertical = tmpl.to_chart(spec_vertical)
     # chart_vertical.display()
 
 #6.10 Wolverine: visualize westbound mean late arrival times by station
@@ -1041,7 +1009,7 @@ chrt_data = pd.concat([amtk_351_chrt_data, amtk_353_chrt_data, amtk_355_chrt_dat
 
 # Chart title
 title_txt = f"Amtrak {SUB_SVC['wolv']} Service Late Detraining Passengers"
-title = ttl.format_title(wolv_wb_stats, title_txt)
+title = ttl.format_title(wolv_wb_stats, title_txt, cache=title_cache)
 
 # Arrange stations by direction of travel
 x_sort_order = chrt_data.index.tolist()
@@ -4,11 +4,19 @@ import pathlib as pl
 import scipy.stats as stats
 import tomllib as tl
 
+import fra_amtrak.amtk_bootstrap as btsp
+import fra_amtrak.amtk_cache as cch
 import fra_amtrak.amtk_detrain as detrn
 import fra_amtrak.amtk_frame as frm
+import fra_amtrak.amtk_metrics as mtrc
+import fra_amtrak.amtk_model as mdl
+import fra_amtrak.amtk_period as prd
+import fra_amtrak.amtk_window as wndw
 import fra_amtrak.chart_bar as bar
 import fra_amtrak.chart_box_preagg as boxp
+import fra_amtrak.chart_data as cdat
 import fra_amtrak.chart_hist as hst
+import fra_amtrak.chart_scatter as sctr
 import fra_amtrak.chart_title as ttl
 
 #1 Read files
@@ -23,6 +31,12 @@ AGG = const["agg"]
 CHRT_BAR = const["chart"]["bar"]
 COLORS = const["colors"]
 COLS = const["columns"]
+METRICS = const["metrics"]
+
+# Write chart datasets to data/charts (referenced by URL rather than inlined in each spec)
+cdat.enable_data_store(parent_path.joinpath("data", "charts"), urlpath="data/charts")
+
+title_cache = {}
 
 # Performance data
 filepath = parent_path.joinpath("data", "processed", "station_performance_metrics-v1p2.csv")
@@ -40,21 +54,27 @@ network_detrn = network[COLS["total_detrn"]].sum()
 network_detrn_late = network[COLS["late_detrn"]].sum()
 network_detrn_on_time = network_detrn - network_detrn_late
 
+# Summary statistics cache shared with the service scripts (persisted to data/cache)
+cache = cch.create_cache(dirpath=parent_path.joinpath("data", "cache"))
+
 # Compute summary statistics
-network_stats = detrn.get_sum_stats(network, AGG["columns"], AGG["funcs"])
+network_stats = cch.get_sum_stats(cache, network, AGG["columns"], AGG["funcs"])
+
+# Group stats share one aggregation plan compiled from the [metrics] spec
+metrics_plan = mtrc.compile_metrics(METRICS, AGG["columns"], AGG["funcs"])
 
 # Service lines
-svc_line_stats = detrn.get_sum_stats_by_group(network, COLS["svc_line"], AGG["columns"], AGG["funcs"])
+svc_line_stats = cch.get_metrics_by_group(cache, network, COLS["svc_line"], metrics_plan)
 
 # Services
 serv = network.loc[:, COLS["svc"]].unique()
 serv.sort()
-svc_stats = detrn.get_sum_stats_by_group(network, COLS["svc"], AGG["columns"], AGG["funcs"])
+svc_stats = cch.get_metrics_by_group(cache, network, COLS["svc"], metrics_plan)
 
 # Sub services
 sub_serv = network.loc[:, COLS["sub_svc"]].unique()
 sub_serv.sort()
-sub_svc_stats = detrn.get_sum_stats_by_group(network, COLS["sub_svc"], AGG["columns"], AGG["funcs"])
+sub_svc_stats = cch.get_metrics_by_group(cache, network, COLS["sub_svc"], metrics_plan)
 
 # Stations
 stn_count = network.loc[:, COLS["station_code"]].nunique()
@@ -104,7 +124,7 @@ chrt_data = frm.bin_data(network_avg_mm_late, COLS["avg_mm_late"], bins)
 
 # Chart title
 title_txt = "Amtrak Network Late Detraining Passengers"
-title = ttl.format_title(network_stats, title_txt)
+title = ttl.format_title(network_stats, title_txt, cache=title_cache)
 
 # Tooltips
 tooltip_config = [
@@ -136,29 +156,46 @@ chart = hst.create_histogram(
 )
 # chart.display()
 
+# Bootstrap confidence intervals (network and service lines; train arrivals resampled)
+network_ci = btsp.get_bootstrap_ci(network)
+svc_line_ci = btsp.get_bootstrap_ci(network, COLS["svc_line"])
+
+# Save file
+filepath = parent_path.joinpath("data", "student", "stu-amtk-network_ci.csv")
+pd.concat(
+    [network_ci, svc_line_ci.rename(columns={COLS["svc_line"]: "Group"})], ignore_index=True
+).to_csv(filepath, index=False)
+
 #4 On-time performance metrics (by fiscal year and quarter)
 
 # Get quarterly stats
-network_qtr_stats = detrn.get_sum_stats_by_group(
+network_qtr_stats = cch.get_metrics_by_group(
+    cache,
     network,
     [COLS["year"], COLS["quarter"]],
-    AGG["columns"],
-    AGG["funcs"],
-    network_trn_arrivals,
-    network_detrn,
+    metrics_plan,
+    total_arrivals=network_trn_arrivals,
+    total_detrain=network_detrn,
 )
 
 # Save file
 filepath = parent_path.joinpath("data", "student", "stu-amtk-network_qtr_stats.csv")
 network_qtr_stats.to_csv(filepath, index=False)
 
+# Add quarter-over-quarter and year-over-year deltas, rolling means, and ranks
+network_qtr_window = wndw.add_window_metrics(network_qtr_stats)
+
+# Save file
+filepath = parent_path.joinpath("data", "student", "stu-amtk-network_qtr_window.csv")
+network_qtr_window.to_csv(filepath, index=False)
+
 #5 Visualize detraining passengers (by fiscal year and quarter)
 # Assemble the data for the chart
 chrt_data = bar.create_detrain_chart_frame(network_qtr_stats, CHRT_BAR["columns"])
 
 # Create chart title
 title_text = f"Amtrak {const['service_lines']['nec']} (NEC) Detraining Passengers"
-title = ttl.format_title(network_stats, title_text)
+title = ttl.format_title(network_stats, title_text, cache=title_cache)
 
 # Grouped bar chart
 chart = bar.create_grouped_bar_chart(
@@ -176,11 +213,12 @@ chart = bar.create_grouped_bar_chart(
 
 cols = [COLS["year"], COLS["quarter"], COLS["late_detrn_avg_mm_late"]]
 
-# Group by fiscal year and quarter and flatten
-chrt_data = network.groupby(cols[:2])[cols].apply(lambda x: x).reset_index(drop=True)
+# Order by fiscal year and quarter
+chrt_data = prd.get_period_view(network, cols, year=cols[0], quarter=cols[1])
 
-# Add 'Fiscal Year Quarter' column
-chrt_data["Fiscal Year Quarter"] = chrt_data[["Fiscal Year", "Fiscal Quarter"]].apply(detrn.format_year_quarter, axis=1)
+# Add 'Fiscal Year Quarter' column (vectorized period keys and labels)
+keys = prd.get_period_keys(chrt_data, COLS["year"], COLS["quarter"])
+chrt_data[COLS["year_quarter"]] = prd.get_period_labels(keys)
 
 # Drop columns and reorder
 chrt_data.drop([COLS["year"], COLS["quarter"]], axis=1, inplace=True)
@@ -188,7 +226,7 @@ chrt_data.insert(0, COLS["year_quarter"], chrt_data.pop(COLS["year_quarter"]))
 
 # Add color column
 colors = [COLORS["amtk_blue"], COLORS["amtk_red"]]
-chrt_data.loc[:, "Color"] = chrt_data[COLS["year_quarter"]].apply(detrn.assign_color, colors=colors)
+chrt_data.loc[:, "Color"] = prd.assign_period_colors(keys, colors)
 chrt_data.head()
 
 # Compute aggregation statistics
@@ -199,7 +237,7 @@ chrt_data = frm.aggregate_data(chrt_data, cols)
 
 # Create chart title
 title_text = "Amtrak Network Late Detraining Passengers"
-title = ttl.format_title(network_stats, title_text)
+title = ttl.format_title(network_stats, title_text, cache=title_cache)
 
 chart_horizontal = boxp.create_boxplot(
     data=chrt_data,
@@ -223,6 +261,28 @@ lm_data = network[[COLS["route_miles"], COLS["late_detrn_avg_mm_late"]]].reset_i
 lm_data_clean = lm_data[["Route Miles", "Late Detraining Customers Avg Min Late"]].dropna()
 result = stats.linregress(lm_data_clean["Route Miles"], lm_data_clean["Late Detraining Customers Avg Min Late"])
 
+# Distance scatter: above max_points the train arrivals are binned on a grid (point size = count)
+chart = sctr.create_scatter_chart(
+    frame=lm_data_clean,
+    x_shorthand="Route Miles:Q",
+    x_title="Route Miles",
+    y_shorthand="Late Detraining Customers Avg Min Late:Q",
+    y_title="Average Minutes Late",
+    color=COLORS["amtk_blue"],
+    tooltip_config=[
+        {"shorthand": "Route Miles:Q", "title": "Route Miles", "format": ","},
+        {
+            "shorthand": "Late Detraining Customers Avg Min Late:Q",
+            "title": "Average Minutes Late",
+            "format": ",.2f",
+        },
+    ],
+    title="Amtrak Route Miles vs Average Minutes Late",
+    max_points=5_000,
+    bins=100,
+)
+# chart.display()
+
 # Create a new DataFrame named route_mi_intervals comprising a single column named "Route Miles" with values ranging
 # from 0 to 2600 in increments of 25.
 # Then apply the function detrn.predict_avg_min_late() to each of the "Route Miles" values to generate predicted
@@ -230,7 +290,9 @@ result = stats.linregress(lm_data_clean["Route Miles"], lm_data_clean["Late Detr
 # For the starting zero (0) route mile mark, assign the predicted average late time to 0.0 minutes. Round each
 # predicted value to two decimal places. Assign each predicted value to a new column named "Predicted Avg Min Late".
 route_mi_intervals = pd.DataFrame({"Route Miles": np.arange(0, 2601, 25)})
-route_mi_intervals["Predicted Avg Min Late"] = route_mi_intervals["Route Miles"].apply(lambda x: round(detrn.predict_avg_min_late_by_distance(result, x),2))
+route_mi_intervals["Predicted Avg Min Late"] = np.round(
+    detrn.predict_avg_min_late_by_distance(result, route_mi_intervals["Route Miles"].to_numpy()), 2
+)
 route_mi_intervals.loc[0,"Predicted Avg Min Late"] = 0
 
 # Create a DataFrame of predicted late times for named trains to combine with route_mi_intervals. Retrieve each named
@@ -244,7 +306,9 @@ route_mi_intervals.loc[0,"Predicted Avg Min Late"] = 0
 # entire route.
 
 trn_route_mi = network[["Sub Service", "Route Miles"]].drop_duplicates().reset_index(drop=True)
-trn_route_mi["Predicted Avg Min Late"] = trn_route_mi["Route Miles"].apply(lambda x: round(detrn.predict_avg_min_late_by_distance(result, x),2))
+trn_route_mi["Predicted Avg Min Late"] = np.round(
+    detrn.predict_avg_min_late_by_distance(result, trn_route_mi["Route Miles"].to_numpy()), 2
+)
 
 # Combine route_mi_intervals and trn_route_mi. Assign the new DataFrame to a variable named lm_predict. Then sort
 # the DataFrame rows by the route miles (ascending) and the sub service (descending). Finally, reset the index.
@@ -261,3 +325,30 @@ lm_predict.reset_index(drop=True, inplace=True)
 filepath = parent_path.joinpath("data", "student", "stu-amtk-avg_min_late_predict.csv")
 lm_predict.to_csv(filepath, index=False)
 
+# Fit the same regression for every service line, service, and sub service in a single pass. The
+# coefficients are computed from grouped sufficient statistics; the network row matches result.
+# Sub services operate over a single route distance and so have no defined slope.
+lm_coefs = mdl.fit_linregress_by_group(
+    network, x=COLS["route_miles"], y=COLS["late_detrn_avg_mm_late"]
+)
+
+# Predict each sub service's route distance with its service line model
+trn_route_mi = trn_route_mi.merge(
+    network[[COLS["sub_svc"], COLS["svc_line"]]].drop_duplicates(COLS["sub_svc"]),
+    on=COLS["sub_svc"],
+    how="left",
+)
+trn_route_mi["Service Line Predicted Avg Min Late"] = np.round(
+    mdl.predict_by_group(
+        lm_coefs,
+        trn_route_mi[COLS["route_miles"]],
+        trn_route_mi[COLS["svc_line"]],
+        level=COLS["svc_line"],
+    ),
+    2,
+)
+
+# Write to file
+filepath = parent_path.joinpath("data", "student", "stu-amtk-avg_min_late_coefs.csv")
+lm_coefs.to_csv(filepath, index=True)
+
@@ -3,11 +3,16 @@ import pandas as pd
 import pathlib as pl
 import tomllib as tl
 
+import fra_amtrak.amtk_cache as cch
 import fra_amtrak.amtk_detrain as detrn
 import fra_amtrak.amtk_frame as frm
+import fra_amtrak.amtk_metrics as mtrc
 import fra_amtrak.amtk_network as ntwk
+import fra_amtrak.amtk_period as prd
+import fra_amtrak.amtk_views as vws
 import fra_amtrak.chart_bar as bar
 import fra_amtrak.chart_box_preagg as boxp
+import fra_amtrak.chart_concat as cnct
 import fra_amtrak.chart_hist as hst
 import fra_amtrak.chart_title as ttl
 
@@ -24,18 +29,69 @@ AGG = const["agg"]
 CHRT_BAR = const["chart"]["bar"]
 COLORS = const["colors"]
 COLS = const["columns"]
+METRICS = const["metrics"]
 SVC_LINES = const["service_lines"]
+VIEWS = const["views"]
+
+title_cache = {}
 
 filepath = parent_path.joinpath("data", "processed", "station_performance_metrics-v1p2.csv")
 network = pd.read_csv(
     filepath, dtype={"Address 02": "str", "ZIP Code": "str"}, low_memory=False
 )  # avoid DtypeWarning
 
+# Materialized quarterly stats (stale views are recomputed and persisted on read)
+views = vws.read_views(
+    filepath,
+    parent_path.joinpath("data", "views"),
+    VIEWS,
+    METRICS,
+    AGG["columns"],
+    AGG["funcs"],
+    names=["service_line"],
+    frame=network,
+)
+svc_line_qtr_stats = views["service_line"]
+
 #2 Amtrak service lines
 
-svc_line_stats = detrn.get_sum_stats_by_group(
-    network, COLS["svc_line"], AGG["columns"], AGG["funcs"]
+# Single aggregation plan compiled from the [metrics] spec (one groupby, no merges)
+metrics_plan = mtrc.compile_metrics(METRICS, AGG["columns"], AGG["funcs"])
+
+# Read from the data/cache results of explore_network (computed and written on a miss)
+cache = cch.create_cache(dirpath=parent_path.joinpath("data", "cache"))
+svc_line_stats = cch.get_metrics_by_group(cache, network, COLS["svc_line"], metrics_plan)
+
+# Service line dashboard: the quarterly view ships once; click a service line to drill down
+chrt_data = prd.add_period_label(svc_line_qtr_stats.copy())
+
+# Late arrivals per quarter weight the quarterly means (overview bars match svc_line_stats)
+qtr_cols = [COLS["svc_line"], COLS["year"], COLS["quarter"]]
+late_arrivals = (
+    network.groupby(qtr_cols)[COLS["late_detrn_avg_mm_late"]]
+    .count()
+    .reset_index(name="Late Arrivals")
 )
+chrt_data = chrt_data.merge(late_arrivals, on=qtr_cols, how="left")
+
+title_text = "Amtrak Service Lines Late Detraining Passengers"
+title = ttl.format_title(svc_line_stats, title_text, cache=title_cache)
+
+chart = cnct.create_dashboard(
+    chrt_data,
+    f"{COLS['svc_line']}:N",
+    COLS["svc_line"],
+    f"{COLS['year_quarter']}:O",
+    "Fiscal Period",
+    "Late Detraining Customers Avg Min Late mean:Q",
+    "Average Minutes Late",
+    entities=list(SVC_LINES.values()),
+    columns=3,
+    title=title,
+    color=COLORS["amtk_blue"],
+    weight_shorthand="Late Arrivals:Q",
+)
+# chart.display()
 
 #3 Northeast Corridor (NEC)
 nec = ntwk.by_service_line(network, SVC_LINES["nec"])
@@ -76,7 +132,7 @@ chrt_data = frm.bin_data(nec_mm_late, COLS["avg_mm_late"], bins)
 
 # Chart title
 title_txt = f"Amtrak {SVC_LINES['nec']} (NEC) Late Detraining Passengers"
-title = ttl.format_title(nec_stats, title_txt)
+title = ttl.format_title(nec_stats, title_txt, cache=title_cache)
 
 # Tooltips
 tooltip_config = [
@@ -106,14 +162,11 @@ chart = hst.create_histogram(
 )
 # chart.display()
 
-# Get quarterly stats
-nec_qtr_stats = detrn.get_sum_stats_by_group(
-    nec,
-    [COLS["year"], COLS["quarter"]],
-    AGG["columns"],
-    AGG["funcs"],
-    nec_trn_arrivals,
-    nec_detrn,
+# Get quarterly stats (service line view)
+nec_qtr_stats = (
+    svc_line_qtr_stats.loc[svc_line_qtr_stats[COLS["svc_line"]] == SVC_LINES["nec"]]
+    .drop(columns=COLS["svc_line"])
+    .reset_index(drop=True)
 )
 
 # Write to file
@@ -125,7 +178,7 @@ chrt_data = bar.create_detrain_chart_frame(nec_qtr_stats, CHRT_BAR["columns"])
 
 # Create chart title
 title_text = f"Amtrak {SVC_LINES['nec']} (NEC) Detraining Passengers"
-title = ttl.format_title(nec_stats, title_text)
+title = ttl.format_title(nec_stats, title_text, cache=title_cache)
 
 # Grouped bar chart
 chart = bar.create_grouped_bar_chart(
@@ -143,20 +196,21 @@ chart = bar.create_grouped_bar_chart(
 
 cols = [COLS["year"], COLS["quarter"], COLS["late_detrn_avg_mm_late"]]
 
-# Group by fiscal year and quarter, flatten, and reset index
-chrt_data = nec.groupby(cols[:2])[cols].apply(lambda x: x).reset_index(drop=True)
+# Order by fiscal year and quarter
+chrt_data = prd.get_period_view(nec, cols, year=cols[0], quarter=cols[1])
+
+# Add column (vectorized period keys and labels)
+keys = prd.get_period_keys(chrt_data, *cols[:2])
+chrt_data.loc[:, COLS["year_quarter"]] = prd.get_period_labels(keys)
 
-# Add column
-chrt_data.loc[:, COLS["year_quarter"]] = chrt_data.apply(detrn.format_year_quarter, axis=1)
+# Add alternating colors
+colors = [COLORS["amtk_blue"], COLORS["amtk_red"]]
+chrt_data.loc[:, "Color"] = prd.assign_period_colors(keys, colors)
 
 # Drop columns and reorder
 chrt_data.drop(cols[:2], axis=1, inplace=True)
 chrt_data.dropna(inplace=True)
 chrt_data.insert(0, COLS["year_quarter"], chrt_data.pop(COLS["year_quarter"]))
-
-# Add alternating colors
-colors = [COLORS["amtk_blue"], COLORS["amtk_red"]]
-chrt_data.loc[:, "Color"] = chrt_data[COLS["year_quarter"]].apply(detrn.assign_color, colors=colors)
 chrt_data.head()
 
 # Compute aggregation statistics
@@ -167,7 +221,7 @@ chrt_data = frm.aggregate_data(chrt_data, cols)
 
 # Create chart title
 title_text = f"Amtrak {SVC_LINES['nec']} (NEC) Late Detraining Passengers"
-title = ttl.format_title(nec_stats, title_text)
+title = ttl.format_title(nec_stats, title_text, cache=title_cache)
 
 chart_horizontal = boxp.create_boxplot(
     data=chrt_data,
@@ -228,7 +282,7 @@ chrt_data = frm.bin_data(state_min_late, COLS["avg_mm_late"], bins)
 
 # Chart title
 title_txt = f"Amtrak {SVC_LINES['state']} Late Detraining Passengers"
-title = ttl.format_title(state_stats, title_txt)
+title = ttl.format_title(state_stats, title_txt, cache=title_cache)
 
 # Tooltips
 tooltip_config = [
@@ -258,14 +312,11 @@ chart = hst.create_histogram(
     width=680,
 )
 
-# Get quarterly stats
-state_qtr_stats = detrn.get_sum_stats_by_group(
-    state,
-    [COLS["year"], COLS["quarter"]],
-    AGG["columns"],
-    AGG["funcs"],
-    state_trn_arrivals,
-    state_detrn,
+# Get quarterly stats (service line view)
+state_qtr_stats = (
+    svc_line_qtr_stats.loc[svc_line_qtr_stats[COLS["svc_line"]] == SVC_LINES["state"]]
+    .drop(columns=COLS["svc_line"])
+    .reset_index(drop=True)
 )
 
 # Write to file
@@ -278,7 +329,7 @@ chrt_data = bar.create_detrain_chart_frame(state_qtr_stats, CHRT_BAR["columns"])
 
 # Create chart title
 title_text = f"Amtrak {SVC_LINES['state']} Detraining Passengers"
-title = ttl.format_title(state_stats, title_text)
+title = ttl.format_title(state_stats, title_text, cache=title_cache)
 
 # Grouped bar chart
 chart = bar.create_grouped_bar_chart(
@@ -296,11 +347,12 @@ chart = bar.create_grouped_bar_chart(
 # Distribution of mean late arrival times (by fiscal year and quarter)
 cols = [COLS["year"], COLS["quarter"], COLS["late_detrn_avg_mm_late"]]
 
-# Group by fiscal year and quarter, flatten, and reset index
-state_avg_mm_late = state.groupby(cols[:2])[cols].apply(lambda x: x).reset_index(drop=True)
+# Order by fiscal year and quarter
+state_avg_mm_late = prd.get_period_view(state, cols, year=cols[0], quarter=cols[1])
 
-# Add column
-state_avg_mm_late.loc[:, COLS["year_quarter"]] = state_avg_mm_late.apply(detrn.format_year_quarter, axis=1)
+# Add column (vectorized period keys and labels)
+keys = prd.get_period_keys(state_avg_mm_late, *cols[:2])
+state_avg_mm_late.loc[:, COLS["year_quarter"]] = prd.get_period_labels(keys)
 
 # Drop columns and reorder
 state_avg_mm_late.drop(cols[:2], axis=1, inplace=True)
@@ -308,9 +360,7 @@ state_avg_mm_late.insert(0, COLS["year_quarter"], state_avg_mm_late.pop(COLS["ye
 
 # Add alternating colors
 colors = [COLORS["amtk_blue"], COLORS["amtk_red"]]
-state_avg_mm_late.loc[:, "Color"] = state_avg_mm_late[COLS["year_quarter"]].apply(
-    detrn.assign_color, colors=colors
-)
+state_avg_mm_late.loc[:, "Color"] = prd.assign_period_colors(keys, colors)
 
 # Compute aggregation statistics
 cols = [COLS["year_quarter"], COLS["late_detrn_avg_mm_late"]]
@@ -320,7 +370,7 @@ agg_stats = frm.aggregate_data(state_avg_mm_late, cols)
 
 # Create chart title
 title_text = f"Amtrak {SVC_LINES['state']} Late Detraining Passengers"
-title = ttl.format_title(nec_stats, title_text)
+title = ttl.format_title(nec_stats, title_text, cache=title_cache)
 
 chart_horizontal = boxp.create_boxplot(
     data=agg_stats,
@@ -391,7 +441,7 @@ chrt_data = frm.bin_data(long_dist_min_late, COLS["avg_mm_late"], bins)
 
 # Chart title
 title_txt = f"Amtrak {SVC_LINES['long_dist']} Service Late Detraining Passengers"
-title = ttl.format_title(long_dist_stats, title_txt)
+title = ttl.format_title(long_dist_stats, title_txt, cache=title_cache)
 
 # Tooltips
 tooltip_config = [
@@ -422,14 +472,11 @@ chart = hst.create_histogram(
 )
 # chart.display()
 
-# Get quarterly stats
-long_dist_qtr_stats = detrn.get_sum_stats_by_group(
-    long_dist,
-    [COLS["year"], COLS["quarter"]],
-    AGG["columns"],
-    AGG["funcs"],
-    long_dist_trn_arrivals,
-    long_dist_detrn,
+# Get quarterly stats (service line view)
+long_dist_qtr_stats = (
+    svc_line_qtr_stats.loc[svc_line_qtr_stats[COLS["svc_line"]] == SVC_LINES["long_dist"]]
+    .drop(columns=COLS["svc_line"])
+    .reset_index(drop=True)
 )
 
 # Write to file
@@ -441,7 +488,7 @@ chrt_data = bar.create_detrain_chart_frame(long_dist_qtr_stats, CHRT_BAR["column
 
 # Create chart title
 title_text = f"Amtrak {SVC_LINES['long_dist']} Detraining Passengers"
-title = ttl.format_title(long_dist_stats, title_text)
+title = ttl.format_title(long_dist_stats, title_text, cache=title_cache)
 
 # Grouped bar chart
 chart = bar.create_grouped_bar_chart(
@@ -456,13 +503,12 @@ chart = bar.create_grouped_bar_chart(
 
 cols = [COLS["year"], COLS["quarter"], COLS["late_detrn_avg_mm_late"]]
 
-# Group by fiscal year and quarter, flatten, and reset index
-long_dist_avg_min_late = long_dist.groupby(cols[:2])[cols].apply(lambda x: x).reset_index(drop=True)
+# Order by fiscal year and quarter
+long_dist_avg_min_late = prd.get_period_view(long_dist, cols, year=cols[0], quarter=cols[1])
 
-# Add column
-long_dist_avg_min_late.loc[:, COLS["year_quarter"]] = long_dist_avg_min_late.apply(
-    detrn.format_year_quarter, axis=1
-)
+# Add column (vectorized period keys and labels)
+keys = prd.get_period_keys(long_dist_avg_min_late, *cols[:2])
+long_dist_avg_min_late.loc[:, COLS["year_quarter"]] = prd.get_period_labels(keys)
 
 # Drop columns and reorder
 long_dist_avg_min_late.drop(cols[:2], axis=1, inplace=True)
@@ -472,9 +518,7 @@ long_dist_avg_min_late.insert(
 
 # Add alternating colors
 colors = [COLORS["amtk_blue"], COLORS["amtk_red"]]
-long_dist_avg_min_late.loc[:, "Color"] = long_dist_avg_min_late[COLS["year_quarter"]].apply(
-    detrn.assign_color, colors=colors
-)
+long_dist_avg_min_late.loc[:, "Color"] = prd.assign_period_colors(keys, colors)
 
 # Compute aggregation statistics
 cols = [COLS["year_quarter"], COLS["late_detrn_avg_mm_late"]]
@@ -484,7 +528,7 @@ chrt_data = frm.aggregate_data(long_dist_avg_min_late, cols)
 
 # Create chart title
 title_text = f"Amtrak {SVC_LINES['long_dist']} Late Detraining Passengers"
-title = ttl.format_title(nec_stats, title_text)
+title = ttl.format_title(nec_stats, title_text, cache=title_cache)
 
 chart_horizontal = boxp.create_boxplot(
     data=chrt_data,
@@ -3,9 +3,14 @@ import pandas as pd
 import pathlib as pl
 import tomllib as tl
 
+import fra_amtrak.amtk_anomaly as anom
+import fra_amtrak.amtk_cluster as cls
 import fra_amtrak.amtk_detrain as detrn
 import fra_amtrak.amtk_frame as frm
+import fra_amtrak.amtk_metrics as mtrc
 import fra_amtrak.amtk_network as ntwk
+import fra_amtrak.amtk_similarity as sim
+import fra_amtrak.amtk_views as vws
 import fra_amtrak.chart_bar as vis_bar
 import fra_amtrak.chart_box as box
 import fra_amtrak.chart_hist as hst
@@ -24,13 +29,33 @@ CHRT_BAR = const["chart"]["bar"]
 CHRT_BOX = const["chart"]["box"]
 COLORS = const["colors"]
 COLS = const["columns"]
+METRICS = const["metrics"]
 STNS = const["stations"]
+VIEWS = const["views"]
+
+title_cache = {}
 
 filepath = parent_path.joinpath("data", "processed", "station_performance_metrics-v1p2.csv")
 stations = pd.read_csv(
     filepath, dtype={"Address 02": "str", "ZIP Code": "str"}, low_memory=False
 )  # avoid DtypeWarning
 
+# Materialized quarterly stats (stale views are recomputed and persisted on read)
+views = vws.read_views(
+    filepath,
+    parent_path.joinpath("data", "views"),
+    VIEWS,
+    METRICS,
+    AGG["columns"],
+    AGG["funcs"],
+    names=["station"],
+    frame=stations,
+)
+stn_qtr_stats = views["station"]
+
+# Service line stats of each station (one groupby per station; see amtk_metrics)
+metrics_plan = mtrc.compile_metrics(METRICS, AGG["columns"], AGG["funcs"])
+
 #2 Passenger arrivals
 
 # Columns of interest (for display output only)
@@ -99,7 +124,7 @@ chrt_data = frm.bin_data(nyp_min_late, COLS["avg_mm_late"], bins)
 
 # Chart title
 title_txt = f"Late Detraining Passengers: {STNS['nyp']}"
-title = ttl.format_title(nyp_stats, title_txt)
+title = ttl.format_title(nyp_stats, title_txt, cache=title_cache)
 
 # Tooltips
 tooltip_config = [
@@ -128,14 +153,11 @@ chart = hst.create_histogram(
     title=title,
 )
 
-# Get quarterly stats
-nyp_qtr_stats = detrn.get_sum_stats_by_group(
-    nyp,
-    [COLS["year"], COLS["quarter"]],
-    AGG["columns"],
-    AGG["funcs"],
-    nyp_trn_arrivals,
-    nyp_detrn,
+# Get quarterly stats (station view)
+nyp_qtr_stats = (
+    stn_qtr_stats.loc[stn_qtr_stats[COLS["station_code"]] == "NYP"]
+    .drop(columns=COLS["station_code"])
+    .reset_index(drop=True)
 )
 nyp_qtr_stats.sort_values(by=[COLS["year"], COLS["quarter"]], ascending=[True, True])
 
@@ -156,7 +178,7 @@ title_txt = (
     f"Detraining Passengers: {text['Arrival Station']} ({text['Arrival Station Code']}), "
     f"{text['City']}, {text['State']}"
 )
-title = ttl.format_title(nyp_stats, title_txt)
+title = ttl.format_title(nyp_stats, title_txt, cache=title_cache)
 
 # Create and display grouped bar chart
 chart = vis_bar.create_grouped_bar_chart(
@@ -181,9 +203,7 @@ nyp_svc_trns.loc[:, COLS["trn_arrival_ratio"]] = (
 )
 
 # Get summary stats by COLS["svc_line"]
-nyp_svc_line_stats = detrn.get_sum_stats_by_group(
-    nyp, COLS["svc_line"], AGG["columns"], AGG["funcs"]
-)
+nyp_svc_line_stats = mtrc.get_metrics_by_group(nyp, COLS["svc_line"], metrics_plan)
 
 # Merge train arrivals by service line
 nyp_svc_line_stats = nyp_svc_line_stats.merge(nyp_svc_trns, on=COLS["svc_line"], how="inner")
@@ -217,7 +237,7 @@ title_txt = (
     f"Detraining Passengers: {text['Arrival Station']} ({text['Arrival Station Code']}), "
     f"{text['City']}, {text['State']}"
 )
-title = ttl.format_title(nyp_stats, title_txt)
+title = ttl.format_title(nyp_stats, title_txt, cache=title_cache)
 
 # Create and display the box plots
 chart = box.create_box_plot(
@@ -275,7 +295,7 @@ chrt_data = frm.bin_data(chi_min_late, COLS["avg_mm_late"], bins)
 
 # Chart title
 title_txt = f"Late Detraining Passengers: {STNS['chi']}"
-title = ttl.format_title(chi_stats, title_txt)
+title = ttl.format_title(chi_stats, title_txt, cache=title_cache)
 
 # Tooltips
 tooltip_config = [
@@ -305,9 +325,11 @@ chart = hst.create_histogram(
 )
 # chart.display()
 
-# Quarterly stats
-chi_qtr_stats = detrn.get_sum_stats_by_group(
-    chi, [COLS["year"], COLS["quarter"]], AGG["columns"], AGG["funcs"], chi_trn_arrivals, chi_detrn
+# Quarterly stats (station view)
+chi_qtr_stats = (
+    stn_qtr_stats.loc[stn_qtr_stats[COLS["station_code"]] == "CHI"]
+    .drop(columns=COLS["station_code"])
+    .reset_index(drop=True)
 )
 chi_qtr_stats.sort_values(by=[COLS["year"], COLS["quarter"]], ascending=[True, True])
 
@@ -328,7 +350,7 @@ title_txt = (
     f"Detraining Passengers: {text['Arrival Station']} ({text['Arrival Station Code']}), "
     f"{text['City']}, {text['State']}"
 )
-title = ttl.format_title(chi_stats, title_txt)
+title = ttl.format_title(chi_stats, title_txt, cache=title_cache)
 
 # Create and display grouped bar chart
 chart = vis_bar.create_grouped_bar_chart(
@@ -355,9 +377,7 @@ chi_svc_trns.loc[:, COLS["trn_arrival_ratio"]] = (
 )
 
 # Get summary stats by COLS["svc_line"]
-chi_svc_line_stats = detrn.get_sum_stats_by_group(
-    chi, COLS["svc_line"], AGG["columns"], AGG["funcs"]
-)
+chi_svc_line_stats = mtrc.get_metrics_by_group(chi, COLS["svc_line"], metrics_plan)
 
 # Merge train arrivals by service line
 chi_svc_line_stats = chi_svc_line_stats.merge(chi_svc_trns, on=COLS["svc_line"], how="inner")
@@ -391,7 +411,7 @@ title_txt = (
     f"Late Detraining Passengers: {text['Arrival Station']} ({text['Arrival Station Code']}), "
     f"{text['City']}, {text['State']}"
 )
-title = ttl.format_title(chi_stats, title_txt)
+title = ttl.format_title(chi_stats, title_txt, cache=title_cache)
 
 # Create and display the box plots
 chart = box.create_box_plot(
@@ -450,7 +470,7 @@ chrt_data = frm.bin_data(lax_min_late, COLS["avg_mm_late"], bins)
 
 # Chart title
 title_txt = f"Late Detraining Passengers: {STNS['lax']}"
-title = ttl.format_title(lax_stats, title_txt)
+title = ttl.format_title(lax_stats, title_txt, cache=title_cache)
 
 # Tooltips
 tooltip_config = [
@@ -481,13 +501,10 @@ chart = hst.create_histogram(
 # chart.display()
 
 # On-time performance metrics (by fiscal year and quarter)
-lax_qtr_stats = detrn.get_sum_stats_by_group(
-    lax,
-    [COLS["year"], COLS["quarter"]],
-    AGG["columns"],
-    AGG["funcs"],
-    lax_trn_arrivals,
-    lax_detrn,
+lax_qtr_stats = (
+    stn_qtr_stats.loc[stn_qtr_stats[COLS["station_code"]] == "LAX"]
+    .drop(columns=COLS["station_code"])
+    .reset_index(drop=True)
 )
 lax_qtr_stats.sort_values(by=[COLS["year"], COLS["quarter"]], ascending=[True, True])
 
@@ -509,7 +526,7 @@ title_txt = (
     f"Detraining Passengers: {text['Arrival Station']} ({text['Arrival Station Code']}), "
     f"{text['City']}, {text['State']}"
 )
-title = ttl.format_title(lax_stats, title_txt)
+title = ttl.format_title(lax_stats, title_txt, cache=title_cache)
 
 # Create and display grouped bar chart
 chart = vis_bar.create_grouped_bar_chart(
@@ -535,9 +552,7 @@ lax_svc_trains.loc[:, COLS["trn_arrival_ratio"]] = (
 )
 
 # Get summary stats by COLS["svc_line"]
-lax_svc_line_stats = detrn.get_sum_stats_by_group(
-    lax, COLS["svc_line"], AGG["columns"], AGG["funcs"]
-)
+lax_svc_line_stats = mtrc.get_metrics_by_group(lax, COLS["svc_line"], metrics_plan)
 
 # Merge train arrivals by service line
 lax_svc_line_stats = lax_svc_line_stats.merge(lax_svc_trains, on=COLS["svc_line"], how="inner")
@@ -572,7 +587,7 @@ title_txt = (
     f"Late Detraining Passengers: {text['Arrival Station']} ({text['Arrival Station Code']}), "
     f"{text['City']}, {text['State']}"
 )
-title = ttl.format_title(lax_stats, title_txt)
+title = ttl.format_title(lax_stats, title_txt, cache=title_cache)
 
 chart = box.create_box_plot(
     chrt_data,
@@ -587,3 +602,41 @@ chart = box.create_box_plot(
 )
 # chart.display()
 
+
+#4 Network station clusters
+
+# Rather than hand-picking stations, segment every station in the network into behaviour clusters
+# by its quarterly late to total detraining ratio and mean minutes late profile. Clusters are
+# numbered by increasing mean minutes late; the per-station mean and standard deviation across
+# quarters distinguish chronically late from volatile stations.
+stn_clusters, stn_centroids = cls.get_clusters(stations, COLS["station_code"], k=4)
+
+# Write to file
+filepath = parent_path.joinpath("data", "student", "stu-amtk-station_clusters.csv")
+stn_clusters.to_csv(filepath, index=False)
+
+#5 Similar stations
+
+# Stations whose quarterly late to total ratio and mean minutes late profiles most resemble the
+# select stations (cosine distance between z-normalized profiles)
+stn_features = sim.create_feature_matrix(
+    sim.get_profile_stats(stations, COLS["station_code"]), COLS["station_code"]
+)
+stn_neighbours = sim.get_nearest_neighbours(stn_features, ["NYP", "CHI", "LAX"], k=5)
+
+# Write to file
+filepath = parent_path.joinpath("data", "student", "stu-amtk-station_neighbours.csv")
+stn_neighbours.to_csv(filepath, index=False)
+
+#6 Anomalous train arrivals
+
+# Train, station, and fiscal quarter cells with unusual minutes late or late share, scored against
+# the train's own series at the station and against the network in the same quarter
+stn_anomalies = anom.get_anomalies(stations, threshold=3.5)
+
+# Top 25 anomalies (ranked by anomaly score)
+top_n_anomalies = stn_anomalies.head(25)
+
+# Write to file
+filepath = parent_path.joinpath("data", "student", "stu-amtk-station_anomalies.csv")
+stn_anomalies.to_csv(filepath, index=False)
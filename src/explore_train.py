@@ -4,10 +4,12 @@ import pathlib as pl
 import tomllib as tl
 
 import fra_amtrak.amtk_detrain as detrn
+import fra_amtrak.amtk_forecast as fcst
 import fra_amtrak.amtk_frame as frm
 import fra_amtrak.amtk_network as ntwk
 import fra_amtrak.chart_box_preagg as boxp
 import fra_amtrak.chart_hist as hst
+import fra_amtrak.chart_template as tmpl
 import fra_amtrak.chart_title as ttl
 
 #1 Read files
@@ -26,6 +28,20 @@ DIRECTION = const["train"]["direction"]
 SUB_SVC = const["train"]["sub_service"]
 TRN = const["train"]
 
+# Chart templates (per-train box plots share one validated spec; see chart_template)
+templates = {}
+box_config = {
+    "x_shorthand": "Fiscal Year Quarter:N",
+    "x_title": "Period",
+    "y_shorthand": "Late Detraining Customers Avg Min Late:Q",
+    "y_title": "Average Minutes Late",
+    "box_size": 20,
+    "outlier_shorthand": "outliers:Q",
+    "color_shorthand": "Color:N",
+    "chart_title": "",
+    "orient": boxp.Orient.VERTICAL,
+}
+
 filepath = parent_path.joinpath("data", "processed", "station_performance_metrics-v1p2.csv")
 trains = pd.read_csv(
     filepath, dtype={"Address 02": "str", "ZIP Code": "str"}, low_memory=False
@@ -172,18 +188,9 @@ title_txt = (
 title = ttl.format_title(amtk_2155_rte_stats, title_txt)
 
 # Create and display the vertical boxplot
-chart_vertical = boxp.create_boxplot(
-    data=chrt_data,
-    x_shorthand="Fiscal Year Quarter:N",
-    x_title="Period",
-    y_shorthand="Late Detraining Customers Avg Min Late:Q",
-    y_title="Average Minutes Late",
-    box_size=20,
-    outlier_shorthand="outliers:Q",
-    color_shorthand="Color:N",
-    chart_title=title,
-    orient=boxp.Orient.VERTICAL,
-)
+template = tmpl.get_template(templates, boxp.create_boxplot, chrt_data, **box_config)
+spec_vertical = tmpl.stamp_template(template, chrt_data, title)
+# chart_vertical = tmpl.to_chart(spec_vertical)
 # chart_vertical.display()
 
 # 2154
@@ -248,18 +255,9 @@ title_txt = (
 title = ttl.format_title(amtk_2154_rte_stats, title_txt)
 
 # Create and display the vertical boxplot
-chart_vertical = boxp.create_boxplot(
-    data=chrt_data,
-    x_shorthand="Fiscal Year Quarter:N",
-    x_title="Period",
-    y_shorthand="Late Detraining Customers Avg Min Late:Q",
-    y_title="Average Minutes Late",
-    box_size=20,
-    outlier_shorthand="outliers:Q",
-    color_shorthand="Color:N",
-    chart_title=title,
-    orient=boxp.Orient.VERTICAL,
-)
+template = tmpl.get_template(templates, boxp.create_boxplot, chrt_data, **box_config)
+spec_vertical = tmpl.stamp_template(template, chrt_data, title)
+# chart_vertical = tmpl.to_chart(spec_vertical)
 # chart_vertical.display()
 
 #3 Select trains: State Supported Michigan Service
@@ -401,18 +399,9 @@ title_txt = (
 title = ttl.format_title(amtk_774_rte_stats, title_txt)
 
 # Create and display the vertical boxplot
-chart_vertical = boxp.create_boxplot(
-    data=chrt_data,
-    x_shorthand="Fiscal Year Quarter:N",
-    x_title="Period",
-    y_shorthand="Late Detraining Customers Avg Min Late:Q",
-    y_title="Average Minutes Late",
-    box_size=20,
-    outlier_shorthand="outliers:Q",
-    color_shorthand="Color:N",
-    chart_title=title,
-    orient=boxp.Orient.VERTICAL,
-)
+template = tmpl.get_template(templates, boxp.create_boxplot, chrt_data, **box_config)
+spec_vertical = tmpl.stamp_template(template, chrt_data, title)
+# chart_vertical = tmpl.to_chart(spec_vertical)
 # chart_vertical.display()
 
 # 777
@@ -473,18 +462,9 @@ title_txt = (
 title = ttl.format_title(amtk_777_rte_stats, title_txt)
 
 # Create and display the vertical boxplot
-chart_vertical = boxp.create_boxplot(
-    data=chrt_data,
-    x_shorthand="Fiscal Year Quarter:N",
-    x_title="Period",
-    y_shorthand="Late Detraining Customers Avg Min Late:Q",
-    y_title="Average Minutes Late",
-    box_size=20,
-    outlier_shorthand="outliers:Q",
-    color_shorthand="Color:N",
-    chart_title=title,
-    orient=boxp.Orient.VERTICAL,
-)
+template = tmpl.get_template(templates, boxp.create_boxplot, chrt_data, **box_config)
+spec_vertical = tmpl.stamp_template(template, chrt_data, title)
+# chart_vertical = tmpl.to_chart(spec_vertical)
 # chart_vertical.display()
 
 #4 Long-distance trains
@@ -613,18 +593,9 @@ title_txt = (
 title = ttl.format_title(amtk_59_rte_stats, title_txt)
 
 # Create and display vertical boxplots
-chart_vertical = boxp.create_boxplot(
-    data=chrt_data,
-    x_shorthand="Fiscal Year Quarter:N",
-    x_title="Period",
-    y_shorthand="Late Detraining Customers Avg Min Late:Q",
-    y_title="Average Minutes Late",
-    box_size=20,
-    outlier_shorthand="outliers:Q",
-    color_shorthand="Color:N",
-    chart_title=title,
-    orient=boxp.Orient.VERTICAL,
-)
+template = tmpl.get_template(templates, boxp.create_boxplot, chrt_data, **box_config)
+spec_vertical = tmpl.stamp_template(template, chrt_data, title)
+# chart_vertical = tmpl.to_chart(spec_vertical)
 # chart_vertical.display()
 
 # 58
@@ -669,16 +640,23 @@ title_txt = (
 title = ttl.format_title(amtk_58_rte_stats, title_txt)
 
 # Create and display vertical boxplots
-chart_vertical = boxp.create_boxplot(
-    data=chrt_data,
-    x_shorthand="Fiscal Year Quarter:N",
-    x_title="Period",
-    y_shorthand="Late Detraining Customers Avg Min Late:Q",
-    y_title="Average Minutes Late",
-    box_size=20,
-    outlier_shorthand="outliers:Q",
-    color_shorthand="Color:N",
-    chart_title=title,
-    orient=boxp.Orient.VERTICAL,
-)
-# chart_vertical.display()
\ No newline at end of file
+template = tmpl.get_template(templates, boxp.create_boxplot, chrt_data, **box_config)
+spec_vertical = tmpl.stamp_template(template, chrt_data, title)
+# chart_vertical = tmpl.to_chart(spec_vertical)
+# chart_vertical.display()
+
+#5 Next quarter forecasts
+
+# Forecast every train and station series two fiscal quarters ahead (seasonal naive, simple
+# exponential smoothing, and trend plus seasonal least squares models)
+trn_forecasts = fcst.get_forecasts(trains, horizon=2)
+
+# Select trains
+trn_numbers = [int(key) for key in TRN if key.isdigit()]
+select_trn_forecasts = trn_forecasts.loc[
+    trn_forecasts[COLS["trn"]].isin(trn_numbers)
+].reset_index(drop=True)
+
+# Write to file
+filepath = parent_path.joinpath("data", "student", "stu-amtk-train_forecasts.csv")
+trn_forecasts.to_csv(filepath, index=False)